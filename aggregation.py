@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+/api/analyze 汇总统计的增量聚合
+
+分析阶段每产出一行就更新一次，汇总与按地区统计在同一遍扫描中得到，
+逐行结果不必全部留在内存中。
+"""
+
+from collections import deque
+from itertools import accumulate
+
+
+def _running_sum(start, values):
+    """从 start 起依次累加 values，加法顺序与逐个 += 完全相同"""
+    return deque(accumulate(values, initial=start), maxlen=1)[0]
+
+
+class ProfileAggregator:
+    """逐行累加总人数、合格人数、平均分总和以及按地区的统计"""
+
+    __slots__ = ('total_users', 'eligible_users', 'score_total', 'locations')
+
+    def __init__(self, total_users=0, eligible_users=0, score_total=0, locations=None):
+        self.total_users = total_users
+        self.eligible_users = eligible_users
+        self.score_total = score_total
+        # 地区 -> {'count', 'avg_score'（此处为分数总和）, 'eligible'}，按首次出现的顺序
+        self.locations = locations if locations is not None else {}
+
+    def add(self, user):
+        """累加一行分析结果（字典）"""
+        self._add(user['Location'], user['avg_score'], user['EligibleStatus'] == 'YES')
+
+    def add_record(self, record):
+        """累加一行分析结果（bug_script.UserRecord）"""
+        self._add(record.location, record.avg_score, record.eligible)
+
+    def _add(self, location, avg_score, is_eligible):
+        self.total_users += 1
+        if is_eligible:
+            self.eligible_users += 1
+        self.score_total += avg_score
+
+        stats = self.locations.get(location)
+        if stats is None:
+            stats = self.locations[location] = {'count': 0, 'avg_score': 0, 'eligible': 0}
+        stats['count'] += 1
+        stats['avg_score'] += avg_score
+        if is_eligible:
+            stats['eligible'] += 1
+
+    def observe(self, users):
+        """边累加边原样产出逐行结果"""
+        for user in users:
+            self.add(user)
+            yield user
+
+    def observe_records(self, records):
+        """observe 的 UserRecord 版本"""
+        for record in records:
+            self.add_record(record)
+            yield record
+
+    def merge(self, other):
+        """合并另一段数据的聚合结果（other 的行位于本段之后）"""
+        self.total_users += other.total_users
+        self.eligible_users += other.eligible_users
+        self.score_total += other.score_total
+        for location, other_stats in other.locations.items():
+            stats = self.locations.get(location)
+            if stats is None:
+                stats = self.locations[location] = {'count': 0, 'avg_score': 0, 'eligible': 0}
+            stats['count'] += other_stats['count']
+            stats['avg_score'] += other_stats['avg_score']
+            stats['eligible'] += other_stats['eligible']
+        return self
+
+    def extend(self, avg_scores, location_scores):
+        """并入紧接在已累加数据之后的一段结果，浮点累加顺序与逐行 add 相同
+
+        avg_scores: 该段按行顺序的平均分；
+        location_scores: 地区 -> (该段中该地区按行顺序的平均分列表, 合格人数)，
+        地区按段内首次出现的顺序排列。
+        """
+        self.score_total = _running_sum(self.score_total, avg_scores)
+        for location, (scores, eligible) in location_scores.items():
+            stats = self.locations.get(location)
+            if stats is None:
+                stats = self.locations[location] = {'count': 0, 'avg_score': 0, 'eligible': 0}
+            stats['count'] += len(scores)
+            stats['avg_score'] = _running_sum(stats['avg_score'], scores)
+            stats['eligible'] += eligible
+            self.total_users += len(scores)
+            self.eligible_users += eligible
+        return self
+
+    def stats(self):
+        """(总人数, 合格人数, 分数总和, 按地区统计) 的原始累加值"""
+        return self.total_users, self.eligible_users, self.score_total, self.locations
+
+    def summary(self):
+        total_users = self.total_users
+        avg_score_overall = self.score_total / total_users if total_users > 0 else 0
+        return {
+            "total_users": total_users,
+            "eligible_users": self.eligible_users,
+            "eligibility_rate": round(self.eligible_users / total_users * 100, 1) if total_users > 0 else 0,
+            "overall_avg_score": round(avg_score_overall, 1)
+        }
+
+    def location_stats(self):
+        return {
+            location: {
+                "count": stats["count"],
+                "avg_score": round(stats["avg_score"] / stats["count"], 1),
+                "eligible": stats["eligible"]
+            }
+            for location, stats in self.locations.items()
+        }
@@ -0,0 +1,35 @@
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+from tiered_cache import TieredCache
+
+
+def content_key(html: str, *salt: str) -> str:
+    """以页面内容与分析配置（词表、解析器等）计算缓存键"""
+    digest = hashlib.sha256()
+    for part in salt:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    digest.update(html.encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
+
+class AnalysisCache(TieredCache):
+    """页面分析结果缓存：按条数限制的进程内 LRU，可选共享的磁盘层（见 TieredCache）"""
+
+    def __init__(self, max_entries: int = 4096, directory: Optional[str] = None):
+        super().__init__(max_entries, directory)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def max_entries(self) -> int:
+        return self.capacity
+
+    def _encode(self, value: Dict) -> bytes:
+        return json.dumps(value, ensure_ascii=False).encode('utf-8')
+
+    def _decode(self, data: bytes) -> Dict:
+        return json.loads(data)
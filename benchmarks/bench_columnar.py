@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+列式引擎基准
+对比逐行引擎（iter_user_profiles + ProfileAggregator）与列式引擎在合成 CSV 上的耗时，并校验输出一致。
+两者都要逐行解析 CSV 文本，差别主要体现在计算阶段（平均分、合格标记、地区映射、分组统计）；
+列式数据可以复用（见二进制列存格式），此时解析成本只付一次。
+"""
+
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bug_script import _analyze_user, iter_csv_lines, iter_user_profiles
+from columnar import UserColumns, compute_columns
+from aggregation import ProfileAggregator
+
+
+def make_csv(rows: int, seed: int = 0) -> bytes:
+    """生成合成用户 CSV，城市代码中包含未知城市"""
+    rng = random.Random(seed)
+    out = ['user_id,user_name,age,city_identifier,scores']
+    for uid in range(1, rows + 1):
+        scores = ','.join(str(rng.randint(50, 100)) for _ in range(rng.randint(1, 5)))
+        out.append(f'{uid},user{uid},{rng.randint(18, 60)},{rng.choice((101, 102, 103, 104))},"{scores}"')
+    return ('\n'.join(out) + '\n').encode('utf-8')
+
+
+def run_python(data: bytes):
+    aggregator = ProfileAggregator()
+    rows = list(aggregator.observe(iter_user_profiles(iter_csv_lines(io.BytesIO(data)))))
+    return rows, aggregator.stats()
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    value = func(*args)
+    return value, time.perf_counter() - started
+
+
+def python_compute(users):
+    """逐行引擎的计算阶段（输入为已解析的字段）"""
+    aggregator = ProfileAggregator()
+    for name, age, city, scores in users:
+        aggregator.add(_analyze_user(name, age, city, scores))
+    return aggregator.stats()
+
+
+def main():
+    print(f"{'rows':>9} {'python total s':>15} {'columnar total s':>17} "
+          f"{'parse s':>8} {'compute s':>10} {'rows s':>7} {'compute speedup':>16}")
+    for rows in (10_000, 100_000, 1_000_000):
+        data = make_csv(rows)
+        expected, python_total = timed(run_python, data)
+
+        columns, parse = timed(UserColumns.from_csv_lines, iter_csv_lines(io.BytesIO(data)))
+        result, compute = timed(compute_columns, columns)
+        detail, materialize = timed(result.rows)
+        assert (detail, result.aggregator.stats()) == expected, "列式引擎输出与逐行引擎不一致"
+
+        offsets = columns.score_offsets.tolist()
+        scores = columns.scores.tolist()
+        users = [
+            (name, age, city, scores[offsets[i]:offsets[i + 1]])
+            for i, (name, age, city) in enumerate(zip(
+                columns.user_name, columns.age.tolist(), columns.city_identifier.tolist()))
+        ]
+        _, python_compute_time = timed(python_compute, users)
+
+        print(f"{rows:>9} {python_total:>15.2f} {parse + compute + materialize:>17.2f} "
+              f"{parse:>8.2f} {compute:>10.3f} {materialize:>7.2f} {python_compute_time / compute:>15.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+列式数据集基准
+对比每次重新解析 CSV 与从 mmap 的列式文件重新分析的耗时，并校验输出一致。
+"""
+
+import io
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_columnar import make_csv, timed
+from bug_script import iter_csv_lines
+from columnar import UserColumns, compute_columns
+from dataset_store import read_columns, write_columns
+
+
+def from_csv(data: bytes):
+    return compute_columns(UserColumns.from_csv_lines(iter_csv_lines(io.BytesIO(data)))).aggregator.stats()
+
+
+def from_dataset(path: str):
+    columns, _ = read_columns(path)
+    return compute_columns(columns).aggregator.stats()
+
+
+def main():
+    print(f"{'rows':>9} {'csv MB':>7} {'dataset MB':>11} {'csv s':>7} {'dataset s':>10} {'speedup':>8}")
+    for rows in (100_000, 1_000_000):
+        data = make_csv(rows)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'users.ucols')
+            write_columns(path, UserColumns.from_csv_lines(iter_csv_lines(io.BytesIO(data))))
+            expected, csv_time = timed(from_csv, data)
+            actual, dataset_time = timed(from_dataset, path)
+            assert actual == expected, "列式数据集的分析结果与 CSV 不一致"
+            print(f"{rows:>9} {len(data) / 1e6:>7.1f} {os.path.getsize(path) / 1e6:>11.1f} "
+                  f"{csv_time:>7.2f} {dataset_time:>10.3f} {csv_time / dataset_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
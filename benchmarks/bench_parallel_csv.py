@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+多进程分块分析基准
+对比串行逐行分析与 analyze_csv_parallel 在不同进程数下的耗时，并校验输出一致。
+加速比受 CPU 核数限制，父进程拼接结果与合并统计的部分仍是串行的。
+"""
+
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_columnar import make_csv, run_python, timed
+from parallel_csv import analyze_csv_parallel
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, 8, 16, cpus} & set(range(1, cpus + 1)))
+    print(f"cpus: {cpus}")
+    print(f"{'rows':>9} {'serial s':>9} " + ' '.join(f"{f'{n} procs s':>11}" for n in worker_counts))
+    for rows in (100_000, 1_000_000):
+        data = make_csv(rows)
+        expected, serial = timed(run_python, data)
+        with tempfile.NamedTemporaryFile(suffix='.csv') as tmp:
+            tmp.write(data)
+            tmp.flush()
+            timings = []
+            for workers in worker_counts:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    # 先预热进程池，不把进程启动时间计入
+                    list(executor.map(abs, range(workers)))
+                    (detail, aggregator), elapsed = timed(
+                        analyze_csv_parallel, tmp.name, executor)
+                assert (detail, aggregator.stats()) == expected, "并行分析输出与串行不一致"
+                timings.append(elapsed)
+        print(f"{rows:>9} {serial:>9.2f} " + ' '.join(f"{t:>11.2f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
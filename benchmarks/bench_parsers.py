@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+解析器后端基准
+对比原先多次遍历 BeautifulSoup 的实现与单次遍历的 html.parser / lxml 后端
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from page_fetcher import PageFetcher
+
+
+def make_page(blocks: int, seed: int = 0) -> str:
+    """生成包含段落、链接、meta、脚本、样式与注释的页面"""
+    rng = random.Random(seed)
+    words = ['company', 'product', 'service', '公司', '北京', '产品', '服务', 'team', '王', 'about']
+    head = ['<meta name="description" content="示例页面">', '<meta property="og:title" content="Example">']
+    body = []
+    for i in range(blocks):
+        text = ' '.join(rng.choice(words) for _ in range(30))
+        body.append(f'<div class="c{i % 7}"><p>{text}</p><a href="/p/{i}">link</a>'
+                    f'<a href="https://github.com/u{i}">gh</a><!-- 区块 {i} --></div>')
+        if i % 50 == 0:
+            body.append('<script>// 统计代码\nvar n = %d; /* 计数 */</script>' % i)
+            body.append('<style>/* 样式 %d */ .c%d { color: red }</style>' % (i, i % 7))
+    return '<html><head><title>示例</title>%s</head><body>%s</body></html>' % (''.join(head), ''.join(body))
+
+
+def legacy_features(fetcher, html):
+    soup = BeautifulSoup(html, 'html.parser')
+    fetcher._scanner().scan(soup.get_text())
+    fetcher._extract_meta_info(soup)
+    [a['href'] for a in soup.find_all('a', href=True)]
+    fetcher._extract_comments(soup)
+
+
+def main():
+    fetchers = {name: PageFetcher(parser=name) for name in ('html.parser', 'lxml')}
+    print(f"{'page KB':>8} {'legacy ms':>10} {'html.parser ms':>15} {'lxml ms':>9} {'lxml speedup':>13}")
+    for blocks in (10, 200, 2000):
+        html = make_page(blocks)
+        number = max(1, 200 // blocks)
+        legacy = timeit.timeit(lambda: legacy_features(fetchers['html.parser'], html), number=number) / number
+        single = {
+            name: timeit.timeit(lambda: f._extract_page_features(html), number=number) / number
+            for name, f in fetchers.items()
+        }
+        print(f"{len(html.encode()) // 1024:>8} {legacy * 1000:>10.1f} {single['html.parser'] * 1000:>15.1f} "
+              f"{single['lxml'] * 1000:>9.1f} {legacy / single['lxml']:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
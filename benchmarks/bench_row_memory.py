@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+逐行结果内存基准（tracemalloc）
+对比字典行与紧凑的 UserRecord 在保留全部逐行结果时的内存占用。
+"""
+
+import gc
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_columnar import make_csv
+from bug_script import analyze_user_profiles, iter_csv_lines, iter_user_profiles, iter_user_records
+
+
+def measure(func, *args):
+    """返回 (保留的字节数, 峰值字节数, 耗时)"""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak, elapsed
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    data = make_csv(rows)
+    cases = [
+        ("iter_user_profiles (dict)", lambda: list(iter_user_profiles(iter_csv_lines(io.BytesIO(data))))),
+        ("iter_user_records (slots)", lambda: list(iter_user_records(iter_csv_lines(io.BytesIO(data))))),
+        ("analyze_user_profiles", lambda: analyze_user_profiles(data)),
+        ("analyze_user_profiles compact", lambda: analyze_user_profiles(data, compact=True)),
+    ]
+    print(f"rows: {rows}")
+    print(f"{'case':<31} {'retained MB':>12} {'B/row':>7} {'peak MB':>9} {'time s':>7}")
+    for name, func in cases:
+        current, peak, elapsed = measure(func)
+        print(f"{name:<31} {current / 1e6:>12.1f} {current / rows:>7.0f} {peak / 1e6:>9.1f} {elapsed:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+中文扫描器微基准
+对比逐字符/逐词条扫描与 ChineseScanner 单次扫描在大页面上的耗时
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from page_fetcher import PageFetcher
+
+
+def make_page_text(size: int, cjk_ratio: float, seed: int = 0) -> str:
+    """生成指定大小、指定汉字比例的页面文本"""
+    rng = random.Random(seed)
+    latin = 'the quick brown fox jumps over the lazy dog 0123456789 '
+    cjk = '我们的公司位于中国北京上海深圳致力于为客户提供优质服务'
+    out = []
+    total = 0
+    while total < size:
+        chunk = rng.choice(cjk) if rng.random() < cjk_ratio else rng.choice(latin)
+        out.append(chunk)
+        total += 1
+    return ''.join(out)
+
+
+def reference_scan(fetcher, text):
+    """原始实现：逐字符判断，逐个词条做子串查找"""
+    chars = {c for c in text if fetcher._is_chinese_char(c)}
+    cities = {c for c in fetcher.chinese_cities if c in text}
+    surnames = {s for s in fetcher.chinese_surnames if s in text}
+    return chars, cities, surnames
+
+
+def main():
+    fetcher = PageFetcher()
+    scanner = fetcher._scanner()
+    print(f"{'size':>10} {'cjk':>5} {'reference ms':>14} {'scanner ms':>12} {'speedup':>8}")
+    for size in (100_000, 1_000_000, 5_000_000):
+        for ratio in (0.0, 0.05, 0.5):
+            text = make_page_text(size, ratio)
+            assert scanner.scan(text) == reference_scan(fetcher, text)
+            number = 3
+            ref = timeit.timeit(lambda: reference_scan(fetcher, text), number=number) / number
+            new = timeit.timeit(lambda: scanner.scan(text), number=number) / number
+            print(f"{size:>10} {ratio:>5} {ref * 1000:>14.1f} {new * 1000:>12.1f} {ref / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
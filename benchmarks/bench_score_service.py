@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+ScoreService 扩展性基准
+对比原先的线性扫描与按 user_id 索引的查询，用户数从 1k 到 1M
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bug_script import ScoreService
+
+# 线性扫描是 O(n²)，超过该规模时只抽样计时后按比例推算
+LINEAR_FULL_LIMIT = 10_000
+LINEAR_SAMPLE = 1_000
+
+
+def linear_lookup(records, uid):
+    """原先的实现"""
+    for user_id, scores in records:
+        if user_id == uid:
+            return scores
+    return []
+
+
+def main():
+    print(f"{'users':>9} {'load s':>8} {'indexed s':>10} {'linear s':>12} {'speedup':>10}")
+    for n in (1_000, 10_000, 100_000, 1_000_000):
+        rng = random.Random(n)
+        records = [(uid, [rng.randint(0, 100) for _ in range(3)]) for uid in range(1, n + 1)]
+        uids = [uid for uid, _ in records]
+
+        service = ScoreService()
+        started = time.perf_counter()
+        service.load_bulk(records)
+        load = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for uid in uids:
+            service.get_scores_for_user(uid)
+        indexed = time.perf_counter() - started
+
+        sample = uids if n <= LINEAR_FULL_LIMIT else rng.sample(uids, LINEAR_SAMPLE)
+        started = time.perf_counter()
+        for uid in sample:
+            linear_lookup(records, uid)
+        linear = (time.perf_counter() - started) * n / len(sample)
+        estimated = '' if n <= LINEAR_FULL_LIMIT else '~'
+
+        print(f"{n:>9} {load:>8.3f} {indexed:>10.3f} {estimated + format(linear, '.1f'):>12} {linear / indexed:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
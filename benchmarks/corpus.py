@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+离线基准用的 HTML 语料与本地 HTTP 替身服务器
+
+每类页面挂在各自的路径前缀下（/cjk_heavy/ 等），子页面（about、privacy…）
+同样存在，PageFetcher.run 在主页面没有中文时会照常逐个检查子页面。
+语料由固定种子生成，同一版本的代码每次得到完全相同的字节。
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_site import LocalSite
+
+CORPUS_KINDS = ('cjk_heavy', 'latin_only', 'huge', 'comment_heavy')
+SUBPAGES = ('about', 'privacy', 'contact', 'team', 'company', 'careers')
+
+LATIN_WORDS = ('company', 'product', 'service', 'customer', 'platform', 'global', 'solution', 'team',
+               'quality', 'support', 'delivery', 'partner', 'the', 'and', 'of', 'for', 'with', 'our')
+CJK_TEXT = ('我们公司成立于二零零八年总部位于北京在上海深圳广州杭州成都设有分公司'
+            '致力于为客户提供优质的产品与服务王经理李总监张工程师刘主管陈顾问欢迎联系')
+
+
+def _latin(rng, words):
+    return ' '.join(rng.choice(LATIN_WORDS) for _ in range(words))
+
+
+def _cjk(rng, chars):
+    start = rng.randrange(len(CJK_TEXT))
+    return ''.join(CJK_TEXT[(start + i) % len(CJK_TEXT)] for i in range(chars))
+
+
+def _page(title, head, body):
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title}</title>{head}</head>'
+            f'<body>{body}</body></html>')
+
+
+def _nav():
+    return '<nav>' + ''.join(f'<a href="{name}">{name.title()}</a>' for name in SUBPAGES) + '</nav>'
+
+
+def cjk_heavy_page(rng, blocks=300):
+    """中文企业官网首页：大段中文正文、中文 meta 与导航"""
+    head = ('<meta name="description" content="北京示例科技有限公司官网">'
+            '<meta property="og:title" content="示例科技">')
+    body = [_nav()]
+    for i in range(blocks):
+        body.append(f'<section class="s{i % 5}"><h2>{_cjk(rng, 8)}</h2><p>{_cjk(rng, 120)}</p>'
+                    f'<a href="/news/{i}">{_cjk(rng, 6)}</a></section>')
+    return _page('示例科技', head, ''.join(body))
+
+
+def latin_only_page(rng, blocks=300):
+    """纯英文页面：主页面与子页面都没有中文，会触发全部子页面检查"""
+    head = '<meta name="description" content="Example Corp homepage">'
+    body = [_nav()]
+    for i in range(blocks):
+        body.append(f'<div class="row"><h3>{_latin(rng, 4)}</h3><p>{_latin(rng, 60)}</p>'
+                    f'<a href="https://github.com/example{i}">source</a></div>')
+        if i % 40 == 0:
+            body.append(f'<script>// analytics {i}\nvar n = {i}; /* counter */</script>')
+    return _page('Example Corp', head, ''.join(body))
+
+
+def huge_page(rng, size=4 * 1024 * 1024):
+    """约 4 MB 的大表格页面，中文只出现在末尾（低于默认的 5 MB 读取上限）"""
+    rows = []
+    total = 0
+    i = 0
+    while total < size:
+        row = (f'<tr><td>{i}</td><td>{_latin(rng, 12)}</td><td><a href="/item/{i}">item {i}</a></td>'
+               f'<td>{rng.randint(0, 10 ** 6)}</td></tr>')
+        rows.append(row)
+        total += len(row)
+        i += 1
+    body = f'{_nav()}<table>{"".join(rows)}</table><footer>{_cjk(rng, 40)}</footer>'
+    return _page('Catalogue', '', body)
+
+
+def comment_heavy_page(rng, blocks=400):
+    """正文为英文，中文只出现在 HTML、JS 与 CSS 注释中"""
+    body = [_nav()]
+    for i in range(blocks):
+        body.append(f'<!-- {_cjk(rng, 30)} --><div><p>{_latin(rng, 30)}</p></div>')
+        if i % 10 == 0:
+            body.append(f'<script>// {_cjk(rng, 20)}\nvar x{i} = {i}; /* {_cjk(rng, 20)} */</script>')
+            body.append(f'<style>/* {_cjk(rng, 20)} */ .c{i} {{ color: #{i:06x} }}</style>')
+    return _page('Example', '', ''.join(body))
+
+
+_MAIN_PAGES = {
+    'cjk_heavy': cjk_heavy_page,
+    'latin_only': latin_only_page,
+    'huge': huge_page,
+    'comment_heavy': comment_heavy_page,
+}
+
+
+def make_corpus(seed=0):
+    """返回 {路径: HTML}，包含各类页面的主页面与子页面"""
+    pages = {}
+    for kind in CORPUS_KINDS:
+        rng = random.Random(f'{seed}:{kind}')
+        pages[f'/{kind}/'] = _MAIN_PAGES[kind](rng)
+        for name in SUBPAGES:
+            if kind == 'cjk_heavy':
+                sub = cjk_heavy_page(rng, blocks=20)
+            else:
+                sub = latin_only_page(rng, blocks=20)
+            pages[f'/{kind}/{name}'] = sub
+    return pages
+
+
+class CorpusServer(LocalSite):
+    """提供语料页面的本地服务器；page_url(kind) 为该类页面的主页面地址"""
+
+    def __init__(self, seed=0):
+        super().__init__()
+        for path, html in make_corpus(seed).items():
+            self.add(path, html)
+
+    def page_url(self, kind):
+        return self.url + kind + '/'
+
+    def page_bytes(self, kind):
+        return len(self.pages[f'/{kind}/'][2])
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    for path, html in sorted(make_corpus().items()):
+        if path.count('/') == 2 and path.endswith('/'):
+            print(f'{path:<18} {len(html.encode("utf-8")) / 1024:>10.1f} KB')
+
+
+if __name__ == '__main__':
+    main()
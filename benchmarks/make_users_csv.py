@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+合成用户 CSV 生成器（analyze_user_profiles 与 /api/analyze 的输入）
+
+分批生成并写入文件，内存占用与行数无关，1 千到 1 千万行均可。
+字段分布与 bench_columnar.make_csv 相同：年龄 18-60，1-5 个 50-100 的成绩，
+城市代码中包含参考表之外的未知城市；固定种子下输出逐字节相同。
+
+用法: python benchmarks/make_users_csv.py 行数 输出文件 [种子]
+"""
+
+import random
+import sys
+
+BATCH_ROWS = 10_000
+CITY_CODES = (101, 102, 103, 104)
+
+
+def iter_csv_batches(rows: int, seed: int = 0):
+    """逐批生成 CSV 文本，第一批以表头开始"""
+    rng = random.Random(seed)
+    randint, choice = rng.randint, rng.choice
+    lines = ['user_id,user_name,age,city_identifier,scores']
+    for uid in range(1, rows + 1):
+        scores = ','.join(str(randint(50, 100)) for _ in range(randint(1, 5)))
+        lines.append(f'{uid},user{uid},{randint(18, 60)},{choice(CITY_CODES)},"{scores}"')
+        if len(lines) >= BATCH_ROWS:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def write_users_csv(path: str, rows: int, seed: int = 0) -> int:
+    """写入 rows 行用户数据，返回文件字节数"""
+    size = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for batch in iter_csv_batches(rows, seed):
+            f.write(batch)
+            size += len(batch)
+    return size
+
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__.strip().splitlines()[-1])
+        sys.exit(1)
+    rows = int(sys.argv[1].replace('_', ''))
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    size = write_users_csv(sys.argv[2], rows, seed)
+    print(f'{rows} 行, {size / 1024 / 1024:.1f} MB -> {sys.argv[2]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+离线基准套件
+在本地替身服务器上的语料页面测 PageFetcher.run，在合成 CSV 上测 /api/analyze，
+报告吞吐量、p50/p99 延迟与峰值 RSS，结果写成 JSON，可与之前的结果对比。
+
+每个场景在独立的子进程中执行，峰值 RSS 互不影响；替身服务器运行在父进程中，
+不计入被测进程的开销。首轮为预热，不计入统计。
+
+用法:
+    python benchmarks/suite.py run [--only fetch|api] [--rows 1000,10000,100000]
+                                   [--engines python,columnar] [--output results.json]
+    python benchmarks/suite.py compare 旧结果.json 新结果.json [--threshold 0.1]
+
+compare 对比两次结果，任一场景的 p50 / 吞吐量退化超过阈值时以状态码 1 退出。
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+SUITE_VERSION = 1
+DEFAULT_ROWS = (1_000, 10_000, 100_000)
+
+
+def percentile(samples, q):
+    """线性插值的精确分位数，q 取 0-1"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def peak_rss_mb():
+    """本进程的峰值 RSS（Linux 以 KB 计，macOS 以字节计）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def summarize(latencies, work, unit, setup_rss):
+    """由每轮耗时（秒）与每轮工作量汇总一个场景的结果"""
+    total = sum(latencies)
+    return {
+        'iterations': len(latencies),
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'mean_ms': round(total / len(latencies) * 1000, 3),
+        'throughput': round(work * len(latencies) / total, 3) if total else 0.0,
+        'throughput_unit': unit,
+        'setup_rss_mb': setup_rss,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def measure(func, repeat):
+    func()
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def fetch_scenario(url, repeat):
+    """PageFetcher.run 的端到端耗时（含网络读取、解析与子页面检查），吞吐以页面/秒计"""
+    from loguru import logger
+    from page_fetcher import PageFetcher
+
+    logger.remove()
+    fetcher = PageFetcher()
+    setup_rss = peak_rss_mb()
+    latencies = measure(lambda: fetcher.run(url), repeat)
+    return summarize(latencies, 1, 'pages/s', setup_rss)
+
+
+def api_scenario(csv_path, rows, engine, detail, repeat):
+    """/api/analyze 的端到端耗时（含上传、分析与序列化），吞吐以行/秒计
+
+    关闭上传去重缓存并提高异步任务阈值，每轮都走同步分析路径。
+    """
+    from fastapi.testclient import TestClient
+
+    import main
+    from upload_cache import UploadCache
+
+    main.upload_cache = UploadCache(max_bytes=0)
+    main.JOB_THRESHOLD_BYTES = float('inf')
+    client = TestClient(main.app)
+    setup_rss = peak_rss_mb()
+
+    def post():
+        with open(csv_path, 'rb') as f:
+            response = client.post(f'/api/analyze?engine={engine}&detail={detail}',
+                                   files={'file': ('users.csv', f, 'text/csv')})
+        response.raise_for_status()
+
+    latencies = measure(post, repeat)
+    return summarize(latencies, rows, 'rows/s', setup_rss)
+
+
+def run_worker(spec):
+    """子进程入口：执行一个场景并把结果以 JSON 写到标准输出"""
+    if spec['kind'] == 'fetch':
+        result = fetch_scenario(spec['url'], spec['repeat'])
+        result['page_bytes'] = spec['page_bytes']
+    else:
+        result = api_scenario(spec['csv_path'], spec['rows'], spec['engine'], spec['detail'], spec['repeat'])
+        result['rows'] = spec['rows']
+    print(json.dumps(result))
+
+
+def run_in_subprocess(spec):
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '_worker', json.dumps(spec)],
+        cwd=ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"场景 {spec['name']} 失败:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'git_commit': commit,
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+    }
+
+
+def api_repeat(rows, repeat):
+    """大文件只跑少量轮次"""
+    return max(1, min(repeat, 10_000_000 // (rows * 10) or 1))
+
+
+def run_suite(args):
+    from corpus import CORPUS_KINDS, CorpusServer
+    from make_users_csv import write_users_csv
+
+    results = {}
+
+    def record(spec):
+        print(f"{spec['name']:<32}", end=' ', flush=True)
+        result = run_in_subprocess(spec)
+        results[spec['name']] = result
+        print(f"p50 {result['p50_ms']:>10.2f} ms  p99 {result['p99_ms']:>10.2f} ms  "
+              f"{result['throughput']:>12.1f} {result['throughput_unit']:<8} "
+              f"peak RSS {result['peak_rss_mb']:>7.1f} MB")
+
+    if args.only in (None, 'fetch'):
+        with CorpusServer(args.seed) as server:
+            for kind in CORPUS_KINDS:
+                record({'name': f'fetch/{kind}', 'kind': 'fetch', 'url': server.page_url(kind),
+                        'page_bytes': server.page_bytes(kind), 'repeat': args.repeat})
+
+    if args.only in (None, 'api'):
+        data_dir = args.data_dir or tempfile.mkdtemp(prefix='bench-suite-')
+        os.makedirs(data_dir, exist_ok=True)
+        for rows in args.rows:
+            csv_path = os.path.join(data_dir, f'users-{rows}-{args.seed}.csv')
+            if not os.path.exists(csv_path):
+                write_users_csv(csv_path, rows, args.seed)
+            try:
+                for engine in args.engines:
+                    record({'name': f'api/{engine}/{rows}', 'kind': 'api', 'csv_path': csv_path, 'rows': rows,
+                            'engine': engine, 'detail': args.detail, 'repeat': api_repeat(rows, args.repeat)})
+            finally:
+                if not args.data_dir:
+                    os.unlink(csv_path)
+        if not args.data_dir:
+            os.rmdir(data_dir)
+
+    report = {
+        'suite_version': SUITE_VERSION,
+        'environment': environment(),
+        'parameters': {'seed': args.seed, 'repeat': args.repeat, 'detail': args.detail},
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f'结果已写入 {args.output}')
+    return report
+
+
+def compare(old, new, threshold):
+    """打印各场景的变化，返回退化的场景名列表
+
+    延迟以 p50 判断（p99 受偶发抖动影响大，只展示），吞吐量下降同样计为退化。
+    """
+    regressions = []
+    print(f"{'scenario':<32} {'p50 ms':>21} {'p99 ms':>21} {'throughput':>25} {'peak RSS MB':>19}")
+    for name, current in new['results'].items():
+        previous = old['results'].get(name)
+        if previous is None:
+            print(f'{name:<32} （新场景）')
+            continue
+
+        def cell(key, width):
+            before, after = previous[key], current[key]
+            change = (after - before) / before if before else 0.0
+            return f'{after:>{width - 9}.1f} ({change:+6.1%})', change
+
+        p50, p50_change = cell('p50_ms', 21)
+        p99, _ = cell('p99_ms', 21)
+        throughput, throughput_change = cell('throughput', 25)
+        rss, _ = cell('peak_rss_mb', 19)
+        regressed = p50_change > threshold or throughput_change < -threshold
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<32} {p50} {p99} {throughput} {rss}{'  退化' if regressed else ''}")
+    return regressions
+
+
+def _int_list(value):
+    return [int(item.replace('_', '')) for item in value.split(',') if item]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='离线基准套件')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='运行基准')
+    run.add_argument('--only', choices=('fetch', 'api'))
+    run.add_argument('--rows', type=_int_list, default=list(DEFAULT_ROWS), help='CSV 行数，逗号分隔，最多 1 千万')
+    run.add_argument('--engines', type=lambda v: v.split(','), default=['python'], help='分析引擎，逗号分隔')
+    run.add_argument('--detail', choices=('inline', 'deferred'), default='inline')
+    run.add_argument('--repeat', type=int, default=10, help='每个场景的计时轮数（大文件自动减少）')
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--data-dir', help='保留生成的 CSV 以便复用；默认使用临时目录并在结束后删除')
+    run.add_argument('--output', help='结果 JSON 文件')
+
+    cmp = commands.add_parser('compare', help='对比两次结果')
+    cmp.add_argument('old')
+    cmp.add_argument('new')
+    cmp.add_argument('--threshold', type=float, default=0.1, help='视为退化的相对变化，默认 0.1')
+
+    worker = commands.add_parser('_worker')
+    worker.add_argument('spec')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run_suite(args)
+    elif args.command == 'compare':
+        with open(args.old, encoding='utf-8') as f:
+            old = json.load(f)
+        with open(args.new, encoding='utf-8') as f:
+            new = json.load(f)
+        if compare(old, new, args.threshold):
+            sys.exit(1)
+    else:
+        run_worker(json.loads(args.spec))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,8 @@
 # -*- coding: utf-8 -*-
+import codecs
+import csv
+import sys
+from array import array
 
 USERS = [
     {"user_id": 1, "user_name": "Alice", "age": 25, "city_identifier": 101},
@@ -13,8 +17,17 @@ CITIES_REFERENCE = {
     103: "Tokyo"
 }
 
+ELIGIBLE_MAX_AGE = 30
+ELIGIBLE_MIN_AVG_SCORE = 90.0
+
 class ScoreService:
+    """成绩查询服务，按 user_id 建立索引，单次查询 O(1)
+
+    每个用户的成绩以紧凑的 array('q') 保存，查询时返回新的 list。
+    """
+
     def __init__(self):
+        self._index = {}
         self._score_records = [
             (1, [88, 92, 76]),
             (2, [95, 89]),
@@ -22,17 +35,149 @@ class ScoreService:
             (4, [59, 65, 71])
         ]
 
+    @property
+    def _score_records(self):
+        return [(uid, list(scores)) for uid, scores in self._index.items()]
+
+    @_score_records.setter
+    def _score_records(self, records):
+        # 与原先线性查找一致：user_id 重复时以第一条为准
+        self._index = {}
+        for uid, scores in records:
+            if uid not in self._index:
+                self._index[uid] = array('q', scores)
+
+    def load_bulk(self, records):
+        """用 (user_id, scores) 序列整体替换成绩数据，user_id 重复时以最后一条为准"""
+        index = {}
+        for uid, scores in records:
+            index[uid] = array('q', scores)
+        self._index = index
+
     def get_scores_for_user(self, uid):
-        for user_id, scores in self._score_records:
-            if user_id == uid:
-                return scores
-        return []
+        scores = self._index.get(uid)
+        if scores is None:
+            return []
+        return list(scores)
 
 def lookup_city(city_code):
     return CITIES_REFERENCE.get(city_code, "Unknown")
 
-def analyze_user_profiles(csv_file_path=None):
-    import csv
+def _parse_scores(scores_field):
+    scores_str = scores_field.strip('"')
+    return [int(s.strip()) for s in scores_str.split(',')]
+
+class UserRecord:
+    """紧凑的逐行分析结果
+
+    地区为驻留字符串，合格状态为布尔值；只在序列化时通过 to_dict 生成
+    与原来相同的字典（Name / Location / avg_score / EligibleStatus）。
+    """
+
+    __slots__ = ('name', 'location', 'avg_score', 'eligible')
+
+    def __init__(self, name, location, avg_score, eligible):
+        self.name = name
+        self.location = location
+        self.avg_score = avg_score
+        self.eligible = eligible
+
+    def to_dict(self):
+        return {
+            "Name": self.name,
+            "Location": self.location,
+            "avg_score": self.avg_score,
+            "EligibleStatus": "YES" if self.eligible else "NO"
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, UserRecord):
+            return NotImplemented
+        return (self.name, self.location, self.avg_score, self.eligible) == \
+            (other.name, other.location, other.avg_score, other.eligible)
+
+    def __repr__(self):
+        return f"UserRecord({self.name!r}, {self.location!r}, {self.avg_score!r}, {self.eligible!r})"
+
+
+class UserRecords:
+    """UserRecord 列表的包装，rows(start, stop) 按需生成字典，接口与 ColumnarResult 相同"""
+
+    __slots__ = ('records',)
+
+    def __init__(self, records):
+        self.records = records
+
+    def __len__(self):
+        return len(self.records)
+
+    def rows(self, start=0, stop=None):
+        return [record.to_dict() for record in self.records[start:stop]]
+
+
+def _analyze_record(user_name, age, city_identifier, scores):
+    city = sys.intern(lookup_city(city_identifier))
+
+    total_score = sum(scores)
+    average_score = 0
+    if scores:
+        average_score = total_score / len(scores)
+
+    is_eligible = age <= ELIGIBLE_MAX_AGE and average_score >= ELIGIBLE_MIN_AVG_SCORE
+    return UserRecord(user_name.title(), city, average_score, is_eligible)
+
+def _analyze_user(user_name, age, city_identifier, scores):
+    return _analyze_record(user_name, age, city_identifier, scores).to_dict()
+
+def iter_csv_lines(file_obj, chunk_size=64 * 1024, encoding='utf-8'):
+    """按块读取二进制文件并增量解码，逐行产出文本（保留换行符，供 csv.reader 使用）"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ''
+    while True:
+        chunk = file_obj.read(chunk_size)
+        if not chunk:
+            break
+        lines = (pending + decoder.decode(chunk)).split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + '\n'
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+def iter_user_profiles(csv_lines):
+    """逐行解析 CSV 并逐行产出分析结果，内存占用与文件大小无关
+
+    与 analyze_user_profiles 的区别：每行使用本行自己的 scores；
+    analyze_user_profiles 中 user_id 重复时，所有同 id 的行都取最后一行的 scores。
+    """
+    for record in iter_user_records(csv_lines):
+        yield record.to_dict()
+
+def iter_user_records(csv_lines):
+    """与 iter_user_profiles 相同，但产出紧凑的 UserRecord"""
+    reader = csv.reader(csv_lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = {name: i for i, name in enumerate(header)}
+    name_col = columns['user_name']
+    age_col = columns['age']
+    city_col = columns['city_identifier']
+    scores_col = columns['scores']
+
+    for row in reader:
+        if not row:
+            continue
+        yield _analyze_record(
+            row[name_col],
+            int(row[age_col]),
+            int(row[city_col]),
+            _parse_scores(row[scores_col])
+        )
+
+def analyze_user_profiles(csv_file_path=None, compact=False):
+    """compact 为 True 时返回 UserRecord 列表，否则返回字典列表"""
     import io
     
     score_service_conn = ScoreService()
@@ -40,7 +185,6 @@ def analyze_user_profiles(csv_file_path=None):
     
     if csv_file_path:
         users_data = []
-        scores_data = {}
         
         if isinstance(csv_file_path, str):
             with open(csv_file_path, 'r', encoding='utf-8') as file:
@@ -48,52 +192,29 @@ def analyze_user_profiles(csv_file_path=None):
         else:
             csv_content = csv_file_path.decode('utf-8')
         
-        csv_reader = csv.DictReader(io.StringIO(csv_content))
-        for row in csv_reader:
-            user_data = {
-                'user_id': int(row['user_id']),
-                'user_name': row['user_name'],
-                'age': int(row['age']),
-                'city_identifier': int(row['city_identifier'])
-            }
-            users_data.append(user_data)
-            
-            scores_str = row['scores'].strip('"')
-            scores = [int(s.strip()) for s in scores_str.split(',')]
-            scores_data[user_data['user_id']] = scores
+        def score_rows():
+            csv_reader = csv.DictReader(io.StringIO(csv_content))
+            for row in csv_reader:
+                user_id = int(row['user_id'])
+                users_data.append((
+                    user_id,
+                    row['user_name'],
+                    int(row['age']),
+                    int(row['city_identifier'])
+                ))
+                
+                yield user_id, _parse_scores(row['scores'])
         
-        score_service_conn._score_records = [(uid, scores) for uid, scores in scores_data.items()]
+        score_service_conn.load_bulk(score_rows())
         users = users_data
     else:
-        users = USERS
-
-    for user_profile in users:
-        user_id = user_profile.get("user_id")
-        user_name = user_profile["user_name"]
-        age = user_profile["age"]
-
-        city = lookup_city(user_profile["city_identifier"])
+        users = [(u.get("user_id"), u["user_name"], u["age"], u["city_identifier"]) for u in USERS]
 
+    for user_id, user_name, age, city_identifier in users:
         scores = score_service_conn.get_scores_for_user(user_id)
 
-        total_score = sum(scores)
-        average_score = 0
-        if scores:
-            average_score = total_score / len(scores)
-
-        is_eligible = False
-        if age <= 30 and average_score >= 90.0:
-            is_eligible = "YES"
-        else:
-            is_eligible = "NO"
-
-        user_info = {
-            "Name": user_name.title(),
-            "Location": city,
-            "avg_score": average_score,
-            "EligibleStatus": is_eligible
-        }
-        processed_data.append(user_info)
+        record = _analyze_record(user_name, age, city_identifier, scores)
+        processed_data.append(record if compact else record.to_dict())
 
     return processed_data
 
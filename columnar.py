@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+列式分析引擎（可选，需要 numpy）
+
+把 CSV 读入按列存储的定长数组，用批量运算计算平均分、合格标记、地区映射
+与按地区的分组统计，输出与逐行引擎完全一致。
+"""
+import csv
+from array import array
+
+from aggregation import ProfileAggregator
+from bug_script import ELIGIBLE_MAX_AGE, ELIGIBLE_MIN_AVG_SCORE, lookup_city
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - 取决于运行环境
+    np = None
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("列式引擎需要 numpy，请先执行 pip install numpy")
+
+
+class UserColumns:
+    """按列存储的用户数据，成绩以 offsets 分段保存在一个扁平数组中"""
+
+    def __init__(self, user_id, user_name, age, city_identifier, score_offsets, scores):
+        _require_numpy()
+        self.user_id = np.asarray(user_id, dtype=np.int64)
+        self.user_name = user_name
+        self.age = np.asarray(age, dtype=np.int64)
+        self.city_identifier = np.asarray(city_identifier, dtype=np.int64)
+        self.score_offsets = np.asarray(score_offsets, dtype=np.int64)
+        self.scores = np.asarray(scores, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.user_name)
+
+    @classmethod
+    def from_csv_lines(cls, csv_lines):
+        """从 CSV 行逐行填充各列，不保留原始文本"""
+        user_id, age, city_identifier = array('q'), array('q'), array('q')
+        score_offsets, scores = array('q', [0]), array('q')
+        user_name = []
+
+        reader = csv.reader(csv_lines)
+        header = next(reader, None)
+        if header is not None:
+            columns = {name: i for i, name in enumerate(header)}
+            id_col = columns['user_id']
+            name_col = columns['user_name']
+            age_col = columns['age']
+            city_col = columns['city_identifier']
+            scores_col = columns['scores']
+
+            for row in reader:
+                if not row:
+                    continue
+                user_id.append(int(row[id_col]))
+                user_name.append(row[name_col])
+                age.append(int(row[age_col]))
+                city_identifier.append(int(row[city_col]))
+                scores.extend(int(s.strip()) for s in row[scores_col].strip('"').split(','))
+                score_offsets.append(len(scores))
+
+        return cls(user_id, user_name, age, city_identifier, score_offsets, scores)
+
+    def take(self, indices):
+        """按行号（升序）取出部分用户，成绩数组随之重新分段"""
+        indices = np.asarray(indices, dtype=np.int64)
+        starts = self.score_offsets[indices]
+        counts = self.score_offsets[indices + 1] - starts
+        score_offsets = np.concatenate(([0], np.cumsum(counts)))
+        positions = np.repeat(starts - score_offsets[:-1], counts) + np.arange(score_offsets[-1])
+        return UserColumns(
+            self.user_id[indices], [self.user_name[i] for i in indices.tolist()],
+            self.age[indices], self.city_identifier[indices], score_offsets, self.scores[positions])
+
+    def select(self, min_age=None, max_age=None, cities=None):
+        """按年龄范围与城市代码筛选用户，保持原有顺序"""
+        mask = np.ones(len(self), dtype=bool)
+        if min_age is not None:
+            mask &= self.age >= min_age
+        if max_age is not None:
+            mask &= self.age <= max_age
+        if cities:
+            mask &= np.isin(self.city_identifier, list(cities))
+        if mask.all():
+            return self
+        return self.take(np.flatnonzero(mask))
+
+    def score_sums(self):
+        """每个用户的成绩总和与成绩个数"""
+        cumulative = np.concatenate(([0], np.cumsum(self.scores, dtype=np.int64)))
+        sums = cumulative[self.score_offsets[1:]] - cumulative[self.score_offsets[:-1]]
+        counts = np.diff(self.score_offsets)
+        return sums, counts
+
+
+class ColumnarResult:
+    """列式计算结果：逐行数据仍以数组保存，只在需要时生成字典"""
+
+    def __init__(self, columns, averages, eligible, location_names, location_codes, aggregator):
+        self.columns = columns
+        self.averages = averages
+        self.eligible = eligible
+        self.location_names = location_names
+        self.location_codes = location_codes
+        self.aggregator = aggregator
+
+    def __len__(self):
+        return len(self.columns)
+
+    def rows(self, start=0, stop=None):
+        """生成 [start, stop) 范围内的逐行结果字典"""
+        window = slice(start, stop)
+        counts = np.diff(self.columns.score_offsets)[window]
+        average_list = self.averages[window].tolist()
+        for i in np.flatnonzero(counts == 0).tolist():
+            average_list[i] = 0
+        location_names = self.location_names
+        return [
+            {
+                "Name": name.title(),
+                "Location": location_names[code],
+                "avg_score": average,
+                "EligibleStatus": "YES" if is_eligible else "NO"
+            }
+            for name, code, average, is_eligible in zip(
+                self.columns.user_name[window], self.location_codes[window].tolist(),
+                average_list, self.eligible[window].tolist())
+        ]
+
+
+def compute_columns(columns):
+    """批量计算平均分、合格标记、地区映射与按地区的分组统计
+
+    汇总结果以 ProfileAggregator 返回，与逐行累加得到的结果一致：
+    分数总和按行顺序依次累加（cumsum / add.at），保证浮点结果逐位相同。
+    """
+    _require_numpy()
+    n = len(columns)
+    sums, counts = columns.score_sums()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        averages = np.where(counts > 0, sums / np.maximum(counts, 1), 0.0)
+    eligible = (columns.age <= ELIGIBLE_MAX_AGE) & (averages >= ELIGIBLE_MIN_AVG_SCORE)
+
+    city_codes, first_index, city_inverse = np.unique(
+        columns.city_identifier, return_index=True, return_inverse=True)
+    city_names = [lookup_city(int(code)) for code in city_codes]
+
+    # 地区按首次出现的顺序编号，与逐行统计时字典的插入顺序一致
+    location_names = list(dict.fromkeys(city_names[i] for i in np.argsort(first_index, kind='stable')))
+    location_index = {name: i for i, name in enumerate(location_names)}
+    city_to_location = np.array([location_index[name] for name in city_names], dtype=np.int64)
+    location_codes = city_to_location[city_inverse]
+
+    location_counts = np.bincount(location_codes, minlength=len(location_names))
+    location_eligible = np.bincount(location_codes[eligible], minlength=len(location_names))
+    location_sums = np.zeros(len(location_names))
+    np.add.at(location_sums, location_codes, averages)
+
+    location_stats = {
+        name: {
+            'count': int(location_counts[i]),
+            'avg_score': float(location_sums[i]),
+            'eligible': int(location_eligible[i])
+        }
+        for i, name in enumerate(location_names)
+    }
+    score_total = float(np.cumsum(averages)[-1]) if n else 0
+    aggregator = ProfileAggregator(n, int(eligible.sum()), score_total, location_stats)
+    return ColumnarResult(columns, averages, eligible, location_names, location_codes, aggregator)
+
+
+def analyze_columns(columns):
+    """返回 (逐行结果, ProfileAggregator)，与逐行引擎的输出一致"""
+    result = compute_columns(columns)
+    return result.rows(), result.aggregator
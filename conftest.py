@@ -0,0 +1,22 @@
+import sys
+
+import pytest
+
+from local_site import LocalSite
+from upload_cache import UploadCache
+
+
+@pytest.fixture
+def local_site():
+    site = LocalSite()
+    site.start()
+    yield site
+    site.stop()
+
+
+@pytest.fixture(autouse=True)
+def _no_upload_cache(monkeypatch):
+    """默认关闭上传去重缓存，避免对比不同引擎的测试直接命中缓存"""
+    main = sys.modules.get('main')
+    if main is not None:
+        monkeypatch.setattr(main, 'upload_cache', UploadCache(max_bytes=0))
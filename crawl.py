@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+批量抓取：从文件逐行读取网址，结果以 JSONL 流式写出，可断点续跑
+
+    python -m page_fetcher crawl input.txt -o results.jsonl
+
+输入每行一个网址（或裸域名，自动补 https://），空行与 # 开头的行忽略。
+结果按完成顺序写出，每行带有输入中的行号 line；同一网址只会出现一次。
+
+检查点记录：
+    offset / line   输入中此前的行全部完成（水位线）
+    done            水位线之后已完成的行号
+    output_bytes    保存检查点时输出文件的长度
+续跑时先把输出截断到 output_bytes（丢弃检查点之后写出的行，它们会重新抓取），
+再从 offset 处继续读取输入并跳过 done 中的行号。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from loguru import logger
+
+from tiered_cache import atomic_open
+
+OUTPUT_BUFFER_BYTES = 1024 * 1024
+DEFAULT_CONCURRENCY = 50
+DEFAULT_CHECKPOINT_EVERY = 100
+DEFAULT_MAX_WINDOW = 10000
+
+
+def normalize_url(line):
+    """去掉空白；空行与注释返回 None，裸域名补全为 https"""
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    if '://' not in line:
+        line = 'https://' + line
+    return line
+
+
+def iter_input(path, offset=0, line=0):
+    """从字节偏移 offset 处逐行读取，产出 (行号, 该行结束处的偏移, 网址或 None)"""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for raw in f:
+            offset += len(raw)
+            yield line, offset, normalize_url(raw.decode('utf-8', 'replace'))
+            line += 1
+
+
+class CrawlProgress:
+    """已完成行号的水位线；水位线之后完成的行号单独记录"""
+
+    def __init__(self, offset=0, line=0, done=(), output_bytes=0):
+        self.offset = offset
+        self.line = line
+        self.done = set(done)
+        self.output_bytes = output_bytes
+        self._ends = {}
+
+    def start(self, line, end_offset):
+        self._ends[line] = end_offset
+
+    def finish(self, line):
+        self.done.add(line)
+        while self.line in self.done:
+            self.done.remove(self.line)
+            self.offset = self._ends.pop(self.line)
+            self.line += 1
+
+    def window(self, line):
+        """line 与水位线之间的行数"""
+        return line - self.line
+
+    def to_dict(self):
+        return {'offset': self.offset, 'line': self.line, 'done': sorted(self.done),
+                'output_bytes': self.output_bytes}
+
+    @classmethod
+    def load(cls, path):
+        """读取检查点；文件不存在时返回 None"""
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        return cls(data['offset'], data['line'], data['done'], data['output_bytes'])
+
+    def save(self, path):
+        """先写临时文件再原子替换，崩溃时不会留下半个检查点"""
+        with atomic_open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+
+
+async def _run_one(fetcher, line, url, mode):
+    """抓取一个网址；意外异常记为该行的错误结果，不中断整批任务"""
+    try:
+        result = await fetcher.run(url, mode)
+    except Exception as e:
+        logger.error(f"分析网址失败 {url}: {e}")
+        result = {'url': url, 'error': f'{type(e).__name__}: {e}'}
+    return line, result
+
+
+async def crawl(fetcher, input_path, output_path, checkpoint_path=None, mode='full',
+                concurrency=DEFAULT_CONCURRENCY, checkpoint_every=DEFAULT_CHECKPOINT_EVERY,
+                max_window=DEFAULT_MAX_WINDOW, progress=None):
+    """抓取 input_path 中的全部网址，返回本次完成的网址数
+
+    fetcher 需提供 ``async run(url, mode)``（如 AsyncPageFetcher）。
+    同时在途的网址不超过 concurrency 个；水位线之后最多读取 max_window 行，
+    某个网址迟迟未完成时暂停读取，检查点中的 done 列表因此有上限。
+    progress 为可选回调，每次保存检查点后以 (本次完成数, 水位线行号) 调用。
+    """
+    checkpoint_path = checkpoint_path or output_path + '.checkpoint'
+    state = CrawlProgress.load(checkpoint_path)
+    if state is None:
+        state = CrawlProgress()
+        out = open(output_path, 'wb', buffering=OUTPUT_BUFFER_BYTES)
+    else:
+        out = open(output_path, 'r+b', buffering=OUTPUT_BUFFER_BYTES)
+        out.truncate(state.output_bytes)
+        out.seek(state.output_bytes)
+        logger.info(f"从检查点续跑: 第 {state.line} 行起，另有 {len(state.done)} 行已完成")
+    resumed_done = set(state.done)
+
+    tasks = set()
+    completed = 0
+
+    def checkpoint():
+        out.flush()
+        os.fsync(out.fileno())
+        state.output_bytes = out.tell()
+        state.save(checkpoint_path)
+        if progress:
+            progress(completed, state.line)
+
+    async def drain():
+        nonlocal completed
+        finished, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in finished:
+            tasks.discard(task)
+            line, result = task.result()
+            out.write(json.dumps(dict(result, line=line), ensure_ascii=False).encode('utf-8') + b'\n')
+            state.finish(line)
+            completed += 1
+            if completed % checkpoint_every == 0:
+                checkpoint()
+
+    try:
+        for line, end_offset, url in iter_input(input_path, state.offset, state.line):
+            state.start(line, end_offset)
+            if url is None or line in resumed_done:
+                resumed_done.discard(line)
+                state.done.discard(line)
+                state.finish(line)
+                continue
+            while len(tasks) >= concurrency or (tasks and state.window(line) >= max_window):
+                await drain()
+            tasks.add(asyncio.ensure_future(_run_one(fetcher, line, url, mode)))
+        while tasks:
+            await drain()
+    finally:
+        for task in tasks:
+            task.cancel()
+        checkpoint()
+        out.close()
+    return completed
+
+
+def main(argv=None):
+    from page_fetcher import DEFAULT_LEXICON, AsyncPageFetcher, PARSER_BACKENDS, RUN_MODES, SUBPAGE_STRATEGIES
+
+    parser = argparse.ArgumentParser(prog='python -m page_fetcher', description='网页中文属性批量分析')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('crawl', help='批量抓取文件中的网址，结果写为 JSONL，可断点续跑')
+    run.add_argument('input', help='网址列表文件，每行一个')
+    run.add_argument('-o', '--output', help='输出 JSONL 文件，默认为输入文件名加 .jsonl')
+    run.add_argument('--checkpoint', help='检查点文件，默认为输出文件名加 .checkpoint')
+    run.add_argument('--mode', choices=RUN_MODES, default='full')
+    run.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='同时在途的网址数')
+    run.add_argument('--per-host', type=int, default=4, help='单主机并发上限')
+    run.add_argument('--parser', choices=PARSER_BACKENDS, default='html.parser')
+    run.add_argument('--subpage-strategy', choices=SUBPAGE_STRATEGIES, default='all')
+    run.add_argument('--lexicon', help='补充城市与姓氏的词表文件（[cities] / [surnames] 分节）')
+    run.add_argument('--checkpoint-every', type=int, default=DEFAULT_CHECKPOINT_EVERY,
+                     help='每完成多少个网址保存一次检查点')
+    run.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args(argv)
+
+    logger.remove()
+    logger.add(sys.stderr, level=args.log_level)
+    output = args.output or os.path.splitext(args.input)[0] + '.jsonl'
+    if os.path.abspath(output) == os.path.abspath(args.input):
+        output = args.input + '.results.jsonl'
+    lexicon = DEFAULT_LEXICON.extend_from_file(args.lexicon) if args.lexicon else None
+    started = time.monotonic()
+
+    def report(completed, line):
+        rate = completed / max(time.monotonic() - started, 1e-9)
+        print(f'已完成 {completed} 个网址（水位线第 {line} 行，{rate:.1f} 个/秒）', file=sys.stderr)
+
+    async def run_crawl():
+        async with AsyncPageFetcher(max_concurrency=args.concurrency, per_host_concurrency=args.per_host,
+                                    parser=args.parser, subpage_strategy=args.subpage_strategy,
+                                    lexicon=lexicon) as fetcher:
+            return await crawl(fetcher, args.input, output, args.checkpoint, args.mode,
+                               args.concurrency, args.checkpoint_every, progress=report)
+
+    try:
+        completed = asyncio.run(run_crawl())
+    except KeyboardInterrupt:
+        print('已中断，检查点已保存，重新执行同一命令即可续跑', file=sys.stderr)
+        sys.exit(130)
+    print(f'完成，本次共 {completed} 个网址 -> {output}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
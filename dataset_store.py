@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+已上传数据的列式二进制存储（需要 numpy）
+
+CSV 解析一次后把 UserColumns 写成定长数组文件，之后按 dataset_id 以 mmap
+打开，数值列直接映射为只读 numpy 数组，重新分析时不再解析文本。
+
+文件布局（小端序，各段按 8 字节对齐）：
+    头部    magic, 版本, 行数, 成绩个数, 姓名字节数, 元数据字节数
+    元数据  JSON（原文件名、创建时间）
+    user_id, age, city_identifier      int64[行数]
+    score_offsets                       int64[行数 + 1]
+    scores                              int64[成绩个数]
+    name_offsets                        int64[行数 + 1]
+    names                               UTF-8 字节串
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+import time
+import uuid
+
+from columnar import UserColumns, _require_numpy, np
+from tiered_cache import atomic_open
+
+MAGIC = b'UCOLS\0\0\0'
+VERSION = 1
+_HEADER = struct.Struct('<8sIQQQQ')
+_INT64 = '<i8'
+_DATASET_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+def _padding(size):
+    return -size % 8
+
+
+class NameColumn:
+    """按需解码的姓名列，支持 len、下标与切片"""
+
+    def __init__(self, blob, offsets):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            bounds = self._offsets[start:stop + 1].tolist()
+            if step == 1:
+                blob = self._blob
+                return [bytes(blob[a:b]).decode('utf-8') for a, b in zip(bounds, bounds[1:])]
+            return [self[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += len(self)
+        return bytes(self._blob[int(self._offsets[index]):int(self._offsets[index + 1])]).decode('utf-8')
+
+    def __iter__(self):
+        return iter(self[:])
+
+
+def write_columns(path, columns, metadata=None):
+    """把 UserColumns 写入 path；先写临时文件再原子替换"""
+    _require_numpy()
+    names = [name.encode('utf-8') for name in columns.user_name]
+    name_offsets = np.zeros(len(names) + 1, dtype=np.int64)
+    np.cumsum([len(name) for name in names], out=name_offsets[1:])
+    meta = json.dumps(metadata or {}, ensure_ascii=False).encode('utf-8')
+    names_blob = b''.join(names)
+
+    sections = [
+        meta,
+        columns.user_id, columns.age, columns.city_identifier,
+        columns.score_offsets, columns.scores, name_offsets,
+        names_blob
+    ]
+    with atomic_open(path) as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(columns), len(columns.scores), len(names_blob), len(meta)))
+        for section in sections:
+            data = section if isinstance(section, bytes) else np.ascontiguousarray(section, dtype=_INT64).tobytes()
+            f.write(data)
+            f.write(b'\0' * _padding(len(data)))
+
+
+def read_columns(path):
+    """以 mmap 打开列式文件，返回 (UserColumns, 元数据)；数值列不复制"""
+    _require_numpy()
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < _HEADER.size:
+            raise ValueError(f"不是有效的列式数据文件: {path}")
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, rows, score_count, names_size, meta_size = _HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION:
+        buffer.close()
+        raise ValueError(f"不是有效的列式数据文件: {path}")
+
+    offset = _HEADER.size
+    view = memoryview(buffer)
+
+    def section(size):
+        nonlocal offset
+        start = offset
+        offset += size + _padding(size)
+        return view[start:start + size]
+
+    def int64_section(count):
+        return np.frombuffer(section(count * 8), dtype=_INT64)
+
+    metadata = json.loads(bytes(section(meta_size)).decode('utf-8'))
+    user_id, age, city_identifier = int64_section(rows), int64_section(rows), int64_section(rows)
+    score_offsets = int64_section(rows + 1)
+    scores = int64_section(score_count)
+    name_offsets = int64_section(rows + 1)
+    names = NameColumn(section(names_size), name_offsets)
+    return UserColumns(user_id, names, age, city_identifier, score_offsets, scores), metadata
+
+
+class DatasetStore:
+    """按 dataset_id 保存与打开列式数据文件"""
+
+    def __init__(self, directory='datasets'):
+        self.directory = directory
+
+    def _path(self, dataset_id):
+        if not _DATASET_ID_RE.match(dataset_id):
+            raise KeyError(dataset_id)
+        return os.path.join(self.directory, dataset_id + '.ucols')
+
+    def save(self, columns, filename):
+        """保存并返回 dataset_id"""
+        dataset_id = uuid.uuid4().hex
+        os.makedirs(self.directory, exist_ok=True)
+        write_columns(self._path(dataset_id), columns, {'filename': filename, 'created_at': time.time()})
+        return dataset_id
+
+    def open(self, dataset_id):
+        """返回 (UserColumns, 元数据)；数据集不存在时抛出 KeyError"""
+        path = self._path(dataset_id)
+        if not os.path.exists(path):
+            raise KeyError(dataset_id)
+        return read_columns(path)
+
+    def info(self, dataset_id):
+        columns, metadata = self.open(dataset_id)
+        return dict(metadata, dataset_id=dataset_id, rows=len(columns),
+                    size_bytes=os.path.getsize(self._path(dataset_id)))
+
+    def delete(self, dataset_id):
+        try:
+            os.unlink(self._path(dataset_id))
+        except FileNotFoundError:
+            raise KeyError(dataset_id)
@@ -8,9 +8,22 @@ import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContaine
 import { Copy } from "lucide-react";
 import { toast } from "sonner";
 
+const API_BASE = 'https://data-analysis-api-askupnki.fly.dev';
+const PAGE_SIZE = 200;
+const JOB_POLL_INTERVAL_MS = 1000;
+
+interface UserRow {
+  Name: string;
+  Location: string;
+  avg_score: number;
+  EligibleStatus: string;
+}
+
 interface AnalysisResult {
   filename: string;
   status: string;
+  result_id: string;
+  total_rows: number;
   summary: {
     total_users: number;
     eligible_users: number;
@@ -24,24 +37,68 @@ interface AnalysisResult {
       eligible: number;
     };
   };
-  detailed_results: Array<{
-    Name: string;
-    Location: string;
-    avg_score: number;
-    EligibleStatus: string;
-  }>;
+}
+
+// 大文件上传时 /api/analyze 返回 202 与后台任务信息
+interface JobInfo {
+  job_id: string;
+  status: 'queued' | 'running' | 'done' | 'failed';
+  error: string | null;
+  status_url: string;
+  result_url: string;
+}
+
+interface RowsPage {
+  offset: number;
+  total_rows: number;
+  rows: UserRow[];
+}
+
+async function fetchRows(resultId: string, offset: number): Promise<RowsPage> {
+  const response = await fetch(`${API_BASE}/api/results/${resultId}/rows?offset=${offset}&limit=${PAGE_SIZE}`);
+  if (!response.ok) {
+    const errorData = await response.json();
+    throw new Error(errorData.detail || '加载明细失败');
+  }
+  return response.json();
+}
+
+async function waitForJob(job: JobInfo): Promise<AnalysisResult> {
+  // 轮询任务状态，完成后再读取结果（与延迟模式的结果相同，带 result_id）
+  while (job.status === 'queued' || job.status === 'running') {
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    const response = await fetch(`${API_BASE}${job.status_url}`);
+    if (!response.ok) {
+      const errorData = await response.json();
+      throw new Error(errorData.detail || '查询任务状态失败');
+    }
+    job = await response.json();
+  }
+  if (job.status === 'failed') {
+    throw new Error(job.error || '分析失败');
+  }
+
+  const response = await fetch(`${API_BASE}${job.result_url}`);
+  if (!response.ok) {
+    const errorData = await response.json();
+    throw new Error(errorData.detail || '分析失败');
+  }
+  return response.json();
 }
 
 export default function Home() {
   const [selectedFile, setSelectedFile] = useState<File | null>(null);
   const [isLoading, setIsLoading] = useState(false);
   const [analysisResult, setAnalysisResult] = useState<AnalysisResult | null>(null);
+  const [detailRows, setDetailRows] = useState<UserRow[]>([]);
+  const [isLoadingRows, setIsLoadingRows] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
   const handleFileChange = (event: React.ChangeEvent<HTMLInputElement>) => {
     const file = event.target.files?.[0] || null;
     setSelectedFile(file);
     setAnalysisResult(null);
+    setDetailRows([]);
     setError(null);
   };
 
@@ -58,7 +115,8 @@ export default function Home() {
       const formData = new FormData();
       formData.append('file', selectedFile);
 
-      const response = await fetch('https://data-analysis-api-askupnki.fly.dev/api/analyze', {
+      // 先拿到汇总，明细按页加载，避免一次渲染全部行
+      const response = await fetch(`${API_BASE}/api/analyze?detail=deferred`, {
         method: 'POST',
         body: formData,
       });
@@ -68,8 +126,15 @@ export default function Home() {
         throw new Error(errorData.detail || '分析失败');
       }
 
-      const result: AnalysisResult = await response.json();
+      const result: AnalysisResult = response.status === 202
+        ? await waitForJob(await response.json())
+        : await response.json();
       setAnalysisResult(result);
+      setDetailRows([]);
+      if (result.total_rows > 0) {
+        const page = await fetchRows(result.result_id, 0);
+        setDetailRows(page.rows);
+      }
     } catch (err) {
       setError(err instanceof Error ? err.message : '分析过程中发生错误');
     } finally {
@@ -77,6 +142,20 @@ export default function Home() {
     }
   };
 
+  const handleLoadMore = async () => {
+    if (!analysisResult) return;
+
+    setIsLoadingRows(true);
+    try {
+      const page = await fetchRows(analysisResult.result_id, detailRows.length);
+      setDetailRows((rows) => [...rows, ...page.rows]);
+    } catch (err) {
+      toast(err instanceof Error ? err.message : '加载明细失败');
+    } finally {
+      setIsLoadingRows(false);
+    }
+  };
+
   const handleCopyResults = async () => {
     if (!analysisResult) return;
     
@@ -240,7 +319,7 @@ export default function Home() {
                       </tr>
                     </thead>
                     <tbody>
-                      {analysisResult.detailed_results.map((user, index) => (
+                      {detailRows.map((user, index) => (
                         <tr key={index} className="border-b">
                           <td className="p-2">{user.Name}</td>
                           <td className="p-2">{user.Location}</td>
@@ -259,6 +338,16 @@ export default function Home() {
                     </tbody>
                   </table>
                 </div>
+                {detailRows.length < analysisResult.total_rows && (
+                  <Button
+                    onClick={handleLoadMore}
+                    variant="outline"
+                    className="w-full mt-3"
+                    disabled={isLoadingRows}
+                  >
+                    {isLoadingRows ? "加载中..." : `加载更多（已显示 ${detailRows.length} / ${analysisResult.total_rows}）`}
+                  </Button>
+                )}
               </div>
             </CardContent>
           </Card>
@@ -0,0 +1,172 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+
+
+# 每新建这么多个主机状态，清理一次仍因速率预约而保留的空闲主机
+PRUNE_EVERY = 1024
+# stats() 中按主机列出的最多主机数（按在途与排队数排序）
+STATS_TOP_HOSTS = 20
+
+
+class _HostState:
+    __slots__ = ('limit', 'next_start', 'users', 'in_flight', 'waiting', 'requests', 'wait_seconds')
+
+    def __init__(self):
+        self.limit: Optional[asyncio.Semaphore] = None
+        self.next_start = 0.0
+        # 正在排队、等待速率限制或在途的请求数；为 0 时主机状态可以删除
+        self.users = 0
+        self.in_flight = 0
+        self.waiting = 0
+        self.requests = 0
+        self.wait_seconds = 0.0
+
+
+class HostScheduler:
+    """按主机调度请求：全局与单主机的在途请求上限，以及单主机请求速率
+
+    per_host_rate 为每个主机每秒最多发起的请求数，None 表示不限速。
+    同一主机的请求共用客户端的长连接，限制在途数量也让连接得以复用。
+    主机空闲（没有请求、也没有未到期的速率预约）后即删除其状态，
+    抓取大量不同域名时内存只与同时活跃的主机数有关。
+    """
+
+    def __init__(self, max_in_flight: int = 50, per_host_in_flight: int = 4,
+                 per_host_rate: Optional[float] = None):
+        self.max_in_flight = max_in_flight
+        self.per_host_in_flight = per_host_in_flight
+        self.per_host_rate = per_host_rate
+        self._global_limit: Optional[asyncio.Semaphore] = None
+        self._hosts: Dict[str, _HostState] = {}
+        self._created = 0
+        self._requests = 0
+        self._wait_seconds = 0.0
+
+    def _acquire_host(self, url: str) -> Tuple[str, _HostState]:
+        host = urlparse(url).netloc.lower()
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState()
+            self._created += 1
+            if self._created % PRUNE_EVERY == 0:
+                self._prune()
+        state.users += 1
+        return host, state
+
+    def _release_host(self, host: str, state: _HostState) -> None:
+        state.users -= 1
+        if self._idle(state, time.monotonic()) and self._hosts.get(host) is state:
+            del self._hosts[host]
+
+    @staticmethod
+    def _idle(state: _HostState, now: float) -> bool:
+        return state.users == 0 and state.next_start <= now
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for host in [host for host, state in self._hosts.items() if self._idle(state, now)]:
+            del self._hosts[host]
+
+    def _record_start(self, state: _HostState, queued_at: float) -> None:
+        waited = time.monotonic() - queued_at
+        state.wait_seconds += waited
+        state.requests += 1
+        state.in_flight += 1
+        self._wait_seconds += waited
+        self._requests += 1
+
+    def _reserve_start(self, state: _HostState) -> float:
+        """按速率限制预约下一次请求的开始时间，返回需要等待的秒数"""
+        now = time.monotonic()
+        if not self.per_host_rate:
+            return 0.0
+        start = max(now, state.next_start)
+        state.next_start = start + 1.0 / self.per_host_rate
+        return start - now
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """异步请求名额：先取主机名额并等到速率预约的时刻，再取全局名额
+
+        主机排队与限速等待都不占全局名额，不会拖慢没有等待的其他主机。
+        速率按预约时刻计算；全局名额紧张时，实际开始时间可能再推迟。
+        """
+        host, state = self._acquire_host(url)
+        try:
+            if state.limit is None:
+                state.limit = asyncio.Semaphore(self.per_host_in_flight)
+            if self._global_limit is None:
+                self._global_limit = asyncio.Semaphore(self.max_in_flight)
+
+            queued_at = time.monotonic()
+            state.waiting += 1
+            try:
+                await state.limit.acquire()
+                try:
+                    delay = self._reserve_start(state)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    await self._global_limit.acquire()
+                except BaseException:
+                    state.limit.release()
+                    raise
+            finally:
+                state.waiting -= 1
+
+            try:
+                self._record_start(state, queued_at)
+                try:
+                    yield
+                finally:
+                    state.in_flight -= 1
+            finally:
+                self._global_limit.release()
+                state.limit.release()
+        finally:
+            self._release_host(host, state)
+
+    @contextmanager
+    def sync_slot(self, url: str) -> Iterator[None]:
+        """同步请求名额：同步抓取本身是串行的，只需执行速率限制"""
+        host, state = self._acquire_host(url)
+        try:
+            queued_at = time.monotonic()
+            delay = self._reserve_start(state)
+            if delay > 0:
+                time.sleep(delay)
+            self._record_start(state, queued_at)
+            try:
+                yield
+            finally:
+                state.in_flight -= 1
+        finally:
+            self._release_host(host, state)
+
+    def stats(self, top: int = STATS_TOP_HOSTS) -> Dict:
+        """总体统计，以及在途与排队最多的 top 个主机
+
+        requests 与 wait_seconds 的总数为累计值；按主机的数值只统计
+        该主机本次活跃期间（状态被删除后重新计数）。
+        """
+        states = list(self._hosts.items())
+        busiest = sorted(states, key=lambda item: (item[1].in_flight + item[1].waiting, item[1].requests),
+                         reverse=True)[:top]
+        return {
+            'in_flight': sum(state.in_flight for _, state in states),
+            'waiting': sum(state.waiting for _, state in states),
+            'requests': self._requests,
+            'wait_seconds': round(self._wait_seconds, 3),
+            'active_hosts': len(states),
+            'hosts': {
+                host: {
+                    'in_flight': state.in_flight,
+                    'waiting': state.waiting,
+                    'requests': state.requests,
+                    'wait_seconds': round(state.wait_seconds, 3)
+                }
+                for host, state in busiest
+            }
+        }
@@ -0,0 +1,150 @@
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, NamedTuple, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from loguru import logger
+
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url: str) -> str:
+    """规范化网址作为缓存键：协议与主机小写、去掉默认端口和锚点、查询参数排序"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{parts.port}'
+    path = parts.path or '/'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+class CachedResponse(NamedTuple):
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+    fresh: bool
+
+    def validators(self) -> Dict[str, str]:
+        """条件请求头"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """基于 SQLite 的本地 HTTP 响应缓存
+
+    - ttl 秒内的条目直接从本地读取，不发请求
+    - 过期条目带 If-None-Match / If-Modified-Since 重新验证，304 时沿用本地内容
+    - 总大小超过 max_bytes 时按最近访问时间淘汰（LRU）
+    """
+
+    def __init__(self, path: str = 'http_cache.sqlite3', ttl: float = 24 * 3600,
+                 max_bytes: int = 512 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' url TEXT PRIMARY KEY,'
+            ' body BLOB NOT NULL,'
+            ' etag TEXT,'
+            ' last_modified TEXT,'
+            ' stored_at REAL NOT NULL,'
+            ' last_access REAL NOT NULL,'
+            ' size INTEGER NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)')
+        self._conn.commit()
+        self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        self._stats = {'hits': 0, 'misses': 0, 'revalidations': 0, 'evictions': 0}
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        """查找缓存条目；新鲜条目计为一次命中"""
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT body, etag, last_modified, stored_at FROM responses WHERE url = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            body, etag, last_modified, stored_at = row
+            fresh = now - stored_at < self.ttl
+            if fresh:
+                self._stats['hits'] += 1
+                self._conn.execute('UPDATE responses SET last_access = ? WHERE url = ?', (now, key))
+                self._conn.commit()
+        return CachedResponse(zlib.decompress(body).decode('utf-8'), etag, last_modified, stored_at, fresh)
+
+    def revalidated(self, url: str) -> None:
+        """服务器返回 304，刷新条目的存储时间"""
+        now = time.time()
+        with self._lock:
+            self._stats['revalidations'] += 1
+            self._conn.execute(
+                'UPDATE responses SET stored_at = ?, last_access = ? WHERE url = ?',
+                (now, now, normalize_url(url))
+            )
+            self._conn.commit()
+
+    def store(self, url: str, body: str, headers) -> None:
+        """保存一次完整下载的响应"""
+        with self._lock:
+            self._stats['misses'] += 1
+            if 'no-store' in headers.get('cache-control', '').lower():
+                return
+            key = normalize_url(url)
+            data = zlib.compress(body.encode('utf-8'), 1)
+            now = time.time()
+            old = self._conn.execute('SELECT size FROM responses WHERE url = ?', (key,)).fetchone()
+            if old:
+                self._total_bytes -= old[0]
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, data, headers.get('etag'), headers.get('last-modified'), now, now, len(data))
+            )
+            self._total_bytes += len(data)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes:
+            row = self._conn.execute(
+                'SELECT url, size FROM responses ORDER BY last_access LIMIT 1'
+            ).fetchone()
+            if row is None:
+                self._total_bytes = 0
+                return
+            self._conn.execute('DELETE FROM responses WHERE url = ?', (row[0],))
+            self._total_bytes -= row[1]
+            self._stats['evictions'] += 1
+            logger.debug(f"缓存淘汰: {row[0]}")
+
+    def stats(self) -> Dict[str, int]:
+        """命中、未命中、重新验证、淘汰次数，以及当前条目数与占用字节数"""
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            return dict(self._stats, entries=entries, bytes=self._total_bytes)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+            self._total_bytes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+大文件分析的后台任务队列
+
+上传内容先落到临时文件，由固定数量的工作线程依次处理，
+接口只负责提交任务与查询状态，不在事件循环里做计算。
+"""
+
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from loguru import logger
+
+
+JOB_STATES = ("queued", "running", "done", "failed")
+
+
+class QueueFullError(Exception):
+    """排队中的任务已达上限"""
+
+
+class Job:
+    """一次后台分析任务的状态"""
+
+    __slots__ = ('job_id', 'filename', 'path', 'params', 'status', 'error', 'result',
+                 'submitted_at', 'started_at', 'finished_at')
+
+    def __init__(self, filename, path, params):
+        self.job_id = uuid.uuid4().hex
+        self.filename = filename
+        self.path = path
+        self.params = params
+        self.status = "queued"
+        self.error = None
+        self.result = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def info(self):
+        return {
+            "job_id": self.job_id,
+            "filename": self.filename,
+            "status": self.status,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class JobQueue:
+    """有界任务队列与工作线程池
+
+    handler(job) 在工作线程中执行，返回值保存为任务结果；
+    任务结束后删除其临时文件。排队数达到 max_queued 时 submit 抛出 QueueFullError。
+    已结束的任务最多保留 max_jobs 条，超出后淘汰最早的。
+    """
+
+    def __init__(self, handler, workers=2, max_queued=16, max_jobs=256):
+        self.handler = handler
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_jobs = max_jobs
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def _start(self):
+        # 首次提交时才启动工作线程
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, filename, path, **params):
+        job = Job(filename, path, params)
+        with self._lock:
+            self._start()
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                raise QueueFullError(f"任务队列已满（{self.max_queued}）")
+            self._jobs[job.job_id] = job
+            self._forget_finished()
+        logger.info(f"提交分析任务: {job.job_id} ({filename})")
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _forget_finished(self):
+        if len(self._jobs) <= self.max_jobs:
+            return
+        for job_id in [k for k, v in self._jobs.items() if v.finished_at is not None]:
+            del self._jobs[job_id]
+            if len(self._jobs) <= self.max_jobs:
+                return
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                job.result = self.handler(job)
+                job.status = "done"
+            except Exception as e:
+                job.error = str(e)
+                job.status = "failed"
+                logger.error(f"分析任务失败: {job.job_id} - {e}")
+            finally:
+                try:
+                    os.unlink(job.path)
+                except OSError:
+                    pass
+                job.finished_at = time.time()
+
+    def stats(self):
+        with self._lock:
+            counts = dict.fromkeys(JOB_STATES, 0)
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return dict(counts, max_queued=self.max_queued, workers=self.workers)
+
+    def shutdown(self):
+        """等待已排队的任务完成后停止工作线程"""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+本地 HTTP 替身服务器
+
+测试（conftest.py 中的 local_site 夹具）与离线基准（benchmarks/corpus.py）共用，
+不依赖 pytest。
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class LocalSite:
+    """本地 HTTP 替身服务器，按路径返回预设页面"""
+
+    def __init__(self):
+        self.pages = {}
+        self.requests = []
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f'http://{host}:{port}/'
+
+    def add(self, path: str, body, status: int = 200, headers=None) -> None:
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        headers = dict(headers or {})
+        headers.setdefault('Content-Type', 'text/html; charset=utf-8')
+        self.pages['/' + path.lstrip('/')] = (status, headers, body)
+
+    def _make_handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _respond(self, send_body: bool):
+                site.requests.append((self.command, self.path, dict(self.headers)))
+                status, headers, body = site.pages.get(
+                    self.path, (404, {'Content-Type': 'text/html'}, b'not found'))
+                if callable(body):
+                    status, headers, body = body(self)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._respond(True)
+
+            def do_HEAD(self):
+                self._respond(False)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -1,8 +1,65 @@
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
 import uvicorn
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+from collections import OrderedDict
+from typing import List, Optional
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from bug_script import analyze_user_profiles
+from aggregation import ProfileAggregator
+from bug_script import UserRecords, iter_csv_lines, iter_user_records
+from columnar import UserColumns, compute_columns
+from concurrent.futures import ProcessPoolExecutor
+from dataset_store import DatasetStore
+from jobs import JobQueue, QueueFullError
+from metrics import REGISTRY, SamplingProfiler
+from parallel_csv import analyze_csv_parallel
+from result_store import ResultStore
+from upload_cache import PayloadRows, UploadCache, pack_payload, payload_body
+
+ENGINES = ("python", "columnar", "parallel")
+# inline: 明细随响应一起返回；deferred: 只返回汇总与 result_id，明细另行分页读取
+DETAIL_MODES = ("inline", "deferred")
+MAX_PAGE_SIZE = 10000
+# 序列化明细时每次生成的字典行数
+SERIALIZE_PAGE_SIZE = 10000
+# 一行明细序列化后至少占用的字节数（空姓名与地区、0 分），序列化前据此估算能否放入上传缓存
+MIN_ROW_BYTES = len(b'{"Name":"","Location":"","avg_score":0,"EligibleStatus":"NO"}')
+# 超过该大小的上传转为后台任务，由工作线程处理
+JOB_THRESHOLD_BYTES = 8 * 1024 * 1024
+JOB_WORKERS = 2
+JOB_MAX_QUEUED = 16
+# parallel 引擎的进程数，默认使用全部 CPU
+PARALLEL_WORKERS = os.cpu_count()
+
+# 列式二进制数据集的保存目录
+DATASET_DIR = "datasets"
+# 上传去重缓存：内存层字节上限与可选的磁盘目录
+UPLOAD_CACHE_MAX_BYTES = 64 * 1024 * 1024
+UPLOAD_CACHE_DIR = None
+
+# 延迟返回的明细暂存：所有结果合计的行数上限
+RESULT_STORE_MAX_ROWS = 2_000_000
+
+# 保留最近多少份采样分析结果
+MAX_PROFILES = 16
+
+result_store = ResultStore(max_rows=RESULT_STORE_MAX_ROWS)
+dataset_store = DatasetStore(DATASET_DIR)
+upload_cache = UploadCache(UPLOAD_CACHE_MAX_BYTES, UPLOAD_CACHE_DIR)
+profiles = OrderedDict()
+
+request_seconds = REGISTRY.histogram(
+    "http_request_seconds", "API 请求耗时", ("method", "route", "status"))
+analysis_seconds = REGISTRY.histogram(
+    "csv_analysis_seconds", "CSV 分析各阶段耗时（hash / parse / aggregate / analyze / serialize）", ("engine", "stage"))
 
 app = FastAPI(title="Data Analysis API", version="1.0.0")
 
@@ -14,57 +71,376 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def _time_requests(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    request_seconds.observe(time.perf_counter() - started, method=request.method,
+                            route=getattr(route, "path", "unmatched"), status=response.status_code)
+    return response
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus 文本格式的耗时直方图"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/stats")
+async def stats():
+    """进程内统计：各直方图的次数、总和与估算分位数，以及缓存与任务队列"""
+    return {
+        "metrics": REGISTRY.stats(),
+        "upload_cache": upload_cache.stats(),
+        "jobs": job_queue.stats()
+    }
+
 @app.get("/")
 async def root():
     return {"message": "Data Analysis API is running"}
 
+def _build_response(filename, aggregator, analysis_results):
+    return {
+        "filename": filename,
+        "status": "success",
+        "summary": aggregator.summary(),
+        "location_stats": aggregator.location_stats(),
+        "detailed_results": analysis_results
+    }
+
+def _build_deferred_response(filename, aggregator, rows):
+    return _store_deferred(filename, aggregator.summary(), aggregator.location_stats(), rows)
+
+def _store_deferred(filename, summary, location_stats, rows):
+    result_id = result_store.put(filename, summary, location_stats, rows)
+    return {
+        "filename": filename,
+        "status": "success",
+        "result_id": result_id,
+        "total_rows": len(rows),
+        "summary": summary,
+        "location_stats": location_stats
+    }
+
+def _render_json(content):
+    # 与 JSONResponse.render 的序列化方式一致
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None,
+                      separators=(",", ":")).encode("utf-8")
+
+def _page_rows(analysis_results, start, stop):
+    if isinstance(analysis_results, list):
+        return analysis_results[start:stop]
+    return analysis_results.rows(start, stop)
+
+def _cache_payload(aggregator, analysis_results, max_bytes=None):
+    """缓存值：不含文件名的响应体（字段顺序与 _build_response 相同）及明细的分页索引
+
+    明细分页生成字典并序列化，各页拼接后与整体序列化列表相同，但同时存在的字典不超过一页；
+    每页的起始偏移随缓存值保存（见 upload_cache.pack_payload）。
+    给出 max_bytes 时，响应体超过该大小即停止序列化并返回 None。
+    """
+    total_rows = len(analysis_results)
+    if max_bytes is not None and total_rows * MIN_ROW_BYTES > max_bytes:
+        return None
+    head = _render_json({
+        "summary": aggregator.summary(),
+        "location_stats": aggregator.location_stats(),
+        "detailed_results": None
+    })
+    parts = [head[:-len(b"null}")] + b"["]
+    offset = len(parts[0])
+    page_size = SERIALIZE_PAGE_SIZE
+    pages = []
+    for start in range(0, total_rows, page_size):
+        if start:
+            parts.append(b",")
+            offset += 1
+        pages.append(offset)
+        part = _render_json(_page_rows(analysis_results, start, start + page_size))[1:-1]
+        parts.append(part)
+        offset += len(part)
+        if max_bytes is not None and offset + len(b"]}") > max_bytes:
+            return None
+    parts.append(b"]}")
+    return pack_payload(parts, len(parts[0]), total_rows, page_size, pages)
+
+def _cache_limit():
+    """能放入上传缓存的最大字节数；有磁盘层时不限"""
+    return None if upload_cache.directory else upload_cache.max_bytes
+
+def _cached_response(filename, payload, detail):
+    if detail == "deferred":
+        # 明细仍以缓存中的字节串保存，分页读取时才解析对应的行
+        rows = PayloadRows(payload)
+        head = rows.head()
+        return JSONResponse(content=_store_deferred(filename, head["summary"], head["location_stats"], rows))
+    # 直接在缓存的响应体前拼上文件名与状态，结果与 _build_response 逐字节相同
+    head = b'{"filename":' + _render_json(filename) + b',"status":"success",'
+    return Response(content=b"".join((head, payload_body(payload)[1:])), media_type="application/json")
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+def _get_process_pool():
+    # 进程池在任务线程中首次创建，此时 fork 会复制其他线程持有的锁，
+    # 因此改用 forkserver（不支持的平台用 spawn）启动工作进程
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _process_pool = ProcessPoolExecutor(max_workers=PARALLEL_WORKERS,
+                                                mp_context=multiprocessing.get_context(method))
+        return _process_pool
+
+def _analyze_path(path, engine, lazy_rows=False):
+    if engine == "parallel":
+        # 解析与分析在工作进程中同时完成，只能记录整体耗时
+        with analysis_seconds.time(engine=engine, stage="analyze"):
+            return analyze_csv_parallel(path, executor=_get_process_pool())
+    with open(path, 'rb') as f:
+        return _analyze(f, engine, lazy_rows)
+
+def _analyze(file_obj, engine, lazy_rows=False):
+    """分析上传的 CSV，返回 (逐行结果, ProfileAggregator)；在线程中执行，不占用事件循环"""
+    if engine == "parallel":
+        # 工作进程按字节范围各自读取文件，上传内容先落盘
+        with tempfile.NamedTemporaryFile(suffix='.csv') as tmp:
+            shutil.copyfileobj(file_obj, tmp)
+            tmp.flush()
+            return _analyze_path(tmp.name, engine)
+    lines = iter_csv_lines(file_obj)
+    if engine == "columnar":
+        with analysis_seconds.time(engine=engine, stage="parse"):
+            columns = UserColumns.from_csv_lines(lines)
+        with analysis_seconds.time(engine=engine, stage="aggregate"):
+            result = compute_columns(columns)
+        # deferred 模式下列式结果按需生成逐行字典，不必一次性展开
+        return (result if lazy_rows else result.rows()), result.aggregator
+    # 汇总与逐行结果在同一遍中得到，解析与聚合无法分开计时，只记录整体耗时
+    with analysis_seconds.time(engine=engine, stage="analyze"):
+        aggregator = ProfileAggregator()
+        records = list(aggregator.observe_records(iter_user_records(lines)))
+    return UserRecords(records), aggregator
+
+def _run_job(job):
+    analysis_results, aggregator = _analyze_path(job.path, job.params["engine"], lazy_rows=True)
+    if job.params.get("cache_key"):
+        # 明细只用于缓存，放不进缓存时不必序列化
+        payload = _cache_payload(aggregator, analysis_results, _cache_limit())
+        if payload is not None:
+            upload_cache.put(job.params["cache_key"], payload)
+    return _build_deferred_response(job.filename, aggregator, analysis_results)
+
+job_queue = JobQueue(_run_job, workers=JOB_WORKERS, max_queued=JOB_MAX_QUEUED)
+
+def _job_response(job):
+    return dict(job.info(), status_url=f"/api/jobs/{job.job_id}",
+                result_url=f"/api/jobs/{job.job_id}/result")
+
+async def _upload_size(file):
+    if file.size is not None:
+        return file.size
+    await file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    await file.seek(0)
+    return size
+
+async def _submit_job(file, engine, cache_key=None):
+    """上传内容复制到临时文件后入队，请求结束后任务仍可读取"""
+    await file.seek(0)
+    tmp = tempfile.NamedTemporaryFile(suffix='.csv', delete=False)
+    try:
+        with tmp:
+            await run_in_threadpool(shutil.copyfileobj, file.file, tmp)
+        return job_queue.submit(file.filename, tmp.name, engine=engine, cache_key=cache_key)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+
+def _profiled(profile_id, func, *args):
+    """在采样分析器下执行 func，结果按 profile_id 保留"""
+    with SamplingProfiler() as profiler:
+        try:
+            return func(*args)
+        finally:
+            profiles[profile_id] = profiler
+            while len(profiles) > MAX_PROFILES:
+                profiles.popitem(last=False)
+
+@app.get("/api/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    """采样分析结果，折叠栈格式（可直接生成火焰图）"""
+    profiler = profiles.get(profile_id)
+    if profiler is None:
+        raise HTTPException(status_code=404, detail=f"采样分析结果不存在: {profile_id}")
+    return PlainTextResponse(profiler.collapsed())
+
 @app.post("/api/analyze")
-async def analyze_file(file: UploadFile = File(...)):
+async def analyze_file(file: UploadFile = File(...), engine: str = "python", detail: str = "inline",
+                       profile: bool = False):
+    # 参数校验放在 try 之外，否则 400 会被下面的通用处理改成 500
+    if engine not in ENGINES:
+        raise HTTPException(status_code=400, detail=f"未知的分析引擎: {engine}")
+    if detail not in DETAIL_MODES:
+        raise HTTPException(status_code=400, detail=f"未知的明细模式: {detail}")
     try:
         if not file.filename.endswith('.csv'):
             raise HTTPException(status_code=400, detail="只支持CSV文件格式")
         
-        content = await file.read()
-        analysis_results = analyze_user_profiles(content)
-        
-        total_users = len(analysis_results)
-        eligible_users = len([user for user in analysis_results if user['EligibleStatus'] == 'YES'])
-        avg_score_overall = sum(user['avg_score'] for user in analysis_results) / total_users if total_users > 0 else 0
+        # 先只计算内容哈希，命中缓存时不再解析 CSV
+        await file.seek(0)
+        started = time.perf_counter()
+        cache_key = await run_in_threadpool(upload_cache.key_for, file.file)
+        analysis_seconds.observe(time.perf_counter() - started, engine=engine, stage="hash")
+        payload = upload_cache.get(cache_key)
+        if payload is not None:
+            return _cached_response(file.filename, payload, detail)
         
-        location_stats = {}
-        for user in analysis_results:
-            location = user['Location']
-            if location not in location_stats:
-                location_stats[location] = {'count': 0, 'avg_score': 0, 'eligible': 0}
-            location_stats[location]['count'] += 1
-            location_stats[location]['avg_score'] += user['avg_score']
-            if user['EligibleStatus'] == 'YES':
-                location_stats[location]['eligible'] += 1
+        if await _upload_size(file) > JOB_THRESHOLD_BYTES:
+            try:
+                job = await _submit_job(file, engine, cache_key)
+            except QueueFullError as e:
+                return JSONResponse(status_code=503, content={"detail": str(e)})
+            return JSONResponse(status_code=202, content=_job_response(job))
         
-        for location in location_stats:
-            if location_stats[location]['count'] > 0:
-                location_stats[location]['avg_score'] /= location_stats[location]['count']
+        await file.seek(0)
+        profile_id = uuid.uuid4().hex if profile else None
+        analyze = (_analyze,) if profile_id is None else (_profiled, profile_id, _analyze)
+        analysis_results, aggregator = await run_in_threadpool(
+            *analyze, file.file, engine, detail == "deferred")
+        started = time.perf_counter()
+        # inline 模式的响应体就是缓存值；deferred 模式只为缓存序列化，放不进缓存时跳过
+        max_bytes = _cache_limit() if detail == "deferred" else None
+        payload = await run_in_threadpool(_cache_payload, aggregator, analysis_results, max_bytes)
+        analysis_seconds.observe(time.perf_counter() - started, engine=engine, stage="serialize")
+        if payload is not None:
+            await run_in_threadpool(upload_cache.put, cache_key, payload)
         
-        return JSONResponse(
-            content={
-                "filename": file.filename,
-                "status": "success",
-                "summary": {
-                    "total_users": total_users,
-                    "eligible_users": eligible_users,
-                    "eligibility_rate": round(eligible_users / total_users * 100, 1) if total_users > 0 else 0,
-                    "overall_avg_score": round(avg_score_overall, 1)
-                },
-                "location_stats": {
-                    location: {
-                        "count": stats["count"],
-                        "avg_score": round(stats["avg_score"], 1),
-                        "eligible": stats["eligible"]
-                    }
-                    for location, stats in location_stats.items()
-                },
-                "detailed_results": analysis_results
-            }
-        )
+        if detail == "deferred":
+            response = JSONResponse(content=_build_deferred_response(file.filename, aggregator, analysis_results))
+        else:
+            response = _cached_response(file.filename, payload, detail)
+        if profile_id is not None:
+            response.headers["X-Profile-Id"] = profile_id
+        return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"文件处理错误: {str(e)}")
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(file: UploadFile = File(...), engine: str = "python"):
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="只支持CSV文件格式")
+    if engine not in ENGINES:
+        raise HTTPException(status_code=400, detail=f"未知的分析引擎: {engine}")
+    try:
+        job = await _submit_job(file, engine)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return _job_response(job)
+
+def _job(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"任务不存在: {job_id}")
+    return job
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    return _job_response(_job(job_id))
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    job = _job(job_id)
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"文件处理错误: {job.error}")
+    if job.status != "done":
+        return JSONResponse(status_code=202, content=_job_response(job))
+    return job.result
+
+def _save_dataset(file_obj, filename):
+    columns = UserColumns.from_csv_lines(iter_csv_lines(file_obj))
+    return dataset_store.save(columns, filename)
+
+def _open_dataset(dataset_id):
+    try:
+        return dataset_store.open(dataset_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"数据集不存在: {dataset_id}")
+
+@app.post("/api/datasets", status_code=201)
+async def create_dataset(file: UploadFile = File(...)):
+    """解析一次 CSV 并保存为列式二进制数据集，之后可按 dataset_id 反复分析"""
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="只支持CSV文件格式")
+    await file.seek(0)
+    try:
+        dataset_id = await run_in_threadpool(_save_dataset, file.file, file.filename)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"文件处理错误: {str(e)}")
+    return dataset_store.info(dataset_id)
+
+@app.get("/api/datasets/{dataset_id}")
+async def get_dataset(dataset_id: str):
+    try:
+        return dataset_store.info(dataset_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"数据集不存在: {dataset_id}")
+
+@app.delete("/api/datasets/{dataset_id}", status_code=204)
+async def delete_dataset(dataset_id: str):
+    try:
+        dataset_store.delete(dataset_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"数据集不存在: {dataset_id}")
+
+def _analyze_dataset(columns, detail, min_age, max_age, cities):
+    result = compute_columns(columns.select(min_age, max_age, cities))
+    if detail == "deferred":
+        return result, result.aggregator
+    return result.rows(), result.aggregator
+
+@app.post("/api/datasets/{dataset_id}/analyze")
+async def analyze_dataset(dataset_id: str, detail: str = "inline",
+                          min_age: Optional[int] = None, max_age: Optional[int] = None,
+                          city: Optional[List[int]] = Query(None)):
+    """从内存映射的列式数据重新分析，可按年龄范围与城市代码筛选"""
+    if detail not in DETAIL_MODES:
+        raise HTTPException(status_code=400, detail=f"未知的明细模式: {detail}")
+    columns, metadata = _open_dataset(dataset_id)
+    analysis_results, aggregator = await run_in_threadpool(
+        _analyze_dataset, columns, detail, min_age, max_age, city)
+    filename = metadata.get("filename", dataset_id)
+    if detail == "deferred":
+        return JSONResponse(content=_build_deferred_response(filename, aggregator, analysis_results))
+    return JSONResponse(content=_build_response(filename, aggregator, analysis_results))
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    return upload_cache.stats()
+
+def _stored_result(result_id):
+    result = result_store.get(result_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"分析结果不存在或已过期: {result_id}")
+    return result
+
+@app.get("/api/results/{result_id}")
+async def get_result(result_id: str):
+    return _stored_result(result_id).header()
+
+@app.get("/api/results/{result_id}/rows")
+async def get_result_rows(result_id: str, offset: int = Query(0, ge=0),
+                          limit: int = Query(1000, ge=1, le=MAX_PAGE_SIZE)):
+    result = _stored_result(result_id)
+    return JSONResponse(content={
+        "result_id": result_id,
+        "offset": offset,
+        "limit": limit,
+        "total_rows": result.total_rows,
+        "rows": result.rows(offset, offset + limit)
+    })
+
+@app.get("/api/results/{result_id}/rows.ndjson")
+async def stream_result_rows(result_id: str):
+    result = _stored_result(result_id)
+    lines = (json.dumps(row, ensure_ascii=False) + "\n" for row in result.iter_rows())
+    return StreamingResponse(lines, media_type="application/x-ndjson")
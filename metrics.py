@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+耗时指标与采样分析
+
+Histogram 按标签分别累计各分桶的次数与总和，MetricsRegistry 可输出
+Prometheus 文本格式（/metrics）或进程内统计字典（含估算的分位数）。
+SamplingProfiler 在后台线程定期采集目标线程的调用栈，按需对单个请求开启。
+"""
+
+import bisect
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class _Series:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, size):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram:
+    """按标签分组的耗时直方图（单位：秒）"""
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(len(self.buckets) + 1)
+            series.counts[index] += 1
+            series.sum += value
+            series.count += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """记录 with 块的耗时"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _snapshot(self):
+        with self._lock:
+            return [(key, list(s.counts), s.sum, s.count) for key, s in self._series.items()]
+
+    def _quantile(self, q, counts, count):
+        """按分桶线性插值估算分位数，与 Prometheus 的 histogram_quantile 相同"""
+        rank = q * count
+        cumulative = 0
+        for i, bucket_count in enumerate(counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return 0.0
+
+    def stats(self):
+        """标签 -> {count, sum, mean, p50, p90, p99}；标签以 name=value 逗号连接"""
+        result = {}
+        for key, counts, total, count in self._snapshot():
+            label = ','.join(f'{name}={value}' for name, value in zip(self.labels, key))
+            result[label] = {
+                'count': count,
+                'sum': round(total, 6),
+                'mean': round(total / count, 6) if count else 0.0,
+                'p50': round(self._quantile(0.5, counts, count), 6),
+                'p90': round(self._quantile(0.9, counts, count), 6),
+                'p99': round(self._quantile(0.99, counts, count), 6)
+            }
+        return result
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for key, counts, total, count in sorted(self._snapshot()):
+            pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labels, key)]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                bucket_labels = ','.join(pairs + [f'le="{_format_value(bound)}"'])
+                lines.append(f'{self.name}_bucket{{{bucket_labels}}} {cumulative}')
+            suffix = '{' + ','.join(pairs) + '}' if pairs else ''
+            lines.append(f'{self.name}_sum{suffix} {_format_value(total)}')
+            lines.append(f'{self.name}_count{suffix} {count}')
+        return '\n'.join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+class MetricsRegistry:
+    """直方图的注册表；同名直方图只创建一次"""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(name, documentation, labels, buckets)
+            return histogram
+
+    def render(self):
+        """Prometheus 文本格式"""
+        with self._lock:
+            histograms = list(self._histograms.values())
+        return '\n'.join(h.render() for h in histograms) + '\n'
+
+    def stats(self, prefix=''):
+        """进程内统计：指标名 -> 标签 -> 汇总值，可按名称前缀过滤"""
+        with self._lock:
+            histograms = list(self._histograms.values())
+        return {h.name: h.stats() for h in histograms if h.name.startswith(prefix)}
+
+    def reset(self):
+        with self._lock:
+            histograms = list(self._histograms.values())
+        for histogram in histograms:
+            histogram.reset()
+
+
+REGISTRY = MetricsRegistry()
+
+
+class SamplingProfiler:
+    """采样分析器：在 with 块内每隔 interval 秒采集一次当前线程的调用栈
+
+    结果为折叠栈格式（"外层;内层 次数"），可直接用于生成火焰图。
+    """
+
+    def __init__(self, interval=0.005, max_depth=64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = Counter()
+        self._target = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({code.co_filename.rsplit("/", 1)[-1]}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.samples.most_common())
+
+    def top(self, limit=20):
+        """按自身采样数排序的函数列表 [(函数, 次数), ...]"""
+        leaf = Counter()
+        for stack, count in self.samples.items():
+            leaf[stack.rsplit(';', 1)[-1]] += count
+        return leaf.most_common(limit)
@@ -1,42 +1,448 @@
+from __future__ import annotations
+
 import re
-import httpx
-from bs4 import BeautifulSoup, Comment
 from urllib.parse import urljoin, urlparse
 from loguru import logger
-from typing import Dict, List, Set, Optional
+from typing import TYPE_CHECKING, AsyncIterator, Dict, FrozenSet, Iterable, Iterator, List, Set, Optional, Tuple
+from functools import lru_cache
+from html.parser import HTMLParser
 import asyncio
+import codecs
+import importlib.util
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
+from analysis_cache import AnalysisCache, content_key
+from host_scheduler import HostScheduler
+from http_cache import HttpCache
+from metrics import REGISTRY, MetricsRegistry
+
+# httpx、bs4 与 lxml 在第一次使用时才导入，import page_fetcher 与新建进程都很快
+if TYPE_CHECKING:
+    import httpx
+    from bs4 import BeautifulSoup
+
+
+# CJK统一汉字、扩展A、扩展B；日文假名不在其中
+_CJK_CHAR_RE = re.compile('[\u4e00-\u9fff\u3400-\u4dbf\U00020000-\U0002a6df]')
+
+
+class ChineseScanner:
+    """一次扫描文本，同时找出中文字符、城市名与姓氏
+
+    单字词条通过与文本字符集合求交集得到；多字词条按长度分组，在文本中
+    每个可能的首字符位置截取对应长度的子串，与该长度的词条集合求交集。
+    耗时取决于候选位置数与词条长度种类，与词条数量基本无关，结果与逐个
+    ``term in text`` 的判断完全一致。
+    """
+
+    def __init__(self, cities: Iterable[str], surnames: Iterable[str]):
+        self.cities = frozenset(t for t in cities if t)
+        self.surnames = frozenset(t for t in surnames if t)
+        terms = self.cities | self.surnames
+        self.fingerprint = content_key('\n'.join(sorted(self.cities)), *sorted(self.surnames))
+        
+        self._single_terms = frozenset(t for t in terms if len(t) == 1)
+        multi_terms = [t for t in terms if len(t) > 1]
+        by_length: Dict[int, Set[str]] = {}
+        for term in multi_terms:
+            by_length.setdefault(len(term), set()).add(term)
+        self._multi_terms = tuple((length, frozenset(group)) for length, group in sorted(by_length.items()))
+        self._first_char_re = None
+        if multi_terms:
+            self._first_char_re = re.compile('[%s]' % ''.join(sorted({re.escape(t[0]) for t in multi_terms})))
+        # 多字词条全部由汉字组成时，文本中没有汉字即可跳过多字词条的扫描
+        self._multi_needs_cjk = all(len(_CJK_CHAR_RE.findall(t)) == len(t) for t in multi_terms)
+        self.max_term_length = max((len(t) for t in terms), default=1)
+
+    def _multi_hits(self, text: str) -> Set[str]:
+        positions = [match.start() for match in self._first_char_re.finditer(text)]
+        hits = set()
+        for length, group in self._multi_terms:
+            hits.update(group.intersection([text[p:p + length] for p in positions]))
+        return hits
+
+    def search(self, text: str) -> bool:
+        """只判断文本中是否存在任一中文字符、城市或姓氏，命中即返回"""
+        if _CJK_CHAR_RE.search(text):
+            return True
+        if not self._single_terms.isdisjoint(text):
+            return True
+        if self._first_char_re is not None and not self._multi_needs_cjk:
+            return bool(self._multi_hits(text))
+        return False
+
+    def scan(self, text: str) -> Tuple[Set[str], Set[str], Set[str]]:
+        """返回 (中文字符, 城市, 姓氏) 三个集合"""
+        present = set(text)
+        chinese_chars = set(_CJK_CHAR_RE.findall(''.join(present)))
+        
+        hits = set(self._single_terms & present)
+        if self._first_char_re is not None and (chinese_chars or not self._multi_needs_cjk):
+            hits.update(self._multi_hits(text))
+        
+        return chinese_chars, hits & self.cities, hits & self.surnames
+
+
+@lru_cache(maxsize=8)
+def _get_scanner(cities: FrozenSet[str], surnames: FrozenSet[str]) -> ChineseScanner:
+    """每个进程内按词表缓存编译好的扫描器"""
+    return ChineseScanner(cities, surnames)
+
+
+DEFAULT_CITIES = frozenset({
+    '北京', '上海', '广州', '深圳', '杭州', '南京', '苏州', '成都', '武汉', '重庆',
+    '天津', '西安', '长沙', '沈阳', '青岛', '郑州', '大连', '东莞', '宁波', '厦门',
+    '福州', '无锡', '合肥', '昆明', '哈尔滨', '济南', '佛山', '长春', '温州', '石家庄',
+    '南宁', '常州', '泉州', '南昌', '贵阳', '太原', '烟台', '嘉兴', '南通', '金华',
+    '珠海', '惠州', '徐州', '海口', '乌鲁木齐', '绍兴', '中山', '台州', '兰州'
+})
+
+DEFAULT_SURNAMES = frozenset({
+    '王', '李', '张', '刘', '陈', '杨', '赵', '黄', '周', '吴', '徐', '孙', '胡', '朱', '高',
+    '林', '何', '郭', '马', '罗', '梁', '宋', '郑', '谢', '韩', '唐', '冯', '于', '董', '萧',
+    '程', '曹', '袁', '邓', '许', '傅', '沈', '曾', '彭', '吕', '苏', '卢', '蒋', '蔡', '贾',
+    '丁', '魏', '薛', '叶', '阎', '余', '潘', '杜', '戴', '夏', '钟', '汪', '田', '任', '姜'
+})
+
+_LEXICON_SECTIONS = ('cities', 'surnames')
+
+
+class Lexicon:
+    """城市与姓氏词表（不可变）
+
+    同一词表的扫描器在进程内只编译一次，所有 PageFetcher 共享；
+    扩展词表会得到新的 Lexicon，不影响默认词表。
+    """
+
+    __slots__ = ('cities', 'surnames')
+
+    def __init__(self, cities: Iterable[str], surnames: Iterable[str]):
+        object.__setattr__(self, 'cities', frozenset(cities))
+        object.__setattr__(self, 'surnames', frozenset(surnames))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Lexicon 不可修改，请使用 extend() 生成新词表')
+
+    def __eq__(self, other):
+        return isinstance(other, Lexicon) and (self.cities, self.surnames) == (other.cities, other.surnames)
+
+    def __hash__(self):
+        return hash((self.cities, self.surnames))
+
+    def __reduce__(self):
+        return Lexicon, (self.cities, self.surnames)
+
+    def __repr__(self):
+        return f'Lexicon({len(self.cities)} cities, {len(self.surnames)} surnames)'
+
+    @property
+    def scanner(self) -> ChineseScanner:
+        return _get_scanner(self.cities, self.surnames)
+
+    def extend(self, cities: Iterable[str] = (), surnames: Iterable[str] = ()) -> Lexicon:
+        return Lexicon(self.cities.union(cities), self.surnames.union(surnames))
+
+    def extend_from_file(self, path: str) -> Lexicon:
+        """从词表文件追加词条
+
+        文件为 UTF-8 文本，以 [cities] / [surnames] 分节，每行一个词条，
+        空行与 # 开头的行忽略。
+        """
+        terms: Dict[str, List[str]] = {section: [] for section in _LEXICON_SECTIONS}
+        section = None
+        with open(path, encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                if line.startswith('[') and line.endswith(']'):
+                    section = line[1:-1].strip()
+                    if section not in terms:
+                        raise ValueError(f"{path}:{number}: 未知的分节 {line}，可选值: "
+                                         f"{', '.join(_LEXICON_SECTIONS)}")
+                    continue
+                if section is None:
+                    raise ValueError(f"{path}:{number}: 词条之前缺少 [cities] 或 [surnames] 分节")
+                terms[section].append(line)
+        return self.extend(terms['cities'], terms['surnames'])
+
+
+DEFAULT_LEXICON = Lexicon(DEFAULT_CITIES, DEFAULT_SURNAMES)
+
+
+def preload(parser: str = 'html.parser', lexicon: Lexicon = DEFAULT_LEXICON) -> None:
+    """预先导入 HTTP 与解析库并编译扫描器
+
+    在 fork 工作进程之前于父进程中调用，子进程直接继承，不必各自重复这些开销。
+    """
+    import httpx  # noqa: F401
+    if parser == 'lxml':
+        _lxml_parser()
+    else:
+        import bs4  # noqa: F401
+    lexicon.scanner
+
+
+class _VerdictParser(HTMLParser):
+    """增量解析 HTML，只关注可见文本中是否出现中文线索
+
+    与 BeautifulSoup 的 ``get_text()`` 口径一致：忽略注释、script、style、
+    template 中的内容；相邻文本节点拼接后再匹配，跨节点、跨数据块的词条也能命中。
+    """
+
+    _SKIP_TAGS = {'script', 'style', 'template'}
+
+    def __init__(self, scanner: ChineseScanner):
+        super().__init__(convert_charrefs=True)
+        self.scanner = scanner
+        self.found = False
+        self._skip_depth = 0
+        self._tail = ''
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if self.found or self._skip_depth:
+            return
+        text = self._tail + data
+        if self.scanner.search(text):
+            self.found = True
+            return
+        keep = self.scanner.max_term_length - 1
+        self._tail = text[-keep:] if keep else ''
+
+
+RUN_MODES = ('full', 'verdict')
+
+PARSER_BACKENDS = ('html.parser', 'lxml')
+
+SUBPAGE_STRATEGIES = ('all', 'adaptive')
+
+USEFUL_META_NAMES = (
+    'description', 'keywords', 'author', 'title', 'og:title',
+    'og:description', 'twitter:title', 'twitter:description'
+)
+
+# 与 get_text() 一致：这些标签内的文本不计入页面正文
+_NON_TEXT_TAGS = frozenset({'script', 'style', 'template'})
+
+
+@lru_cache(maxsize=1)
+def _lxml_parser():
+    from lxml import etree
+    return etree.HTMLParser(encoding='utf-8', huge_tree=True)
+
+# 未声明 Content-Type 的响应也按 HTML 处理
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+
+# HTTP/2 需要可选依赖 h2（pip install httpx[http2]），未安装时退回 HTTP/1.1
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+
+class _BodyDecoder:
+    """按字节上限截断响应体，并增量解码为文本"""
+
+    def __init__(self, response: httpx.Response, max_bytes: int):
+        content_type = response.headers.get('content-type', '')
+        mime_type = content_type.split(';', 1)[0].strip().lower()
+        if mime_type and mime_type not in HTML_CONTENT_TYPES:
+            raise ValueError(f"非HTML内容: {content_type}")
+        
+        self.url = response.url
+        self.remaining = max_bytes
+        self.truncated = False
+        self._decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+
+    def feed(self, chunk: bytes) -> str:
+        if len(chunk) > self.remaining:
+            chunk = chunk[:self.remaining]
+            self.truncated = True
+            logger.warning(f"页面超过大小上限，已截断: {self.url}")
+        self.remaining -= len(chunk)
+        return self._decoder.decode(chunk)
+
+    def finish(self) -> str:
+        # 截断时末尾可能是不完整的多字节字符，直接丢弃
+        return '' if self.truncated else self._decoder.decode(b'', final=True)
+
+
+class _FetchTimer:
+    """通过 httpx 的 trace 扩展记录一次请求各阶段的时间点
+
+    httpcore 不单独报告 DNS 解析，connect 阶段包含 DNS 解析与 TCP 建连；
+    复用长连接时没有 connect / tls 阶段。
+    """
+
+    __slots__ = ('started', 'marks')
 
-class PageFetcher:
     def __init__(self):
-        self.chinese_cities = {
-            '北京', '上海', '广州', '深圳', '杭州', '南京', '苏州', '成都', '武汉', '重庆',
-            '天津', '西安', '长沙', '沈阳', '青岛', '郑州', '大连', '东莞', '宁波', '厦门',
-            '福州', '无锡', '合肥', '昆明', '哈尔滨', '济南', '佛山', '长春', '温州', '石家庄',
-            '南宁', '常州', '泉州', '南昌', '贵阳', '太原', '烟台', '嘉兴', '南通', '金华',
-            '珠海', '惠州', '徐州', '海口', '乌鲁木齐', '绍兴', '中山', '台州', '兰州'
-        }
+        self.started: Optional[float] = None
+        self.marks: Dict[str, float] = {}
+
+    def trace(self, event: str, info: Dict) -> None:
+        now = time.perf_counter()
+        if self.started is None:
+            self.started = now
+        self.marks[event.split('.', 1)[1] if event.startswith(('http11.', 'http2.')) else event] = now
+
+    async def atrace(self, event: str, info: Dict) -> None:
+        self.trace(event, info)
+
+    def observe(self, histogram, finished: float) -> None:
+        marks = self.marks
+        phases = (
+            ('connect', 'connection.connect_tcp.started', 'connection.connect_tcp.complete'),
+            ('tls', 'connection.start_tls.started', 'connection.start_tls.complete'),
+        )
+        for phase, start, end in phases:
+            if start in marks and end in marks:
+                histogram.observe(marks[end] - marks[start], phase=phase)
+        headers_done = marks.get('receive_response_headers.complete')
+        if self.started is not None and headers_done is not None:
+            histogram.observe(headers_done - self.started, phase='ttfb')
+            histogram.observe(finished - headers_done, phase='body')
+
+
+class _PageParts:
+    """一次遍历文档时收集的原始内容"""
+
+    __slots__ = ('text', 'meta_info', 'hrefs', 'html_comments', 'scripts', 'styles')
+
+    def __init__(self):
+        self.text: List[str] = []
+        self.meta_info: Dict[str, str] = {}
+        self.hrefs: List[str] = []
+        self.html_comments: List[str] = []
+        self.scripts: List[str] = []
+        self.styles: List[str] = []
+
+    def add_meta(self, name: Optional[str], content: Optional[str]) -> None:
+        if name and content and name.lower() in USEFUL_META_NAMES:
+            self.meta_info[name.lower()] = content
+
+
+class PageFetcher:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, cache: Optional[HttpCache] = None,
+                 analysis_cache: Optional[AnalysisCache] = None, parser: str = 'html.parser',
+                 max_connections: int = 100, max_keepalive_connections: int = 20,
+                 http2: bool = True, per_host_rate: Optional[float] = None,
+                 subpage_strategy: str = 'all', subpage_evidence: int = 1,
+                 max_discovered_subpages: int = 4, probe_timeout: float = 5.0,
+                 metrics: Optional[MetricsRegistry] = None, lexicon: Optional[Lexicon] = None):
+        if parser not in PARSER_BACKENDS:
+            raise ValueError(f"未知的解析器: {parser}，可选值: {', '.join(PARSER_BACKENDS)}")
+        if subpage_strategy not in SUBPAGE_STRATEGIES:
+            raise ValueError(f"未知的子页面策略: {subpage_strategy}，可选值: {', '.join(SUBPAGE_STRATEGIES)}")
+        self.parser = parser
+        self.max_bytes = max_bytes
+        self.cache = cache
+        self.analysis_cache = analysis_cache
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.per_host_rate = per_host_rate
+        self.subpage_strategy = subpage_strategy
+        self.subpage_evidence = subpage_evidence
+        self.max_discovered_subpages = max_discovered_subpages
+        self.probe_timeout = probe_timeout
+        self.metrics = metrics or REGISTRY
+        self._fetch_seconds = self.metrics.histogram(
+            'page_fetch_seconds', '页面抓取总耗时（按来源：network / cache / revalidated / verdict / error）', ('source',))
+        self._fetch_phase_seconds = self.metrics.histogram(
+            'page_fetch_phase_seconds', '页面抓取各阶段耗时（connect 含 DNS 解析、tls、ttfb、body）', ('phase',))
+        self._analysis_seconds = self.metrics.histogram(
+            'page_analysis_seconds', '页面分析各步骤耗时（parse / scan / comments / links）', ('step', 'parser'))
         
-        self.chinese_surnames = {
-            '王', '李', '张', '刘', '陈', '杨', '赵', '黄', '周', '吴', '徐', '孙', '胡', '朱', '高',
-            '林', '何', '郭', '马', '罗', '梁', '宋', '郑', '谢', '韩', '唐', '冯', '于', '董', '萧',
-            '程', '曹', '袁', '邓', '许', '傅', '沈', '曾', '彭', '吕', '苏', '卢', '蒋', '蔡', '贾',
-            '丁', '魏', '薛', '叶', '阎', '余', '潘', '杜', '戴', '夏', '钟', '汪', '田', '任', '姜'
-        }
+        self.lexicon = lexicon if lexicon is not None else DEFAULT_LEXICON
         
         self.common_subpages = ['about', 'privacy', 'contact', 'team', 'company', 'careers']
         
-        self.client = httpx.Client(
-            timeout=30.0,
-            follow_redirects=True,
-            headers={
+        self.scheduler = self._create_scheduler()
+        self._client = None
+
+    @property
+    def chinese_cities(self) -> FrozenSet[str]:
+        return self.lexicon.cities
+
+    @chinese_cities.setter
+    def chinese_cities(self, cities: Iterable[str]) -> None:
+        self.lexicon = Lexicon(cities, self.lexicon.surnames)
+
+    @property
+    def chinese_surnames(self) -> FrozenSet[str]:
+        return self.lexicon.surnames
+
+    @chinese_surnames.setter
+    def chinese_surnames(self, surnames: Iterable[str]) -> None:
+        self.lexicon = Lexicon(self.lexicon.cities, surnames)
+
+    @property
+    def client(self):
+        """HTTP 客户端在第一次发出请求时才创建"""
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+
+    def _create_scheduler(self) -> HostScheduler:
+        return HostScheduler(max_in_flight=1, per_host_in_flight=1, per_host_rate=self.per_host_rate)
+
+    def _client_options(self) -> Dict:
+        """同步与异步客户端共用的配置"""
+        import httpx
+        return {
+            'timeout': 30.0,
+            'follow_redirects': True,
+            'http2': self.http2,
+            'limits': httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections
+            ),
+            'headers': {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
-        )
+        }
+
+    def _create_client(self) -> httpx.Client:
+        import httpx
+        return httpx.Client(**self._client_options())
 
     def __del__(self):
-        if hasattr(self, 'client'):
-            self.client.close()
+        if getattr(self, '_client', None) is not None:
+            self._client.close()
+
+    def pool_stats(self) -> Dict:
+        """连接池与调度器统计：连接数、空闲连接数，总体与最繁忙主机的在途/排队/请求数"""
+        pool = getattr(getattr(self._client, '_transport', None), '_pool', None)
+        connections = list(getattr(pool, 'connections', []))
+        return {
+            'http2': self.http2,
+            'connections': len(connections),
+            'idle_connections': sum(1 for c in connections if c.is_idle()),
+            'scheduler': self.scheduler.stats()
+        }
+
+    def stats(self) -> Dict:
+        """抓取器的进程内统计：耗时直方图、连接池、缓存"""
+        return {
+            'metrics': self.metrics.stats('page_'),
+            'pool': self.pool_stats(),
+            'http_cache': self.cache.stats() if self.cache else None,
+            'analysis_cache': self.analysis_cache.stats() if self.analysis_cache else None
+        }
+
+    def _observe_fetch(self, source: str, started: float) -> None:
+        self._fetch_seconds.observe(time.perf_counter() - started, source=source)
 
     def _is_chinese_char(self, char: str) -> bool:
         """检测是否为中文字符，排除日文假名"""
@@ -55,11 +461,10 @@ class PageFetcher:
 
     def _extract_chinese_from_text(self, text: str) -> Set[str]:
         """从文本中提取中文字符"""
-        chinese_chars = set()
-        for char in text:
-            if self._is_chinese_char(char):
-                chinese_chars.add(char)
-        return chinese_chars
+        return set(_CJK_CHAR_RE.findall(''.join(set(text))))
+
+    def _scanner(self) -> ChineseScanner:
+        return self.lexicon.scanner
 
     def _check_domain_language(self, url: str) -> Optional[str]:
         """根据域名判断语言"""
@@ -70,37 +475,90 @@ class PageFetcher:
             return 'non-chinese'
         return None
 
+    def _iter_text(self, response: httpx.Response) -> Iterator[str]:
+        """流式读取响应体，超过 max_bytes 即停止，逐块返回解码后的文本"""
+        body = _BodyDecoder(response, self.max_bytes)
+        for chunk in response.iter_bytes():
+            text = body.feed(chunk)
+            if text:
+                yield text
+            if body.truncated:
+                return
+        tail = body.finish()
+        if tail:
+            yield tail
+
     def _fetch_page(self, url: str) -> Optional[str]:
-        """抓取网页内容"""
+        """抓取网页内容，启用缓存时优先使用本地副本或条件请求"""
+        started = time.perf_counter()
         try:
+            cached = self.cache.lookup(url) if self.cache else None
+            if cached and cached.fresh:
+                logger.info(f"使用缓存页面: {url}")
+                self._observe_fetch('cache', started)
+                return cached.body
+            
             logger.info(f"正在抓取页面: {url}")
-            response = self.client.get(url)
-            response.raise_for_status()
-            return response.text
+            headers = cached.validators() if cached else None
+            timer = _FetchTimer()
+            with self.scheduler.sync_slot(url), self.client.stream(
+                    'GET', url, headers=headers, extensions={'trace': timer.trace}) as response:
+                if cached and response.status_code == 304:
+                    self.cache.revalidated(url)
+                    self._observe_fetch('revalidated', started)
+                    return cached.body
+                response.raise_for_status()
+                html = ''.join(self._iter_text(response))
+                timer.observe(self._fetch_phase_seconds, time.perf_counter())
+                if self.cache:
+                    self.cache.store(url, html, response.headers)
+                self._observe_fetch('network', started)
+                return html
+        except Exception as e:
+            logger.error(f"抓取页面失败 {url}: {e}")
+            self._observe_fetch('error', started)
+            return None
+
+    def _fetch_verdict(self, url: str) -> Optional[bool]:
+        """流式读取网页，一旦发现中文线索立即停止读取；抓取失败返回 None"""
+        started = time.perf_counter()
+        try:
+            logger.info(f"正在快速判定页面: {url}")
+            parser = _VerdictParser(self._scanner())
+            with self.scheduler.sync_slot(url), self.client.stream('GET', url) as response:
+                response.raise_for_status()
+                for chunk in self._iter_text(response):
+                    parser.feed(chunk)
+                    if parser.found:
+                        self._observe_fetch('verdict', started)
+                        return True
+            parser.close()
+            self._observe_fetch('verdict', started)
+            return parser.found
         except Exception as e:
             logger.error(f"抓取页面失败 {url}: {e}")
+            self._observe_fetch('error', started)
             return None
 
     def _extract_meta_info(self, soup: BeautifulSoup) -> Dict[str, str]:
         """提取meta标签信息"""
         meta_info = {}
         
-        useful_meta_names = [
-            'description', 'keywords', 'author', 'title', 'og:title', 
-            'og:description', 'twitter:title', 'twitter:description'
-        ]
-        
         for meta in soup.find_all('meta'):
             name = meta.get('name') or meta.get('property')
             content = meta.get('content')
             
-            if name and content and name.lower() in useful_meta_names:
+            if name and content and name.lower() in USEFUL_META_NAMES:
                 meta_info[name.lower()] = content
                 
         return meta_info
 
     def _extract_external_links(self, soup: BeautifulSoup, base_url: str) -> Dict[str, List[str]]:
         """提取外链，特别是LinkedIn、GitHub、X.com"""
+        return self._classify_links([link['href'] for link in soup.find_all('a', href=True)], base_url)
+
+    def _classify_links(self, hrefs: List[str], base_url: str) -> Dict[str, List[str]]:
+        """按平台对链接分类"""
         external_links = {
             'linkedin': [],
             'github': [],
@@ -108,8 +566,7 @@ class PageFetcher:
             'other': []
         }
         
-        for link in soup.find_all('a', href=True):
-            href = link['href']
+        for href in hrefs:
             full_url = urljoin(base_url, href)
             domain = urlparse(full_url).netloc.lower()
             
@@ -126,6 +583,7 @@ class PageFetcher:
 
     def _extract_comments(self, soup: BeautifulSoup) -> Dict[str, Set[str]]:
         """提取HTML、JS、CSS注释中的中文字符"""
+        from bs4 import Comment
         comments_chinese = {
             'html': set(),
             'js': set(),
@@ -154,42 +612,231 @@ class PageFetcher:
         
         return comments_chinese
 
-    def _analyze_page_content(self, html: str, url: str) -> Dict:
-        """分析页面内容"""
+    def _walk_soup(self, html: str) -> _PageParts:
+        """用 BeautifulSoup 解析，并在一次遍历中收集正文、meta、链接与注释"""
+        from bs4 import BeautifulSoup, CData, Comment, NavigableString, Tag
+        parts = _PageParts()
         soup = BeautifulSoup(html, 'html.parser')
         
-        page_text = soup.get_text()
+        for node in soup.descendants:
+            node_type = type(node)
+            if node_type is NavigableString or node_type is CData:
+                parts.text.append(node)
+            elif node_type is Comment:
+                parts.html_comments.append(node)
+            elif node_type is Tag:
+                name = node.name
+                if name == 'a':
+                    href = node.get('href')
+                    if href is not None:
+                        parts.hrefs.append(href)
+                elif name == 'meta':
+                    parts.add_meta(node.get('name') or node.get('property'), node.get('content'))
+                elif name == 'script':
+                    if node.string:
+                        parts.scripts.append(node.string)
+                elif name == 'style':
+                    if node.string:
+                        parts.styles.append(node.string)
         
-        chinese_chars = self._extract_chinese_from_text(page_text)
+        return parts
+
+    def _walk_lxml(self, html: str) -> _PageParts:
+        """用 lxml 解析，并在一次遍历中收集正文、meta、链接与注释"""
+        from lxml import etree
+        parts = _PageParts()
+        root = etree.fromstring(html.encode('utf-8', 'replace'), _lxml_parser())
+        if root is None:
+            return parts
         
-        found_cities = set()
-        for city in self.chinese_cities:
-            if city in page_text:
-                found_cities.add(city)
+        skip_depth = 0
+        for event, element in etree.iterwalk(root, events=('start', 'end', 'comment', 'pi')):
+            tag = element.tag
+            if event == 'start':
+                if tag in _NON_TEXT_TAGS:
+                    if tag == 'script' and element.text:
+                        parts.scripts.append(element.text)
+                    elif tag == 'style' and element.text:
+                        parts.styles.append(element.text)
+                    skip_depth += 1
+                else:
+                    if not skip_depth and element.text:
+                        parts.text.append(element.text)
+                    if tag == 'a':
+                        href = element.get('href')
+                        if href is not None:
+                            parts.hrefs.append(href)
+                    elif tag == 'meta':
+                        parts.add_meta(element.get('name') or element.get('property'), element.get('content'))
+            else:
+                # 注释与处理指令没有 end 事件，其尾随文本在此一并处理
+                if event == 'comment':
+                    comment = element.text or ''
+                    if comment.startswith('[CDATA[') and comment.endswith(']]'):
+                        # libxml2 把 <![CDATA[...]]> 解析成注释，html.parser 则视为正文，这里与之保持一致
+                        if not skip_depth:
+                            parts.text.append(comment[len('[CDATA['):-len(']]')])
+                    else:
+                        parts.html_comments.append(comment)
+                elif event == 'end' and tag in _NON_TEXT_TAGS:
+                    skip_depth -= 1
+                if not skip_depth and element.tail:
+                    parts.text.append(element.tail)
         
-        found_surnames = set()
-        for surname in self.chinese_surnames:
-            if surname in page_text:
-                found_surnames.add(surname)
+        return parts
+
+    def _extract_page_features(self, html: str) -> Dict:
+        """解析页面并提取与网址无关的特征，结果可按内容缓存"""
+        step = self._analysis_seconds
+        with step.time(step='parse', parser=self.parser):
+            if self.parser == 'lxml':
+                parts = self._walk_lxml(html)
+            else:
+                parts = self._walk_soup(html)
         
-        meta_info = self._extract_meta_info(soup)
+        with step.time(step='scan', parser=self.parser):
+            page_text = ''.join(parts.text)
+            chinese_chars, found_cities, found_surnames = self._scanner().scan(page_text)
         
-        external_links = self._extract_external_links(soup, url)
+        started = time.perf_counter()
+        js_comments = []
+        for script in parts.scripts:
+            js_comments.extend(re.findall(r'//.*', script))
+            js_comments.extend(re.findall(r'/\*.*?\*/', script, re.DOTALL))
         
-        comments_chinese = self._extract_comments(soup)
+        css_comments = []
+        for style in parts.styles:
+            css_comments.extend(re.findall(r'/\*.*?\*/', style, re.DOTALL))
+        
+        comments_chinese = {
+            'html': self._extract_chinese_from_text(''.join(parts.html_comments)),
+            'js': self._extract_chinese_from_text(''.join(js_comments)),
+            'css': self._extract_chinese_from_text(''.join(css_comments))
+        }
+        step.observe(time.perf_counter() - started, step='comments', parser=self.parser)
         
         return {
-            'chinese_chars': list(chinese_chars),
-            'chinese_cities': list(found_cities),
-            'chinese_surnames': list(found_surnames),
-            'meta_info': meta_info,
+            'chinese_chars': sorted(chinese_chars),
+            'chinese_cities': sorted(found_cities),
+            'chinese_surnames': sorted(found_surnames),
+            'meta_info': parts.meta_info,
+            'hrefs': parts.hrefs,
+            'comments_chinese': {k: sorted(v) for k, v in comments_chinese.items()}
+        }
+
+    def _page_features(self, html: str) -> Dict:
+        """获取页面特征，启用 analysis_cache 时相同内容只解析一次"""
+        if self.analysis_cache is None:
+            return self._extract_page_features(html)
+        
+        key = content_key(html, self._scanner().fingerprint, self.parser)
+        features = self.analysis_cache.get(key)
+        if features is None:
+            features = self._extract_page_features(html)
+            self.analysis_cache.put(key, features)
+        return features
+
+    def _analyze_page_content(self, html: str, url: str) -> Dict:
+        """分析页面内容"""
+        return self._build_analysis(self._page_features(html), url)
+
+    def _build_analysis(self, features: Dict, url: str) -> Dict:
+        """由页面特征生成分析结果，外链按当前网址归类"""
+        chinese_chars = list(features['chinese_chars'])
+        found_cities = list(features['chinese_cities'])
+        found_surnames = list(features['chinese_surnames'])
+        with self._analysis_seconds.time(step='links', parser=self.parser):
+            external_links = self._classify_links(features['hrefs'], url)
+        
+        return {
+            'chinese_chars': chinese_chars,
+            'chinese_cities': found_cities,
+            'chinese_surnames': found_surnames,
+            'meta_info': dict(features['meta_info']),
             'external_links': external_links,
-            'comments_chinese': {k: list(v) for k, v in comments_chinese.items()},
+            'comments_chinese': {k: list(v) for k, v in features['comments_chinese'].items()},
             'has_chinese': len(chinese_chars) > 0 or len(found_cities) > 0 or len(found_surnames) > 0
         }
 
-    def _check_subpages(self, base_url: str) -> Dict:
-        """检查子页面"""
+    def _subpage_candidates(self, base_url: str, hrefs: Optional[List[str]]) -> List[Tuple[str, str, bool]]:
+        """自适应策略的候选子页面，返回 (名称, 网址, 是否需要预探测)
+
+        主页面上指向同一主机、路径包含常见子页面关键词的链接排在前面，
+        它们确实存在，无需预探测；其后是尚未覆盖的常见子页面猜测地址。
+        """
+        base = urlparse(base_url)
+        host = base.netloc.lower()
+        seen = {base_url.split('#', 1)[0].rstrip('/')}
+        candidates = []
+        
+        for href in hrefs or []:
+            if len(candidates) >= self.max_discovered_subpages:
+                break
+            full_url = urljoin(base_url, href).split('#', 1)[0]
+            parsed = urlparse(full_url)
+            if parsed.scheme not in ('http', 'https') or parsed.netloc.lower() != host:
+                continue
+            path = parsed.path.strip('/')
+            last_segment = path.rsplit('/', 1)[-1].lower()
+            if not any(keyword in last_segment for keyword in self.common_subpages):
+                continue
+            if full_url.rstrip('/') in seen:
+                continue
+            seen.add(full_url.rstrip('/'))
+            candidates.append((path, full_url, False))
+        
+        for subpage in self.common_subpages:
+            subpage_url = urljoin(base_url, subpage)
+            if subpage_url.rstrip('/') not in seen:
+                seen.add(subpage_url.rstrip('/'))
+                candidates.append((subpage, subpage_url, True))
+        
+        return candidates
+
+    def _probe_result(self, response: httpx.Response) -> bool:
+        """根据 HEAD 响应判断页面是否值得完整抓取"""
+        if response.status_code in (405, 501):  # 不支持 HEAD，交给 GET 判断
+            return True
+        if response.status_code >= 400:
+            return False
+        mime_type = response.headers.get('content-type', '').split(';', 1)[0].strip().lower()
+        return not mime_type or mime_type in HTML_CONTENT_TYPES
+
+    def _probe_page(self, url: str) -> bool:
+        """用短超时的 HEAD 请求预探测页面是否存在"""
+        try:
+            with self.scheduler.sync_slot(url):
+                response = self.client.head(url, timeout=self.probe_timeout)
+            return self._probe_result(response)
+        except Exception as e:
+            logger.info(f"预探测失败，跳过 {url}: {e}")
+            return False
+
+    def _check_subpages_adaptive(self, base_url: str, hrefs: Optional[List[str]]) -> Dict:
+        """自适应检查子页面：先预探测猜测地址，证据足够即停止"""
+        subpage_results = {}
+        
+        for subpage, subpage_url, needs_probe in self._subpage_candidates(base_url, hrefs):
+            if needs_probe and not self._probe_page(subpage_url):
+                continue
+            html = self._fetch_page(subpage_url)
+            
+            if html:
+                logger.info(f"分析子页面: {subpage}")
+                result = self._analyze_page_content(html, subpage_url)
+                if result['has_chinese']:
+                    subpage_results[subpage] = result
+                    logger.info(f"在子页面 {subpage} 中发现中文内容")
+                    if len(subpage_results) >= self.subpage_evidence:
+                        break
+        
+        return subpage_results
+
+    def _check_subpages(self, base_url: str, hrefs: Optional[List[str]] = None) -> Dict:
+        """检查子页面；hrefs 为主页面上的链接，供自适应策略发现子页面"""
+        if self.subpage_strategy == 'adaptive':
+            return self._check_subpages_adaptive(base_url, hrefs)
+        
         subpage_results = {}
         
         for subpage in self.common_subpages:
@@ -205,11 +852,17 @@ class PageFetcher:
             
         return subpage_results
 
-    def run(self, url: str) -> Dict:
-        """主要运行方法"""
-        logger.info(f"开始分析网页: {url}")
-        
-        result = {
+    def _check_subpages_verdict(self, base_url: str) -> Dict:
+        """快速判定子页面，发现第一个含中文的子页面即停止"""
+        for subpage in self.common_subpages:
+            if self._fetch_verdict(urljoin(base_url, subpage)):
+                logger.info(f"在子页面 {subpage} 中发现中文内容")
+                return {subpage: {'has_chinese': True}}
+        return {}
+
+    def _new_result(self, url: str) -> Dict:
+        """创建空的结果结构"""
+        return {
             'url': url,
             'is_chinese': False,
             'confidence': 'low',
@@ -218,8 +871,10 @@ class PageFetcher:
             'domain_check': None,
             'summary': {}
         }
-        
-        domain_lang = self._check_domain_language(url)
+
+    def _apply_domain_check(self, result: Dict) -> bool:
+        """根据域名判断语言，返回是否已得出结论"""
+        domain_lang = self._check_domain_language(result['url'])
         result['domain_check'] = domain_lang
         
         if domain_lang == 'chinese':
@@ -227,14 +882,87 @@ class PageFetcher:
             result['is_chinese'] = True
             result['confidence'] = 'high'
             result['summary']['reason'] = '域名包含.cn'
-            return result
+            return True
         elif domain_lang == 'non-chinese':
             logger.info("域名包含.jp，判断为非中文网站")
             result['is_chinese'] = False
             result['confidence'] = 'high'
             result['summary']['reason'] = '域名包含.jp'
+            return True
+        return False
+
+    def _apply_main_analysis(self, result: Dict, main_analysis: Dict) -> bool:
+        """写入主页面分析结果，返回是否已得出结论"""
+        result['main_page'] = main_analysis
+        
+        if main_analysis['has_chinese']:
+            logger.info("主页面发现中文内容")
+            result['is_chinese'] = True
+            result['confidence'] = 'high'
+            result['summary']['reason'] = '主页面包含中文内容'
+            if 'chinese_chars' in main_analysis:
+                result['summary']['chinese_indicators'] = {
+                    'chars_count': len(main_analysis['chinese_chars']),
+                    'cities_count': len(main_analysis['chinese_cities']),
+                    'surnames_count': len(main_analysis['chinese_surnames'])
+                }
+            return True
+        
+        logger.info("主页面未发现中文内容，检查子页面")
+        return False
+
+    def _apply_subpage_results(self, result: Dict, subpage_results: Dict) -> None:
+        """写入子页面分析结果"""
+        result['subpages'] = subpage_results
+        
+        if subpage_results:
+            result['is_chinese'] = True
+            result['confidence'] = 'medium'
+            result['summary']['reason'] = f'子页面包含中文内容: {list(subpage_results.keys())}'
+        else:
+            result['is_chinese'] = False
+            result['confidence'] = 'medium'
+            result['summary']['reason'] = '主页面和子页面均未发现中文内容'
+
+    def _log_result(self, result: Dict) -> None:
+        logger.info(f"分析完成，结果: {'中文网站' if result['is_chinese'] else '非中文网站'} (置信度: {result['confidence']})")
+
+    def _check_mode(self, mode: str) -> None:
+        if mode not in RUN_MODES:
+            raise ValueError(f"未知的运行模式: {mode}，可选值: {', '.join(RUN_MODES)}")
+
+    def _run_verdict(self, result: Dict) -> Dict:
+        """快速判定模式：只给出是否中文与置信度"""
+        url = result['url']
+        found = self._fetch_verdict(url)
+        if found is None:
+            logger.error("无法抓取主页面")
+            result['summary']['reason'] = '无法抓取页面'
             return result
         
+        if not self._apply_main_analysis(result, {'has_chinese': found}):
+            self._apply_subpage_results(result, self._check_subpages_verdict(url))
+        
+        self._log_result(result)
+        return result
+
+    def run(self, url: str, mode: str = 'full') -> Dict:
+        """主要运行方法
+
+        mode='full' 返回完整分析结果；mode='verdict' 只判定是否为中文网站，
+        读到第一个中文线索即停止，不构建 BeautifulSoup 文档树。
+        """
+        self._check_mode(mode)
+        logger.info(f"开始分析网页: {url}")
+        
+        result = self._new_result(url)
+        
+        if self._apply_domain_check(result):
+            return result
+        
+        if mode == 'verdict':
+            return self._run_verdict(result)
+        
         html = self._fetch_page(url)
         if not html:
             logger.error("无法抓取主页面")
@@ -242,32 +970,381 @@ class PageFetcher:
             return result
         
         logger.info("分析主页面内容")
-        main_analysis = self._analyze_page_content(html, url)
-        result['main_page'] = main_analysis
+        features = self._page_features(html)
+        main_analysis = self._build_analysis(features, url)
         
-        if main_analysis['has_chinese']:
-            logger.info("主页面发现中文内容")
-            result['is_chinese'] = True
-            result['confidence'] = 'high'
-            result['summary']['reason'] = '主页面包含中文内容'
-            result['summary']['chinese_indicators'] = {
-                'chars_count': len(main_analysis['chinese_chars']),
-                'cities_count': len(main_analysis['chinese_cities']),
-                'surnames_count': len(main_analysis['chinese_surnames'])
-            }
-        else:
-            logger.info("主页面未发现中文内容，检查子页面")
-            subpage_results = self._check_subpages(url)
-            result['subpages'] = subpage_results
+        if not self._apply_main_analysis(result, main_analysis):
+            self._apply_subpage_results(result, self._check_subpages(url, features['hrefs']))
+        
+        self._log_result(result)
+        return result
+
+
+@lru_cache(maxsize=4)
+def _worker_fetcher(parser: str, cities: FrozenSet[str], surnames: FrozenSet[str]) -> PageFetcher:
+    return PageFetcher(parser=parser, lexicon=Lexicon(cities, surnames))
+
+
+def _extract_features_batch(htmls: List[str], parser: str, cities: FrozenSet[str],
+                            surnames: FrozenSet[str]) -> List[Dict]:
+    """在工作进程中批量提取页面特征"""
+    fetcher = _worker_fetcher(parser, cities, surnames)
+    return [fetcher._extract_page_features(html) for html in htmls]
+
+
+class _AnalysisPipeline:
+    """把 CPU 密集的页面解析按批次交给进程池
+
+    待解析页面放入有界队列，在途批次数也有上限；队列满时 ``submit`` 会等待，
+    从而反压抓取协程，已抓取未解析的页面数量不会无限增长。
+    工作进程异常退出（内存不足、解析器崩溃）后进程池不可再用，
+    此时受影响批次的页面以 BrokenProcessPool 失败，并换用新的进程池继续处理。
+    """
+
+    def __init__(self, fetcher: PageFetcher, workers: int, batch_size: int, max_pending: int):
+        self.fetcher = fetcher
+        self.batch_size = batch_size
+        self.workers = workers
+        self._executor = self._create_executor()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._inflight = asyncio.Semaphore(workers * 2)
+        self._dispatcher = asyncio.ensure_future(self._dispatch())
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # 进程池在事件循环已有线程（如 getaddrinfo 所用的线程池）时才创建，
+        # fork 会复制其他线程持有的锁，因此用 forkserver（不支持的平台用 spawn）
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(method))
+
+    def _replace_executor(self, broken: ProcessPoolExecutor) -> None:
+        """换掉已损坏的进程池；同一进程池的多个批次先后失败时只替换一次"""
+        if self._executor is broken:
+            logger.warning("解析进程池中有工作进程异常退出，重建进程池")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._create_executor()
+
+    async def submit(self, html: str) -> Dict:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((html, future))
+        return await future
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
             
-            if subpage_results:
-                result['is_chinese'] = True
-                result['confidence'] = 'medium'
-                result['summary']['reason'] = f'子页面包含中文内容: {list(subpage_results.keys())}'
+            await self._inflight.acquire()
+            fetcher = self.fetcher
+            executor = self._executor
+            try:
+                pending = loop.run_in_executor(
+                    executor, _extract_features_batch, [html for html, _ in batch],
+                    fetcher.parser, fetcher.lexicon.cities, fetcher.lexicon.surnames
+                )
+            except Exception as e:
+                # 提交失败只影响这一批，调度协程继续运行，后续页面不会一直等待
+                self._inflight.release()
+                self._fail(batch, e)
+                if isinstance(e, BrokenProcessPool):
+                    self._replace_executor(executor)
+                continue
+            pending.add_done_callback(
+                lambda done, batch=batch, executor=executor: self._resolve(batch, done, executor))
+
+    @staticmethod
+    def _fail(batch: List[Tuple[str, asyncio.Future]], error: BaseException) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    def _resolve(self, batch: List[Tuple[str, asyncio.Future]], done: asyncio.Future,
+                 executor: ProcessPoolExecutor) -> None:
+        self._inflight.release()
+        error = asyncio.CancelledError() if done.cancelled() else done.exception()
+        if isinstance(error, BrokenProcessPool):
+            self._replace_executor(executor)
+        for index, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
             else:
-                result['is_chinese'] = False
-                result['confidence'] = 'medium'
-                result['summary']['reason'] = '主页面和子页面均未发现中文内容'
+                future.set_result(done.result()[index])
+
+    async def close(self) -> None:
+        self._dispatcher.cancel()
+        try:
+            await self._dispatcher
+        except asyncio.CancelledError:
+            pass
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+class AsyncPageFetcher(PageFetcher):
+    """基于 httpx.AsyncClient 的并发抓取器，支持全局与单主机并发限制及单主机限速
+
+    分析逻辑与 PageFetcher 完全一致，``run`` 返回的结果结构也相同；
+    区别在于主页面与子页面的请求在事件循环上并发执行。
+    """
+
+    def __init__(self, max_concurrency: int = 50, per_host_concurrency: int = 4,
+                 analysis_workers: int = 0, analysis_batch_size: int = 16,
+                 max_pending_pages: int = 256, **kwargs):
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.analysis_workers = analysis_workers
+        self.analysis_batch_size = analysis_batch_size
+        self.max_pending_pages = max_pending_pages
+        self._pipeline: Optional[_AnalysisPipeline] = None
+        super().__init__(**kwargs)
+
+    def _create_client(self) -> httpx.AsyncClient:
+        import httpx
+        return httpx.AsyncClient(**self._client_options())
+
+    def __del__(self):
+        pass
+
+    async def aclose(self) -> None:
+        if self._pipeline is not None:
+            await self._pipeline.close()
+            self._pipeline = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> 'AsyncPageFetcher':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def _create_scheduler(self) -> HostScheduler:
+        return HostScheduler(self.max_concurrency, self.per_host_concurrency, self.per_host_rate)
+
+    async def _analyze(self, html: str, url: str) -> Dict:
+        """分析页面；配置了 analysis_workers 时解析交给进程池，事件循环只负责网络 I/O"""
+        return self._build_analysis(await self._page_features_async(html), url)
+
+    async def _page_features_async(self, html: str) -> Dict:
+        if self.analysis_workers <= 0:
+            return self._page_features(html)
         
-        logger.info(f"分析完成，结果: {'中文网站' if result['is_chinese'] else '非中文网站'} (置信度: {result['confidence']})")
+        key = None
+        features = None
+        if self.analysis_cache is not None:
+            key = content_key(html, self._scanner().fingerprint, self.parser)
+            features = self.analysis_cache.get(key)
+        if features is None:
+            if self._pipeline is None:
+                self._pipeline = _AnalysisPipeline(
+                    self, self.analysis_workers, self.analysis_batch_size, self.max_pending_pages)
+            features = await self._pipeline.submit(html)
+            if key is not None:
+                self.analysis_cache.put(key, features)
+        return features
+
+    async def _aiter_text(self, response: httpx.Response) -> AsyncIterator[str]:
+        """流式读取响应体（异步版本），超过 max_bytes 即停止"""
+        body = _BodyDecoder(response, self.max_bytes)
+        async for chunk in response.aiter_bytes():
+            text = body.feed(chunk)
+            if text:
+                yield text
+            if body.truncated:
+                return
+        tail = body.finish()
+        if tail:
+            yield tail
+
+    async def _fetch_page(self, url: str) -> Optional[str]:
+        """抓取网页内容（请求受 HostScheduler 的并发与速率限制）"""
+        started = time.perf_counter()
+        try:
+            cached = self.cache.lookup(url) if self.cache else None
+            if cached and cached.fresh:
+                logger.info(f"使用缓存页面: {url}")
+                self._observe_fetch('cache', started)
+                return cached.body
+            
+            async with self.scheduler.slot(url):
+                logger.info(f"正在抓取页面: {url}")
+                headers = cached.validators() if cached else None
+                timer = _FetchTimer()
+                async with self.client.stream(
+                        'GET', url, headers=headers, extensions={'trace': timer.atrace}) as response:
+                    if cached and response.status_code == 304:
+                        self.cache.revalidated(url)
+                        self._observe_fetch('revalidated', started)
+                        return cached.body
+                    response.raise_for_status()
+                    html = ''.join([text async for text in self._aiter_text(response)])
+                    timer.observe(self._fetch_phase_seconds, time.perf_counter())
+                    if self.cache:
+                        self.cache.store(url, html, response.headers)
+                    self._observe_fetch('network', started)
+                    return html
+        except Exception as e:
+            logger.error(f"抓取页面失败 {url}: {e}")
+            self._observe_fetch('error', started)
+            return None
+
+    async def _probe_page(self, url: str) -> bool:
+        """用短超时的 HEAD 请求预探测页面是否存在"""
+        try:
+            async with self.scheduler.slot(url):
+                response = await self.client.head(url, timeout=self.probe_timeout)
+            return self._probe_result(response)
+        except Exception as e:
+            logger.info(f"预探测失败，跳过 {url}: {e}")
+            return False
+
+    async def _check_subpages_adaptive(self, base_url: str, hrefs: Optional[List[str]]) -> Dict:
+        """自适应检查子页面（并发版本），证据足够后取消其余请求"""
+        candidates = self._subpage_candidates(base_url, hrefs)
+
+        async def check(index: int, subpage: str, subpage_url: str, needs_probe: bool):
+            if needs_probe and not await self._probe_page(subpage_url):
+                return index, subpage, None
+            html = await self._fetch_page(subpage_url)
+            if not html:
+                return index, subpage, None
+            logger.info(f"分析子页面: {subpage}")
+            return index, subpage, await self._analyze(html, subpage_url)
+
+        tasks = [asyncio.ensure_future(check(i, *candidate)) for i, candidate in enumerate(candidates)]
+        found = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, subpage, result = await next_done
+                if result and result['has_chinese']:
+                    logger.info(f"在子页面 {subpage} 中发现中文内容")
+                    found.append((index, subpage, result))
+                    if len(found) >= self.subpage_evidence:
+                        break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        return {subpage: result for _, subpage, result in sorted(found, key=lambda item: item[0])}
+
+    async def _check_subpages(self, base_url: str, hrefs: Optional[List[str]] = None) -> Dict:
+        """并发检查子页面，结果顺序与 common_subpages 一致"""
+        if self.subpage_strategy == 'adaptive':
+            return await self._check_subpages_adaptive(base_url, hrefs)
+        
+        async def check(subpage: str) -> Optional[Dict]:
+            subpage_url = urljoin(base_url, subpage)
+            html = await self._fetch_page(subpage_url)
+            if not html:
+                return None
+            logger.info(f"分析子页面: {subpage}")
+            return await self._analyze(html, subpage_url)
+
+        results = await asyncio.gather(*(check(subpage) for subpage in self.common_subpages))
+        
+        subpage_results = {}
+        for subpage, result in zip(self.common_subpages, results):
+            if result and result['has_chinese']:
+                subpage_results[subpage] = result
+                logger.info(f"在子页面 {subpage} 中发现中文内容")
+        
+        return subpage_results
+
+    async def _fetch_verdict(self, url: str) -> Optional[bool]:
+        """流式读取网页，一旦发现中文线索立即停止读取；抓取失败返回 None"""
+        async with self.scheduler.slot(url):
+            started = time.perf_counter()
+            try:
+                logger.info(f"正在快速判定页面: {url}")
+                parser = _VerdictParser(self._scanner())
+                async with self.client.stream('GET', url) as response:
+                    response.raise_for_status()
+                    async for chunk in self._aiter_text(response):
+                        parser.feed(chunk)
+                        if parser.found:
+                            self._observe_fetch('verdict', started)
+                            return True
+                parser.close()
+                self._observe_fetch('verdict', started)
+                return parser.found
+            except Exception as e:
+                logger.error(f"抓取页面失败 {url}: {e}")
+                self._observe_fetch('error', started)
+                return None
+
+    async def _check_subpages_verdict(self, base_url: str) -> Dict:
+        """并发快速判定子页面，第一个含中文的子页面返回后取消其余请求"""
+        async def probe(subpage: str) -> Tuple[str, Optional[bool]]:
+            return subpage, await self._fetch_verdict(urljoin(base_url, subpage))
+
+        tasks = [asyncio.ensure_future(probe(subpage)) for subpage in self.common_subpages]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                subpage, found = await next_done
+                if found:
+                    logger.info(f"在子页面 {subpage} 中发现中文内容")
+                    return {subpage: {'has_chinese': True}}
+            return {}
+        finally:
+            for task in tasks:
+                task.cancel()
+            # 等待被取消的请求退出，释放调度器名额后再返回
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_verdict(self, result: Dict) -> Dict:
+        """快速判定模式（异步版本）"""
+        url = result['url']
+        found = await self._fetch_verdict(url)
+        if found is None:
+            logger.error("无法抓取主页面")
+            result['summary']['reason'] = '无法抓取页面'
+            return result
+        
+        if not self._apply_main_analysis(result, {'has_chinese': found}):
+            self._apply_subpage_results(result, await self._check_subpages_verdict(url))
+        
+        self._log_result(result)
         return result
+
+    async def run(self, url: str, mode: str = 'full') -> Dict:
+        """主要运行方法（异步版本），mode 含义与 PageFetcher.run 相同"""
+        self._check_mode(mode)
+        logger.info(f"开始分析网页: {url}")
+        
+        result = self._new_result(url)
+        
+        if self._apply_domain_check(result):
+            return result
+        
+        if mode == 'verdict':
+            return await self._run_verdict(result)
+        
+        html = await self._fetch_page(url)
+        if not html:
+            logger.error("无法抓取主页面")
+            result['summary']['reason'] = '无法抓取页面'
+            return result
+        
+        logger.info("分析主页面内容")
+        features = await self._page_features_async(html)
+        main_analysis = self._build_analysis(features, url)
+        
+        if not self._apply_main_analysis(result, main_analysis):
+            self._apply_subpage_results(result, await self._check_subpages(url, features['hrefs']))
+        
+        self._log_result(result)
+        return result
+
+    async def run_many(self, urls: List[str], mode: str = 'full') -> List[Dict]:
+        """并发分析多个网址，返回结果顺序与输入一致"""
+        self._check_mode(mode)
+        return list(await asyncio.gather(*(self.run(url, mode) for url in urls)))
+
+
+if __name__ == '__main__':
+    from crawl import main
+    main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+多进程分块分析 CSV 文件
+
+文件按字节范围切成若干块，切分点总是落在行尾（引号之外的换行符），
+各块在进程池中独立解析与分析，父进程按块顺序拼接逐行结果并合并统计，
+输出与逐行串行分析完全一致。
+"""
+
+import io
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from operator import attrgetter
+
+from aggregation import ProfileAggregator
+from bug_script import UserRecords, iter_csv_lines, iter_user_records
+
+DEFAULT_CHUNK_BYTES = 4 * 1024 * 1024
+_SCAN_BYTES = 64 * 1024
+
+
+def _row_end(data, pos, quoted):
+    """从 pos 起找到当前行的结束位置（换行符之后）
+
+    quoted 表示 pos 处是否位于引号字段内；引号内的换行属于字段内容，不能切分。
+    """
+    size = len(data)
+    while pos < size:
+        newline = data.find(b'\n', pos)
+        if newline < 0:
+            return size
+        quoted ^= data[pos:newline].count(b'"') % 2 == 1
+        pos = newline + 1
+        if not quoted:
+            return pos
+    return size
+
+
+def split_row_ranges(path, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """返回 (表头行, [(start, end), ...])，每个范围约 chunk_bytes 字节且由完整的行组成"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b'', []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            size = len(data)
+            body_start = _row_end(data, 0, False)
+            header = data[:body_start]
+            ranges = []
+            start = body_start
+            while start < size:
+                target = min(start + chunk_bytes, size)
+                quoted = False
+                for offset in range(start, target, _SCAN_BYTES):
+                    quoted ^= data[offset:min(offset + _SCAN_BYTES, target)].count(b'"') % 2 == 1
+                end = _row_end(data, target, quoted) if target < size else size
+                ranges.append((start, end))
+                start = end
+    return header, ranges
+
+
+def analyze_range(path, header, start, end):
+    """分析 [start, end) 范围内的行，返回 (UserRecord 列表, 按地区分组的平均分与合格人数)"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    lines = iter_csv_lines(io.BytesIO(header + data))
+    records = list(iter_user_records(lines))
+
+    scores = {}
+    eligible = {}
+    for record in records:
+        location = record.location
+        scores.setdefault(location, []).append(record.avg_score)
+        eligible[location] = eligible.get(location, 0) + record.eligible
+    return records, {location: (scores[location], eligible[location]) for location in scores}
+
+
+def analyze_csv_parallel(path, executor=None, workers=None, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """多进程分析 CSV 文件，返回 (UserRecords, ProfileAggregator)
+
+    可传入共享的 executor；未传入时临时创建 workers 个进程的进程池。
+    """
+    header, ranges = split_row_ranges(path, chunk_bytes)
+    aggregator = ProfileAggregator()
+    if len(ranges) <= 1:
+        # 只有一块时不值得跨进程传输结果
+        for start, end in ranges:
+            records, location_scores = analyze_range(path, header, start, end)
+            return UserRecords(records), aggregator.extend(map(attrgetter('avg_score'), records), location_scores)
+        return UserRecords([]), aggregator
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [executor.submit(analyze_range, path, header, start, end) for start, end in ranges]
+        analysis_results = []
+        for future in futures:
+            records, location_scores = future.result()
+            aggregator.extend(map(attrgetter('avg_score'), records), location_scores)
+            analysis_results.extend(records)
+    finally:
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+    return UserRecords(analysis_results), aggregator
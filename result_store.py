@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+/api/analyze 分析结果的暂存
+
+延迟返回明细时，接口先返回汇总与 result_id，逐行结果留在这里，
+再通过分页或 NDJSON 流式接口按需读取。
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class StoredResult:
+    """一次分析的汇总与逐行结果
+
+    rows 可以是逐行结果列表，也可以是带 rows(start, stop) 方法的对象
+    （如 columnar.ColumnarResult），后者只在读取时生成字典。
+    """
+
+    __slots__ = ('result_id', 'filename', 'summary', 'location_stats', 'created_at', '_rows')
+
+    def __init__(self, result_id, filename, summary, location_stats, rows):
+        self.result_id = result_id
+        self.filename = filename
+        self.summary = summary
+        self.location_stats = location_stats
+        self.created_at = time.time()
+        self._rows = rows
+
+    @property
+    def total_rows(self):
+        return len(self._rows)
+
+    def rows(self, start=0, stop=None):
+        """[start, stop) 范围内的逐行结果"""
+        if isinstance(self._rows, list):
+            return self._rows[start:stop]
+        return self._rows.rows(start, stop)
+
+    def iter_rows(self, page_size=1000):
+        """按页依次产出全部逐行结果"""
+        for start in range(0, self.total_rows, page_size):
+            yield from self.rows(start, start + page_size)
+
+    def header(self):
+        """不含明细的结果概要"""
+        return {
+            "result_id": self.result_id,
+            "filename": self.filename,
+            "total_rows": self.total_rows,
+            "summary": self.summary,
+            "location_stats": self.location_stats
+        }
+
+
+class ResultStore:
+    """进程内的分析结果存储：按条数与总行数做 LRU 淘汰，超过 ttl 秒的结果过期
+
+    内存占用随行数增长，因此除条数外还限制所有结果的总行数 max_rows；
+    最新放入的结果总是保留，即使它本身超过 max_rows。
+    """
+
+    def __init__(self, max_results=32, ttl=3600, max_rows=2_000_000):
+        self.max_results = max_results
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self._results = OrderedDict()
+        self._total_rows = 0
+        self._lock = threading.Lock()
+
+    def put(self, filename, summary, location_stats, rows):
+        """保存结果并返回 result_id"""
+        result = StoredResult(uuid.uuid4().hex, filename, summary, location_stats, rows)
+        with self._lock:
+            self._results[result.result_id] = result
+            self._total_rows += result.total_rows
+            self._expire()
+            while len(self._results) > 1 and (len(self._results) > self.max_results
+                                              or self._total_rows > self.max_rows):
+                self._total_rows -= self._results.popitem(last=False)[1].total_rows
+        return result.result_id
+
+    def get(self, result_id):
+        with self._lock:
+            self._expire()
+            result = self._results.get(result_id)
+            if result is not None:
+                self._results.move_to_end(result_id)
+            return result
+
+    def _expire(self):
+        deadline = time.time() - self.ttl
+        for result_id in [k for k, v in self._results.items() if v.created_at < deadline]:
+            self._total_rows -= self._results.pop(result_id).total_rows
+
+    @property
+    def total_rows(self):
+        with self._lock:
+            return self._total_rows
+
+    def __len__(self):
+        with self._lock:
+            return len(self._results)
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            self._total_rows = 0
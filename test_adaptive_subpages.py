@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+import asyncio
+
+from page_fetcher import AsyncPageFetcher, PageFetcher
+
+
+def _requests(local_site):
+    return [(method, path) for method, path, _ in local_site.requests]
+
+
+def test_discovered_link_checked_first(local_site):
+    """主页面上的子页面链接优先抓取，无需预探测，命中后立即停止"""
+    local_site.add('/', '<html><body><a href="/company/about-us#top">About</a>'
+                        '<a href="https://other.example.org/about">x</a></body></html>')
+    local_site.add('/company/about-us', '<p>总部位于杭州</p>')
+
+    result = PageFetcher(subpage_strategy='adaptive').run(local_site.url)
+    assert result['is_chinese'] is True
+    assert list(result['subpages']) == ['company/about-us']
+    assert _requests(local_site) == [('GET', '/'), ('GET', '/company/about-us')]
+
+
+def test_head_probe_skips_missing_pages(local_site):
+    """猜测的子页面先用 HEAD 预探测，不存在的页面不再 GET"""
+    local_site.add('/', '<p>Hello</p>')
+    local_site.add('/privacy', '<p>隐私政策</p>')
+
+    result = PageFetcher(subpage_strategy='adaptive').run(local_site.url)
+    assert list(result['subpages']) == ['privacy']
+    assert _requests(local_site) == [
+        ('GET', '/'), ('HEAD', '/about'), ('HEAD', '/privacy'), ('GET', '/privacy')
+    ]
+
+
+def test_adaptive_async_and_evidence_threshold(local_site):
+    """异步版本同样在证据足够后停止，结果按候选顺序排列"""
+    local_site.add('/', '<a href="/team">Team</a>')
+    local_site.add('/team', '<p>团队</p>')
+    local_site.add('/contact', '<p>联系我们</p>')
+    local_site.add('/careers', '<p>Jobs</p>')
+
+    async def main():
+        async with AsyncPageFetcher(subpage_strategy='adaptive', subpage_evidence=2) as fetcher:
+            result = await fetcher.run(local_site.url)
+            return result, fetcher.scheduler.stats()
+
+    result, scheduler_stats = asyncio.run(main())
+    assert list(result['subpages']) == ['team', 'contact']
+    assert (scheduler_stats['in_flight'], scheduler_stats['waiting']) == (0, 0)
+    assert ('HEAD', '/team') not in _requests(local_site)
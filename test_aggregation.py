@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+from aggregation import ProfileAggregator
+from bug_script import analyze_user_profiles
+
+ROWS = [
+    {"Name": "A", "Location": "New York", "avg_score": 95.0, "EligibleStatus": "YES"},
+    {"Name": "B", "Location": "London", "avg_score": 70.5, "EligibleStatus": "NO"},
+    {"Name": "C", "Location": "New York", "avg_score": 88.25, "EligibleStatus": "NO"},
+    {"Name": "D", "Location": "Unknown", "avg_score": 91.0, "EligibleStatus": "YES"},
+]
+
+
+def test_single_pass_summary():
+    aggregator = ProfileAggregator()
+    assert list(aggregator.observe(ROWS)) == ROWS
+    assert aggregator.summary() == {
+        "total_users": 4, "eligible_users": 2, "eligibility_rate": 50.0, "overall_avg_score": 86.2
+    }
+    assert aggregator.location_stats() == {
+        "New York": {"count": 2, "avg_score": 91.6, "eligible": 1},
+        "London": {"count": 1, "avg_score": 70.5, "eligible": 0},
+        "Unknown": {"count": 1, "avg_score": 91.0, "eligible": 1},
+    }
+
+
+def test_merge_matches_single_pass():
+    whole = ProfileAggregator()
+    for row in ROWS:
+        whole.add(row)
+
+    head, tail = ProfileAggregator(), ProfileAggregator()
+    for row in ROWS[:1]:
+        head.add(row)
+    for row in ROWS[1:]:
+        tail.add(row)
+    merged = head.merge(tail)
+    assert merged.summary() == whole.summary()
+    assert list(merged.location_stats().items()) == list(whole.location_stats().items())
+
+
+def test_empty():
+    aggregator = ProfileAggregator()
+    assert aggregator.summary() == {
+        "total_users": 0, "eligible_users": 0, "eligibility_rate": 0, "overall_avg_score": 0
+    }
+    assert aggregator.location_stats() == {}
+    assert list(ProfileAggregator().observe(analyze_user_profiles())) == analyze_user_profiles()
+
+
+def test_extend_matches_single_pass():
+    whole = ProfileAggregator()
+    for row in ROWS:
+        whole.add(row)
+
+    extended = ProfileAggregator()
+    for part in (ROWS[:2], ROWS[2:]):
+        location_scores = {}
+        for row in part:
+            scores, eligible = location_scores.get(row['Location'], ([], 0))
+            location_scores[row['Location']] = (scores + [row['avg_score']], eligible + (row['EligibleStatus'] == 'YES'))
+        extended.extend([row['avg_score'] for row in part], location_scores)
+    assert extended.stats() == whole.stats()
+
+
+def test_compact_records_match_dicts():
+    """紧凑记录只在序列化时转为字典，内容与字典版本一致"""
+    with open('sample_users.csv', 'rb') as f:
+        content = f.read()
+    records = analyze_user_profiles(content, compact=True)
+    assert [record.to_dict() for record in records] == analyze_user_profiles(content)
+    assert all(isinstance(record.eligible, bool) for record in records)
+    assert records[0].location is records[2].location
+
+    aggregator = ProfileAggregator()
+    list(aggregator.observe_records(records))
+    assert aggregator.stats() == ProfileAggregator().merge(_aggregate(analyze_user_profiles(content))).stats()
+
+
+def _aggregate(rows):
+    aggregator = ProfileAggregator()
+    for row in rows:
+        aggregator.add(row)
+    return aggregator
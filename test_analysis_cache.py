@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+from unittest import mock
+
+from analysis_cache import AnalysisCache
+from page_fetcher import PageFetcher
+
+HTML = '''<html><head><meta name="description" content="关于我们"><style>/* 样式 */</style></head>
+<body><!-- 注释 --><p>王先生在深圳</p><a href="/team">team</a><a href="https://github.com/acme">gh</a>
+<a href="https://other.example.org/x">o</a><script>// 脚本
+</script></body></html>'''
+
+
+def test_results_identical_with_cache_on_or_off(tmp_path):
+    """缓存开关不影响 run() 结果，且相同内容在不同网址下外链仍按各自网址解析"""
+    plain = PageFetcher()
+    cached = PageFetcher(analysis_cache=AnalysisCache(directory=str(tmp_path)))
+
+    for url in ('https://a.example.com/', 'https://other.example.org/sub/', 'https://a.example.com/'):
+        assert cached._analyze_page_content(HTML, url) == plain._analyze_page_content(HTML, url)
+
+    assert cached.analysis_cache.stats()['hits'] == 2
+
+
+def test_cache_hit_skips_parsing(tmp_path):
+    """命中缓存时不再构建 BeautifulSoup 文档树，磁盘层可跨实例共享"""
+    directory = str(tmp_path)
+    PageFetcher(analysis_cache=AnalysisCache(directory=directory))._analyze_page_content(HTML, 'https://a.com/')
+
+    fetcher = PageFetcher(analysis_cache=AnalysisCache(directory=directory))
+    with mock.patch('bs4.BeautifulSoup', side_effect=AssertionError('parsed')):
+        result = fetcher._analyze_page_content(HTML, 'https://b.com/')
+    assert result['chinese_cities'] == ['深圳']
+    assert fetcher.analysis_cache.stats()['disk_hits'] == 1
+
+
+def test_lexicon_change_invalidates_entries():
+    cache = AnalysisCache()
+    fetcher = PageFetcher(analysis_cache=cache)
+    assert fetcher._analyze_page_content(HTML, 'https://a.com/')['chinese_cities'] == ['深圳']
+    fetcher.chinese_cities = fetcher.chinese_cities | {'王先'}
+    assert fetcher._analyze_page_content(HTML, 'https://a.com/')['chinese_cities'] == ['深圳', '王先']
+
+
+def test_lru_bound():
+    cache = AnalysisCache(max_entries=2)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, {'k': key})
+    assert cache.get('a') is None
+    assert cache.get('c') == {'k': 'c'}
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+import json
+
+from fastapi.testclient import TestClient
+
+from bug_script import analyze_user_profiles, iter_csv_lines, iter_user_profiles
+from main import app
+from result_store import ResultStore
+
+client = TestClient(app)
+
+
+def _post(content: bytes, filename='users.csv', **params):
+    return client.post('/api/analyze', params=params, files={'file': (filename, content, 'text/csv')})
+
+
+def test_analyze_sample_file():
+    """接口返回的汇总与明细和原实现一致"""
+    with open('sample_users.csv', 'rb') as f:
+        content = f.read()
+
+    response = _post(content)
+    assert response.status_code == 200
+    body = response.json()
+    assert body['summary'] == {
+        'total_users': 4, 'eligible_users': 1, 'eligibility_rate': 25.0, 'overall_avg_score': 85.6
+    }
+    assert body['location_stats']['New York'] == {'count': 2, 'avg_score': 92.7, 'eligible': 1}
+    assert body['detailed_results'] == analyze_user_profiles(content)
+
+
+def test_rejects_non_csv():
+    assert _post(b'x', filename='users.txt').status_code == 500
+
+
+class _ChunkedFile:
+    """每次只返回少量字节，模拟分块读取的上传文件"""
+
+    def __init__(self, data: bytes, size: int):
+        self.data = data
+        self.size = size
+
+    def read(self, n):
+        chunk, self.data = self.data[:min(n, self.size)], self.data[min(n, self.size):]
+        return chunk
+
+
+def test_streaming_parse_handles_split_multibyte_and_crlf():
+    """多字节字符跨块、CRLF 换行、空行都能正确处理"""
+    csv_bytes = ('user_id,user_name,age,city_identifier,scores\r\n'
+                 '1,李雷,25,101,"88,92,76"\r\n\r\n'
+                 '2,bob,32,999,"95,89"').encode('utf-8')
+    lines = iter_csv_lines(_ChunkedFile(csv_bytes, 3), chunk_size=3)
+    assert list(iter_user_profiles(lines)) == analyze_user_profiles(csv_bytes)
+
+
+def test_deferred_detail_pages_and_stream():
+    """延迟模式先返回汇总与 result_id，明细可分页或按 NDJSON 流读取"""
+    with open('sample_users.csv', 'rb') as f:
+        content = f.read()
+    inline = _post(content).json()
+
+    deferred = _post(content, detail='deferred').json()
+    assert 'detailed_results' not in deferred
+    assert deferred['summary'] == inline['summary']
+    assert deferred['location_stats'] == inline['location_stats']
+    assert deferred['total_rows'] == len(inline['detailed_results'])
+
+    result_url = f"/api/results/{deferred['result_id']}"
+    assert client.get(result_url).json()['total_rows'] == deferred['total_rows']
+
+    pages = [client.get(result_url + '/rows', params={'offset': offset, 'limit': 3}).json()
+             for offset in range(0, deferred['total_rows'], 3)]
+    assert [row for page in pages for row in page['rows']] == inline['detailed_results']
+
+    response = client.get(result_url + '/rows.ndjson')
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    assert [json.loads(line) for line in response.text.splitlines()] == inline['detailed_results']
+
+
+def test_unknown_result_id():
+    assert client.get('/api/results/missing/rows').status_code == 404
+    assert _post(b'x', detail='bogus').status_code == 400
+
+
+def test_result_store_caps_total_rows():
+    """按总行数淘汰最旧的结果；最新的结果即使超过上限也保留"""
+    store = ResultStore(max_rows=10)
+    first = store.put('a.csv', {}, {}, [{}] * 6)
+    second = store.put('b.csv', {}, {}, [{}] * 4)
+    assert (len(store), store.total_rows) == (2, 10)
+
+    third = store.put('c.csv', {}, {}, [{}] * 5)
+    assert store.get(first) is None
+    assert (len(store), store.total_rows) == (2, 9)
+
+    huge = store.put('d.csv', {}, {}, [{}] * 50)
+    assert store.get(second) is None and store.get(third) is None
+    assert store.get(huge).total_rows == store.total_rows == 50
+
+
+def test_paged_serialization_matches_whole(monkeypatch):
+    """分页序列化明细的结果与一次性序列化逐字节相同"""
+    import main
+    with open('sample_users.csv', 'rb') as f:
+        content = f.read()
+    expected = _post(content).content
+    monkeypatch.setattr(main, 'SERIALIZE_PAGE_SIZE', 3)
+    assert _post(content).content == expected
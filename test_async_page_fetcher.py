@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+import asyncio
+import os
+import signal
+from concurrent.futures.process import BrokenProcessPool
+
+from page_fetcher import AsyncPageFetcher, PageFetcher
+
+
+def _build_site(local_site):
+    local_site.add('/', '<html><body><a href="https://github.com/x">gh</a>Hello</body></html>')
+    local_site.add('/about', '<html><body>我们位于北京</body></html>')
+    local_site.add('/privacy', '<html><body>Privacy policy</body></html>')
+
+
+def test_async_run_matches_sync(local_site):
+    """异步抓取结果应与同步版本完全一致"""
+    _build_site(local_site)
+
+    expected = PageFetcher().run(local_site.url)
+
+    async def main():
+        async with AsyncPageFetcher(max_concurrency=4, per_host_concurrency=2) as fetcher:
+            return await fetcher.run(local_site.url)
+
+    result = asyncio.run(main())
+    assert result['is_chinese'] is True
+    assert result['confidence'] == 'medium'
+    assert list(result['subpages']) == ['about']
+    assert result['main_page'] == expected['main_page']
+    assert result['summary'] == expected['summary']
+
+
+def test_run_many_keeps_input_order(local_site):
+    """run_many 返回顺序与输入一致"""
+    _build_site(local_site)
+    urls = [local_site.url, 'https://example.cn', local_site.url + 'about', 'https://example.jp']
+
+    async def main():
+        async with AsyncPageFetcher() as fetcher:
+            return await fetcher.run_many(urls)
+
+    results = asyncio.run(main())
+    assert [r['url'] for r in results] == urls
+    assert [r['is_chinese'] for r in results] == [True, True, True, False]
+
+
+def test_process_pool_pipeline_matches_inline(local_site):
+    """进程池解析与事件循环内解析结果一致"""
+    _build_site(local_site)
+    urls = [local_site.url, local_site.url + 'about', local_site.url + 'privacy'] * 3
+
+    async def main(**kwargs):
+        async with AsyncPageFetcher(**kwargs) as fetcher:
+            return await fetcher.run_many(urls)
+
+    inline = asyncio.run(main())
+    pooled = asyncio.run(main(analysis_workers=2, analysis_batch_size=4, max_pending_pages=2))
+    assert pooled == inline
+
+
+def test_pipeline_recovers_after_worker_dies():
+    """工作进程被杀后受影响的页面报错，之后的页面换用新进程池继续解析，不会一直等待"""
+    html = '<html><body>我们位于北京</body></html>'
+
+    async def main():
+        async with AsyncPageFetcher(analysis_workers=1) as fetcher:
+            expected = await fetcher._page_features_async(html)
+            broken = fetcher._pipeline._executor
+            for process in list(broken._processes.values()):
+                os.kill(process.pid, signal.SIGKILL)
+
+            failures = 0
+            while True:
+                try:
+                    features = await asyncio.wait_for(fetcher._page_features_async(html), timeout=30)
+                    break
+                except BrokenProcessPool:
+                    failures += 1
+                    assert failures < 3
+            assert features == expected
+            assert fetcher._pipeline._executor is not broken
+
+    asyncio.run(main())
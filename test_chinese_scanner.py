@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+import pickle
+import random
+
+import pytest
+
+from page_fetcher import DEFAULT_LEXICON, ChineseScanner, PageFetcher
+
+
+def _reference_scan(fetcher, text):
+    """逐字符、逐词条扫描的原始实现"""
+    chars = {c for c in text if fetcher._is_chinese_char(c)}
+    cities = {c for c in fetcher.chinese_cities if c in text}
+    surnames = {s for s in fetcher.chinese_surnames if s in text}
+    return chars, cities, surnames
+
+
+def test_scanner_matches_reference():
+    """扫描结果与原始实现完全一致"""
+    fetcher = PageFetcher()
+    scanner = fetcher._scanner()
+    rng = random.Random(42)
+    alphabet = list('abc xyz 123こんにちはカタカナ中文海口南京') + list(fetcher.chinese_surnames)
+    terms = list(fetcher.chinese_cities)
+
+    for _ in range(200):
+        parts = [rng.choice(alphabet) for _ in range(rng.randint(0, 40))]
+        parts += [rng.choice(terms) for _ in range(rng.randint(0, 3))]
+        rng.shuffle(parts)
+        text = ''.join(parts)
+        assert scanner.scan(text) == _reference_scan(fetcher, text)
+
+
+def test_scanner_overlapping_and_prefix_terms():
+    """重叠词条与互为前缀的词条都能命中"""
+    scanner = ChineseScanner({'上海', '海口', '中山', '中山市', 'Paris'}, {'欧阳', '王'})
+    chars, cities, surnames = scanner.scan('上海口 中山市 欧阳王 Paris')
+    assert cities == {'上海', '海口', '中山', '中山市', 'Paris'}
+    assert surnames == {'欧阳', '王'}
+    assert '上' in chars and 'P' not in chars
+    assert scanner.scan('Hello こんにちは') == (set(), set(), set())
+
+
+def test_large_lexicon_matches_reference():
+    """上千个城市的词表与逐词条查找结果一致"""
+    rng = random.Random(7)
+    pool = [chr(c) for c in range(0x4e00, 0x4e00 + 200)]
+    cities = {''.join(rng.choice(pool) for _ in range(rng.randint(2, 5))) for _ in range(3000)}
+    fetcher = PageFetcher(lexicon=DEFAULT_LEXICON.extend(cities))
+    text = ''.join(rng.choice(pool + [' ', 'a']) for _ in range(20000))
+    assert fetcher._scanner().scan(text) == _reference_scan(fetcher, text)
+
+
+def test_lexicon_is_shared_and_immutable(tmp_path):
+    """默认词表的扫描器在各实例间共享；扩展词表得到新的 Lexicon"""
+    assert PageFetcher()._scanner() is PageFetcher()._scanner()
+    with pytest.raises(AttributeError):
+        DEFAULT_LEXICON.cities = frozenset()
+
+    path = tmp_path / 'lexicon.txt'
+    path.write_text('# 补充词表\n[cities]\n克拉玛依\n\n[surnames]\n欧阳\n', encoding='utf-8')
+    lexicon = DEFAULT_LEXICON.extend_from_file(str(path))
+    assert {'克拉玛依', '北京'} <= lexicon.cities and '欧阳' in lexicon.surnames
+    assert '克拉玛依' not in DEFAULT_LEXICON.cities
+    assert pickle.loads(pickle.dumps(lexicon)) == lexicon
+
+    fetcher = PageFetcher(lexicon=lexicon)
+    assert fetcher._scanner().scan('克拉玛依欧阳')[1:] == ({'克拉玛依'}, {'欧阳'})
+
+    path.write_text('克拉玛依\n', encoding='utf-8')
+    with pytest.raises(ValueError):
+        DEFAULT_LEXICON.extend_from_file(str(path))
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+import io
+import random
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from bug_script import iter_csv_lines, iter_user_profiles
+from columnar import UserColumns, analyze_columns
+from aggregation import ProfileAggregator
+from test_api import _post, client
+
+
+def _csv(rows):
+    lines = ['user_id,user_name,age,city_identifier,scores']
+    lines += [f'{uid},{name},{age},{city},"{scores}"' for uid, name, age, city, scores in rows]
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def _both_engines(data):
+    aggregator = ProfileAggregator()
+    expected_rows = list(aggregator.observe(iter_user_profiles(iter_csv_lines(io.BytesIO(data)))))
+    rows, columnar_aggregator = analyze_columns(UserColumns.from_csv_lines(iter_csv_lines(io.BytesIO(data))))
+    return (expected_rows, aggregator.stats()), (rows, columnar_aggregator.stats())
+
+
+def test_matches_row_engine_on_random_data():
+    """随机数据（含未知城市、边界年龄与分数）下两种引擎逐位一致"""
+    rng = random.Random(7)
+    rows = [
+        (uid, f'user {uid}', rng.choice((29, 30, 31, rng.randint(18, 70))), rng.choice((101, 102, 103, 104, 105)),
+         ','.join(str(rng.choice((89, 90, 91, rng.randint(0, 100)))) for _ in range(rng.randint(1, 6))))
+        for uid in range(1, 3001)
+    ]
+    expected, actual = _both_engines(_csv(rows))
+    assert actual == expected
+    assert list(actual[1][3]) == list(expected[1][3])
+
+
+def test_empty_file():
+    expected, actual = _both_engines(_csv([]))
+    assert actual == expected == ([], (0, 0, 0, {}))
+
+
+def test_api_columnar_engine():
+    with open('sample_users.csv', 'rb') as f:
+        content = f.read()
+    assert _post(content, engine='columnar').json() == _post(content).json()
+    assert _post(content, engine='pandas').status_code == 400
+
+
+def test_columnar_deferred_rows_match_inline():
+    with open('sample_users.csv', 'rb') as f:
+        content = f.read()
+    inline = _post(content, engine='columnar').json()
+    deferred = _post(content, engine='columnar', detail='deferred').json()
+    page = client.get(f"/api/results/{deferred['result_id']}/rows", params={'limit': 2}).json()
+    assert page['rows'] == inline['detailed_results'][:2]
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+
+import pytest
+
+from crawl import CrawlProgress, crawl, normalize_url
+from page_fetcher import AsyncPageFetcher
+
+
+class _Crash(BaseException):
+    """模拟进程中途崩溃（不会被逐网址的异常处理吞掉）"""
+
+
+class _FakeFetcher:
+    def __init__(self, crash_on=None):
+        self.crash_on = crash_on
+        self.urls = []
+
+    async def run(self, url, mode='full'):
+        self.urls.append(url)
+        await asyncio.sleep(0)
+        if url == self.crash_on:
+            raise _Crash()
+        if url.endswith('/bad'):
+            raise ValueError('boom')
+        return {'url': url, 'is_chinese': False}
+
+
+def _read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_normalize_url():
+    assert normalize_url('  example.com\n') == 'https://example.com'
+    assert normalize_url('http://a.cn/x') == 'http://a.cn/x'
+    assert normalize_url('# 注释') is None
+    assert normalize_url('   ') is None
+
+
+def test_progress_watermark_tracks_out_of_order_completion():
+    progress = CrawlProgress()
+    for line, end in enumerate((10, 20, 30, 40)):
+        progress.start(line, end)
+    progress.finish(2)
+    progress.finish(1)
+    assert (progress.line, progress.offset, progress.done) == (0, 0, {1, 2})
+    progress.finish(0)
+    assert (progress.line, progress.offset, progress.done) == (3, 30, set())
+
+
+def test_crawl_writes_one_line_per_url(tmp_path):
+    """每个网址写出一行，空行与注释跳过，单个网址出错不影响其余网址"""
+    input_path = tmp_path / 'urls.txt'
+    input_path.write_text('a.com\n\n# skip\nhttps://b.com/bad\nc.com\n', encoding='utf-8')
+    output_path = tmp_path / 'out.jsonl'
+
+    completed = asyncio.run(crawl(_FakeFetcher(), str(input_path), str(output_path), concurrency=2))
+
+    rows = sorted(_read_jsonl(output_path), key=lambda row: row['line'])
+    assert completed == 3
+    assert [(row['line'], row['url']) for row in rows] == [
+        (0, 'https://a.com'), (3, 'https://b.com/bad'), (4, 'https://c.com')]
+    assert rows[1]['error'] == 'ValueError: boom'
+    checkpoint = json.loads((tmp_path / 'out.jsonl.checkpoint').read_text(encoding='utf-8'))
+    assert checkpoint == {'offset': len(input_path.read_bytes()), 'line': 5, 'done': [],
+                          'output_bytes': len(output_path.read_bytes())}
+
+
+def test_crawl_resumes_after_crash(tmp_path):
+    """崩溃后续跑：截断检查点之后的残留输出，已完成的网址不重复抓取"""
+    urls = [f'https://site{i}.com' for i in range(40)]
+    input_path = tmp_path / 'urls.txt'
+    input_path.write_text('\n'.join(urls) + '\n', encoding='utf-8')
+    output_path = tmp_path / 'out.jsonl'
+
+    first = _FakeFetcher(crash_on=urls[25])
+    with pytest.raises(_Crash):
+        asyncio.run(crawl(first, str(input_path), str(output_path), concurrency=4, checkpoint_every=3))
+    with open(output_path, 'ab') as f:
+        f.write(b'{"url": "half-written')
+
+    second = _FakeFetcher()
+    asyncio.run(crawl(second, str(input_path), str(output_path), concurrency=4, checkpoint_every=3))
+
+    rows = _read_jsonl(output_path)
+    assert sorted(row['url'] for row in rows) == sorted(urls)
+    assert len(set(first.urls) & set(second.urls)) <= 4
+    assert urls[25] in second.urls
+
+
+def test_crawl_with_async_page_fetcher(local_site, tmp_path):
+    local_site.add('/', '<html><body>我们位于北京</body></html>')
+    local_site.add('/en', '<html><body>Hello</body></html>')
+    input_path = tmp_path / 'urls.txt'
+    input_path.write_text(f'{local_site.url}\n{local_site.url}en\n', encoding='utf-8')
+    output_path = tmp_path / 'out.jsonl'
+
+    async def main():
+        async with AsyncPageFetcher(max_concurrency=4) as fetcher:
+            return await crawl(fetcher, str(input_path), str(output_path), mode='verdict')
+
+    assert asyncio.run(main()) == 2
+    rows = {row['line']: row for row in _read_jsonl(output_path)}
+    assert rows[0]['is_chinese'] is True
+    assert rows[1]['is_chinese'] is False
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+import io
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import main
+from bug_script import iter_csv_lines
+from columnar import UserColumns, analyze_columns
+from dataset_store import DatasetStore, read_columns, write_columns
+from test_api import _post, client
+
+
+def _csv(rows):
+    lines = ['user_id,user_name,age,city_identifier,scores']
+    lines += [f'{uid},{name},{age},{city},"{scores}"' for uid, name, age, city, scores in rows]
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def _random_rows(n, seed=3):
+    rng = random.Random(seed)
+    return [
+        (uid, rng.choice(['alice', '李雷', 'bob smith', '']), rng.randint(18, 60), rng.choice((101, 102, 103, 999)),
+         ','.join(str(rng.randint(0, 100)) for _ in range(rng.randint(1, 5))))
+        for uid in range(1, n + 1)
+    ]
+
+
+def _columns(data):
+    return UserColumns.from_csv_lines(iter_csv_lines(io.BytesIO(data)))
+
+
+@pytest.fixture
+def datasets(tmp_path, monkeypatch):
+    store = DatasetStore(str(tmp_path / 'datasets'))
+    monkeypatch.setattr(main, 'dataset_store', store)
+    return store
+
+
+def test_round_trip_is_memory_mapped(tmp_path):
+    columns = _columns(_csv(_random_rows(500)))
+    path = str(tmp_path / 'users.ucols')
+    write_columns(path, columns, {'filename': 'users.csv'})
+
+    loaded, metadata = read_columns(path)
+    assert metadata == {'filename': 'users.csv'}
+    assert list(loaded.user_name) == columns.user_name
+    for name in ('user_id', 'age', 'city_identifier', 'score_offsets', 'scores'):
+        column = getattr(loaded, name)
+        assert np.array_equal(column, getattr(columns, name))
+        assert not column.flags.owndata and not column.flags.writeable
+    assert analyze_columns(loaded)[0] == analyze_columns(columns)[0]
+
+
+def test_select_matches_filtered_csv():
+    rows = _random_rows(800)
+    selected = _columns(_csv(rows)).select(min_age=25, max_age=40, cities=[101, 999])
+    expected = _columns(_csv([r for r in rows if 25 <= r[2] <= 40 and r[3] in (101, 999)]))
+    assert analyze_columns(selected)[0] == analyze_columns(expected)[0]
+    assert analyze_columns(selected)[1].stats() == analyze_columns(expected)[1].stats()
+
+
+def test_empty_dataset(tmp_path):
+    path = str(tmp_path / 'empty.ucols')
+    write_columns(path, _columns(_csv([])))
+    loaded, _ = read_columns(path)
+    assert len(loaded) == 0 and analyze_columns(loaded)[0] == []
+
+
+def test_dataset_api_reanalyzes_without_upload(datasets):
+    with open('sample_users.csv', 'rb') as f:
+        content = f.read()
+    created = client.post('/api/datasets', files={'file': ('users.csv', content, 'text/csv')})
+    assert created.status_code == 201
+    dataset_id = created.json()['dataset_id']
+    assert created.json()['rows'] == 4
+
+    analyzed = client.post(f'/api/datasets/{dataset_id}/analyze')
+    assert analyzed.json() == _post(content).json()
+
+    filtered = client.post(f'/api/datasets/{dataset_id}/analyze', params={'max_age': 30, 'city': [101]}).json()
+    assert [row['Name'] for row in filtered['detailed_results']] == ['Alice', 'Charlie']
+
+    assert client.delete(f'/api/datasets/{dataset_id}').status_code == 204
+    assert client.post(f'/api/datasets/{dataset_id}/analyze').status_code == 404
+    assert client.get('/api/datasets/..%2Fmain').status_code == 404
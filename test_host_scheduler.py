@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+import asyncio
+import threading
+import time
+
+from host_scheduler import HostScheduler
+from page_fetcher import AsyncPageFetcher, PageFetcher
+
+
+def _slow_page(tracker, delay=0.05):
+    """记录服务器端最大并发数的慢页面"""
+    def respond(handler):
+        with tracker['lock']:
+            tracker['current'] += 1
+            tracker['max'] = max(tracker['max'], tracker['current'])
+        time.sleep(delay)
+        with tracker['lock']:
+            tracker['current'] -= 1
+        return 200, {'Content-Type': 'text/html'}, b'<p>hello</p>'
+    return respond
+
+
+def test_per_host_in_flight_limit(local_site):
+    """同一主机的在途请求不超过上限，统计信息随之更新"""
+    tracker = {'lock': threading.Lock(), 'current': 0, 'max': 0}
+    for i in range(8):
+        local_site.add(f'/p{i}', _slow_page(tracker))
+
+    async def main():
+        async with AsyncPageFetcher(max_concurrency=10, per_host_concurrency=2) as fetcher:
+            await asyncio.gather(*(fetcher._fetch_page(f'{local_site.url}p{i}') for i in range(8)))
+            return fetcher.pool_stats()
+
+    stats = asyncio.run(main())
+    assert tracker['max'] <= 2
+    assert stats['scheduler']['requests'] == 8
+    assert stats['scheduler']['in_flight'] == 0
+    assert stats['connections'] <= 2
+
+
+def test_per_host_rate_limit(local_site):
+    """单主机限速：每秒 20 个请求时，5 个请求至少间隔 0.2 秒"""
+    local_site.add('/', '<p>hi</p>')
+    fetcher = PageFetcher(per_host_rate=20)
+    started = time.monotonic()
+    for _ in range(5):
+        assert fetcher._fetch_page(local_site.url) == '<p>hi</p>'
+    assert time.monotonic() - started >= 0.19
+    assert fetcher.pool_stats()['connections'] == 1
+
+
+def test_scheduler_stats_by_host():
+    scheduler = HostScheduler(max_in_flight=2, per_host_in_flight=1)
+
+    async def main():
+        async with scheduler.slot('https://a.example.com/x'):
+            inner = scheduler.stats()
+        return inner
+
+    inner = asyncio.run(main())
+    assert inner['in_flight'] == 1
+    assert inner['hosts']['a.example.com']['requests'] == 1
+    assert scheduler.stats()['in_flight'] == 0
+
+
+def test_idle_hosts_are_dropped():
+    """主机空闲后删除其状态，累计统计不受影响；排队中的主机不会被删除"""
+    scheduler = HostScheduler(max_in_flight=1, per_host_in_flight=1)
+
+    async def main():
+        for i in range(100):
+            async with scheduler.slot(f'https://h{i}.example.com/'):
+                pass
+        async with scheduler.slot('https://busy.example.com/'):
+            waiter = asyncio.ensure_future(_enter(scheduler, 'https://busy.example.com/x'))
+            await asyncio.sleep(0)
+            busy = scheduler.stats()
+        await waiter
+        return busy
+
+    busy = asyncio.run(main())
+    assert busy['active_hosts'] == 1
+    assert busy['hosts']['busy.example.com']['waiting'] == 1
+    stats = scheduler.stats()
+    assert (stats['active_hosts'], stats['hosts'], stats['requests']) == (0, {}, 102)
+
+
+async def _enter(scheduler, url):
+    async with scheduler.slot(url):
+        pass
+
+
+def test_rate_reservation_keeps_host_state():
+    """未到期的速率预约随主机状态保留，第二个请求仍需等待"""
+    scheduler = HostScheduler(per_host_rate=20)
+    started = time.monotonic()
+    for _ in range(2):
+        with scheduler.sync_slot('https://a.example.com/'):
+            pass
+    assert time.monotonic() - started >= 0.045
+    assert scheduler.stats()['active_hosts'] == 1
+
+
+def test_rate_wait_does_not_hold_global_slots():
+    """等待速率预约的主机不占全局名额，其他主机的请求立即开始"""
+    scheduler = HostScheduler(max_in_flight=2, per_host_in_flight=2, per_host_rate=1)
+    started = {}
+
+    async def request(name, url):
+        async with scheduler.slot(url):
+            started[name] = time.monotonic()
+
+    async def main():
+        t0 = time.monotonic()
+        tasks = [asyncio.ensure_future(request(f'a{i}', 'https://a.com/')) for i in range(3)]
+        await asyncio.sleep(0)
+        await request('b', 'https://b.com/')
+        elapsed = started['b'] - t0
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return elapsed
+
+    assert asyncio.run(main()) < 0.5
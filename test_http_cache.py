@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import os
+import time
+
+from http_cache import HttpCache, normalize_url
+from page_fetcher import PageFetcher
+
+
+def _etag_page(body, etag='"v1"'):
+    """支持 If-None-Match 的页面"""
+    def respond(handler):
+        headers = {'Content-Type': 'text/html; charset=utf-8', 'ETag': etag}
+        if handler.headers.get('If-None-Match') == etag:
+            return 304, headers, b''
+        return 200, headers, body.encode('utf-8')
+    return respond
+
+
+def test_normalize_url():
+    assert normalize_url('HTTP://Example.COM:80/a?b=2&a=1#top') == 'http://example.com/a?a=1&b=2'
+    assert normalize_url('https://example.com') == 'https://example.com/'
+    assert normalize_url('https://example.com:8443/x') == 'https://example.com:8443/x'
+
+
+def test_fresh_hit_and_revalidation(local_site, tmp_path):
+    """新鲜条目直接命中；过期条目发送条件请求，304 时沿用本地内容"""
+    local_site.add('/page', _etag_page('<p>上海</p>'))
+    cache = HttpCache(str(tmp_path / 'cache.sqlite3'), ttl=60)
+    fetcher = PageFetcher(cache=cache)
+    url = local_site.url + 'page'
+
+    assert fetcher._fetch_page(url) == '<p>上海</p>'
+    assert fetcher._fetch_page(url) == '<p>上海</p>'
+    assert len(local_site.requests) == 1
+
+    cache.ttl = 0
+    assert fetcher._fetch_page(url) == '<p>上海</p>'
+    assert local_site.requests[-1][2].get('If-None-Match') == '"v1"'
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['revalidations']) == (1, 1, 1)
+    assert stats['entries'] == 1
+
+
+def test_cache_persists_across_instances(local_site, tmp_path):
+    local_site.add('/page', _etag_page('<p>hello</p>'))
+    path = str(tmp_path / 'cache.sqlite3')
+    PageFetcher(cache=HttpCache(path))._fetch_page(local_site.url + 'page')
+
+    cache = HttpCache(path)
+    assert PageFetcher(cache=cache)._fetch_page(local_site.url + 'page') == '<p>hello</p>'
+    assert len(local_site.requests) == 1
+    assert cache.stats()['hits'] == 1
+
+
+def test_lru_eviction(tmp_path):
+    """超过容量时淘汰最久未访问的条目"""
+    cache = HttpCache(str(tmp_path / 'cache.sqlite3'))
+    bodies = {name: os.urandom(100).hex() for name in ('a', 'b', 'c')}
+    cache.store('http://x/a', bodies['a'], {})
+    cache.max_bytes = cache.stats()['bytes'] * 5 // 2
+    for name in ('b', 'c'):
+        time.sleep(0.01)
+        cache.lookup('http://x/a')
+        cache.store(f'http://x/{name}', bodies[name], {})
+    assert cache.lookup('http://x/a').body == bodies['a']
+    assert cache.lookup('http://x/b') is None
+    assert cache.stats()['evictions'] == 1
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+
+import main
+from jobs import JobQueue, QueueFullError
+from test_api import _post, client
+
+
+def _tmp_file():
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    return path
+
+
+def _wait(job, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while job.finished_at is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_queue_depth_is_bounded():
+    """工作线程被占用时，排队数达到上限后拒绝新任务"""
+    release = threading.Event()
+    started = threading.Event()
+
+    def handler(job):
+        started.set()
+        release.wait(5)
+        return job.path
+
+    jobs = JobQueue(handler, workers=1, max_queued=2)
+    running = jobs.submit('a.csv', _tmp_file())
+    assert started.wait(5)
+    queued = [jobs.submit('b.csv', _tmp_file()), jobs.submit('c.csv', _tmp_file())]
+    with pytest.raises(QueueFullError):
+        jobs.submit('d.csv', _tmp_file())
+    assert jobs.stats()['queued'] == 2
+
+    release.set()
+    for job in [running] + queued:
+        assert _wait(job).status == 'done'
+        assert not os.path.exists(job.result)
+    jobs.shutdown()
+
+
+def test_failed_job_records_error():
+    def handler(job):
+        raise ValueError('boom')
+
+    jobs = JobQueue(handler, workers=1)
+    job = _wait(jobs.submit('a.csv', _tmp_file()))
+    assert job.status == 'failed' and job.error == 'boom'
+    jobs.shutdown()
+
+
+def test_large_upload_becomes_job(monkeypatch):
+    """超过阈值的上传返回任务 id，完成后结果与同步接口一致"""
+    with open('sample_users.csv', 'rb') as f:
+        content = f.read()
+    inline = _post(content).json()
+
+    monkeypatch.setattr(main, 'JOB_THRESHOLD_BYTES', 0)
+    response = _post(content)
+    assert response.status_code == 202
+    job_id = response.json()['job_id']
+
+    _wait(main.job_queue.get(job_id))
+    assert client.get(f'/api/jobs/{job_id}').json()['status'] == 'done'
+    result = client.get(f'/api/jobs/{job_id}/result').json()
+    assert result['summary'] == inline['summary']
+    rows = client.get(f"/api/results/{result['result_id']}/rows").json()['rows']
+    assert rows == inline['detailed_results']
+
+
+def test_submit_job_endpoint():
+    with open('sample_users.csv', 'rb') as f:
+        response = client.post('/api/jobs', files={'file': ('users.csv', f.read(), 'text/csv')})
+    assert response.status_code == 202
+    job = _wait(main.job_queue.get(response.json()['job_id']))
+    assert job.status == 'done'
+    assert client.get('/api/jobs/missing').status_code == 404
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import time
+
+from metrics import Histogram, MetricsRegistry, SamplingProfiler
+from page_fetcher import PageFetcher
+from test_api import _post, client
+
+
+def test_histogram_render_and_quantiles():
+    histogram = Histogram('demo_seconds', '示例', ('step',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.05, 0.5, 2.0):
+        histogram.observe(value, step='parse')
+
+    text = histogram.render()
+    assert 'demo_seconds_bucket{step="parse",le="0.1"} 2' in text
+    assert 'demo_seconds_bucket{step="parse",le="1.0"} 3' in text
+    assert 'demo_seconds_bucket{step="parse",le="+Inf"} 4' in text
+    assert 'demo_seconds_count{step="parse"} 4' in text
+
+    stats = histogram.stats()['step=parse']
+    assert stats['count'] == 4 and stats['sum'] == 2.6
+    assert stats['p50'] == 0.1 and stats['p99'] == 1.0
+
+
+def test_registry_reuses_histograms():
+    registry = MetricsRegistry()
+    first = registry.histogram('a_seconds', 'a')
+    assert registry.histogram('a_seconds', 'a') is first
+    first.observe(0.2)
+    assert registry.stats('a_')['a_seconds']['']['count'] == 1
+    assert registry.stats('b_') == {}
+
+
+def test_sampling_profiler_collects_stacks():
+    def busy():
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            pass
+
+    with SamplingProfiler(interval=0.002) as profiler:
+        busy()
+    assert profiler.top(1)[0][0].startswith('busy ')
+    assert 'test_sampling_profiler_collects_stacks' in profiler.collapsed()
+
+
+def test_api_metrics_and_profile():
+    with open('sample_users.csv', 'rb') as f:
+        response = _post(f.read(), profile='true')
+    profile_id = response.headers['X-Profile-Id']
+    assert client.get(f'/api/profiles/{profile_id}').status_code == 200
+
+    text = client.get('/metrics').text
+    assert 'csv_analysis_seconds_count{engine="python",stage="analyze"}' in text
+    assert 'http_request_seconds_count{method="POST",route="/api/analyze",status="200"}' in text
+    assert 'python' in ''.join(client.get('/api/stats').json()['metrics']['csv_analysis_seconds'])
+
+
+def test_fetcher_stats(local_site):
+    local_site.add('/', '<html><body><p>北京欢迎你</p><a href="https://example.com/">x</a></body></html>')
+    fetcher = PageFetcher(metrics=MetricsRegistry())
+    fetcher.run(local_site.url)
+
+    metrics = fetcher.stats()['metrics']
+    assert metrics['page_fetch_seconds']['source=network']['count'] == 1
+    assert {'phase=ttfb', 'phase=body'} <= set(metrics['page_fetch_phase_seconds'])
+    steps = {label.split(',')[0] for label in metrics['page_analysis_seconds']}
+    assert steps == {'step=parse', 'step=scan', 'step=comments', 'step=links'}
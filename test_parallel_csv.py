@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from bug_script import iter_csv_lines, iter_user_profiles
+from aggregation import ProfileAggregator
+from parallel_csv import analyze_csv_parallel, split_row_ranges
+from test_api import _post
+
+
+def _write_csv(tmp_path, rows, newline='\n'):
+    lines = ['user_id,user_name,age,city_identifier,scores']
+    lines += [f'{uid},{name},{age},{city},"{scores}"' for uid, name, age, city, scores in rows]
+    path = tmp_path / 'users.csv'
+    path.write_bytes(newline.join(lines).encode('utf-8'))
+    return str(path)
+
+
+def _random_rows(n, seed=7):
+    rng = random.Random(seed)
+    return [
+        (i, rng.choice(['alice', '李雷', 'bob smith']), rng.randint(18, 60), rng.choice([101, 102, 103, 999]),
+         ','.join(str(rng.randint(60, 100)) for _ in range(rng.randint(1, 7))))
+        for i in range(n)
+    ]
+
+
+def _serial(path):
+    aggregator = ProfileAggregator()
+    with open(path, 'rb') as f:
+        rows = list(aggregator.observe(iter_user_profiles(iter_csv_lines(f))))
+    return rows, aggregator
+
+
+def test_ranges_cover_file_on_row_boundaries(tmp_path):
+    path = _write_csv(tmp_path, _random_rows(300))
+    header, ranges = split_row_ranges(path, chunk_bytes=500)
+    data = open(path, 'rb').read()
+    assert header == data[:len(header)] and header.endswith(b'\n')
+    assert ranges[0][0] == len(header) and ranges[-1][1] == len(data)
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    assert all(data[end - 1:end] == b'\n' for _, end in ranges[:-1])
+
+
+def test_quoted_newline_is_not_split(tmp_path):
+    path = tmp_path / 'quoted.csv'
+    path.write_bytes(b'a,b\n1,"x\ny"\n2,"z"\n')
+    header, ranges = split_row_ranges(str(path), chunk_bytes=1)
+    assert ranges == [(4, 12), (12, 18)]
+
+
+@pytest.mark.parametrize('newline', ['\n', '\r\n'])
+def test_parallel_matches_serial_exactly(tmp_path, newline):
+    """逐行结果、顺序与浮点汇总都与串行一致"""
+    path = _write_csv(tmp_path, _random_rows(2000), newline)
+    rows, aggregator = _serial(path)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        parallel_rows, parallel_aggregator = analyze_csv_parallel(path, executor=executor, chunk_bytes=4096)
+    assert parallel_rows.rows() == rows
+    assert parallel_aggregator.stats() == aggregator.stats()
+    assert list(parallel_aggregator.locations) == list(aggregator.locations)
+
+
+def test_parallel_engine_endpoint():
+    with open('sample_users.csv', 'rb') as f:
+        content = f.read()
+    assert _post(content, engine='parallel').json() == _post(content).json()
+    assert _post(b'user_id,user_name,age,city_identifier,scores\n', engine='parallel').json()['detailed_results'] == []
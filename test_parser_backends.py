@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+import pytest
+from bs4 import BeautifulSoup
+
+from page_fetcher import PageFetcher
+
+PAGES = {
+    'latin': '''<!DOCTYPE html><html><head><title>Acme Inc</title>
+<meta name="description" content="We build things"><meta property="og:title" content="Acme">
+</head><body><h1>Welcome</h1><p>Contact us at <a href="/contact">contact</a> or
+<a href="https://www.linkedin.com/company/acme">LinkedIn</a>, <a href="https://x.com/acme">X</a>.</p>
+<a href="">empty</a><a name="anchor">no href</a></body></html>''',
+    'cjk': '''<html><head><title>北京科技有限公司</title>
+<meta name="Keywords" content="软件,深圳"><meta name="author" content="王小明">
+<style>/* 主样式 */ body { color: red } /* 第二段 */</style>
+<script>// 初始化
+var x = 1; /* 多行
+注释 */</script></head>
+<body><!-- 页面开始 --><div>我们位于上<b>海</b>浦东&#26032;区，欢迎来访。</div>
+<template><p>模板里的杭州</p></template><textarea>文本框里的成都</textarea>
+<a href="https://github.com/acme">GitHub</a><a href="https://weibo.com/acme">微博</a>
+<script src="/app.js"></script><!-- 页面结束 --></body></html>''',
+    'japanese': '<html><body><p>こんにちは、カタカナ。東京都</p><!-- コメント --></body></html>',
+    'no_html_wrapper': '<p>直接的段落</p>尾部文字<br>王',
+    'empty': '',
+    'cdata': '<html><body><p>Hello<![CDATA[李]]>world</p><![CDATA[深圳]]]><!-- 注释 --></body></html>',
+}
+
+
+def _legacy_features(fetcher, html):
+    """原先多次遍历 BeautifulSoup 文档树的实现"""
+    soup = BeautifulSoup(html, 'html.parser')
+    chars, cities, surnames = fetcher._scanner().scan(soup.get_text())
+    comments = fetcher._extract_comments(soup)
+    return {
+        'chinese_chars': sorted(chars),
+        'chinese_cities': sorted(cities),
+        'chinese_surnames': sorted(surnames),
+        'meta_info': fetcher._extract_meta_info(soup),
+        'hrefs': [a['href'] for a in soup.find_all('a', href=True)],
+        'comments_chinese': {k: sorted(v) for k, v in comments.items()},
+    }
+
+
+@pytest.mark.parametrize('parser', ['html.parser', 'lxml'])
+@pytest.mark.parametrize('name', sorted(PAGES))
+def test_single_pass_matches_legacy(parser, name):
+    """单次遍历的各解析器后端与原实现输出一致"""
+    fetcher = PageFetcher(parser=parser)
+    assert fetcher._extract_page_features(PAGES[name]) == _legacy_features(fetcher, PAGES[name])
+
+
+def test_unknown_parser_rejected():
+    with pytest.raises(ValueError):
+        PageFetcher(parser='html5lib')
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+
+from bug_script import ScoreService, analyze_user_profiles
+
+
+def test_default_records_and_missing_user():
+    service = ScoreService()
+    assert service.get_scores_for_user(3) == [100, 100, 100]
+    assert service.get_scores_for_user(99) == []
+    assert service._score_records[0] == (1, [88, 92, 76])
+
+
+def test_duplicate_user_ids():
+    """直接设置记录时首条生效（与线性查找一致）；批量加载时末条生效（与 CSV 解析一致）"""
+    service = ScoreService()
+    service._score_records = [(1, [10]), (1, [20])]
+    assert service.get_scores_for_user(1) == [10]
+
+    service.load_bulk([(1, [10]), (1, [20])])
+    assert service.get_scores_for_user(1) == [20]
+    assert service.get_scores_for_user(2) == []
+
+
+def test_csv_duplicate_ids_use_last_scores():
+    content = b'user_id,user_name,age,city_identifier,scores\n1,a,20,101,"90"\n1,b,20,101,"50"\n'
+    assert [r['avg_score'] for r in analyze_user_profiles(content)] == [50.0, 50.0]
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import asyncio
+
+from page_fetcher import AsyncPageFetcher, PageFetcher
+
+
+def test_client_created_on_first_request():
+    """新建 PageFetcher 不创建 HTTP 客户端，首次使用时才创建并复用"""
+    fetcher = PageFetcher()
+    assert fetcher._client is None
+    assert fetcher.pool_stats()['connections'] == 0
+    assert fetcher.client is fetcher.client
+
+
+def test_fetch_page_truncates_at_max_bytes(local_site):
+    """超过字节上限的页面被截断，且不会产生半个多字节字符"""
+    local_site.add('/big', '中' * 1000)
+    fetcher = PageFetcher(max_bytes=100)
+    html = fetcher._fetch_page(local_site.url + 'big')
+    assert html == '中' * 33
+
+
+def test_fetch_page_rejects_non_html(local_site):
+    """非 HTML 响应直接拒绝"""
+    local_site.add('/file.zip', b'PK\x03\x04' + b'\x00' * 100, headers={'Content-Type': 'application/zip'})
+    local_site.add('/page', '<p>ok</p>', headers={'Content-Type': 'text/html'})
+    fetcher = PageFetcher()
+    assert fetcher._fetch_page(local_site.url + 'file.zip') is None
+    assert fetcher._fetch_page(local_site.url + 'page') == '<p>ok</p>'
+
+
+def test_fetch_page_decodes_declared_charset(local_site):
+    """按响应头声明的编码增量解码"""
+    local_site.add('/gbk', '<p>北京欢迎你</p>'.encode('gbk'), headers={'Content-Type': 'text/html; charset=gbk'})
+
+    async def main():
+        async with AsyncPageFetcher(max_bytes=1024) as fetcher:
+            return await fetcher._fetch_page(local_site.url + 'gbk')
+
+    assert PageFetcher()._fetch_page(local_site.url + 'gbk') == '<p>北京欢迎你</p>'
+    assert asyncio.run(main()) == '<p>北京欢迎你</p>'
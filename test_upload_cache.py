@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+import io
+
+import pytest
+
+import bug_script
+import main
+from tiered_cache import atomic_open
+from upload_cache import PayloadRows, UploadCache, payload_body
+from test_api import _post, client
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = UploadCache()
+    monkeypatch.setattr(main, 'upload_cache', cache)
+    return cache
+
+
+def _sample():
+    with open('sample_users.csv', 'rb') as f:
+        return f.read()
+
+
+def test_repeat_upload_is_served_from_cache(cache, monkeypatch):
+    """重复上传命中缓存，响应与首次逐字节相同，且不再解析 CSV"""
+    content = _sample()
+    first = _post(content)
+    assert cache.stats()['misses'] == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError('命中缓存时不应再分析')
+    monkeypatch.setattr(main, '_analyze', fail)
+    second = _post(content, filename='again.csv')
+    assert cache.stats()['hits'] == 1
+    assert second.json() == dict(first.json(), filename='again.csv')
+    assert _post(content).content == first.content
+
+    deferred = _post(content, detail='deferred').json()
+    rows = client.get(f"/api/results/{deferred['result_id']}/rows").json()['rows']
+    assert rows == first.json()['detailed_results']
+    assert client.get('/api/cache/stats').json()['hits'] == 3
+
+
+def test_reference_change_invalidates(cache, monkeypatch):
+    content = _sample()
+    _post(content)
+    monkeypatch.setattr(bug_script, 'ELIGIBLE_MAX_AGE', 50)
+    response = _post(content).json()
+    assert cache.stats()['invalidations'] == 1 and cache.stats()['hits'] == 0
+    assert response['summary']['eligible_users'] == 2
+
+
+def test_lru_is_bounded_by_bytes():
+    cache = UploadCache(max_bytes=10)
+    cache.put('a', b'x' * 6)
+    cache.put('b', b'y' * 6)
+    assert cache.get('a') is None and cache.get('b') == b'y' * 6
+    cache.put('c', b'z' * 11)
+    assert cache.stats()['entries'] == 1 and cache.stats()['bytes'] == 6
+
+
+def test_oversized_result_is_not_serialized_for_cache(monkeypatch):
+    """只为缓存序列化的明细超过缓存容量时提前放弃，不生成整个字节串"""
+    content = _sample()
+    inline = _post(content).content
+    limit = len(inline) - len(b'{"filename":"users.csv","status":"success",') + 1
+    cache = UploadCache(max_bytes=limit - 1)
+    monkeypatch.setattr(main, 'upload_cache', cache)
+    monkeypatch.setattr(main, 'SERIALIZE_PAGE_SIZE', 3)
+
+    analysis_results, aggregator = main._analyze(io.BytesIO(content), 'python', lazy_rows=True)
+    assert len(payload_body(main._cache_payload(aggregator, analysis_results, limit))) == limit
+    assert main._cache_payload(aggregator, analysis_results, limit - 1) is None
+    assert main._cache_payload(aggregator, analysis_results, len(analysis_results) * 10) is None
+
+    _post(content, detail='deferred')
+    assert cache.stats()['entries'] == 0
+    assert _post(content).content == inline
+
+
+def test_deferred_cache_hit_pages_rows(cache, monkeypatch):
+    """延迟模式命中缓存时按序列化时记录的分页索引读取明细，姓名中的括号、引号不影响行边界"""
+    monkeypatch.setattr(main, 'SERIALIZE_PAGE_SIZE', 2)
+    names = ['x},{', 'b"},{"c', 'd\\', '}],{', '王五']
+    lines = ['user_id,user_name,age,city_identifier,scores']
+    lines += [f'{i},"{name.replace(chr(34), chr(34) * 2)}",30,101,"80,90"' for i, name in enumerate(names, 1)]
+    content = '\n'.join(lines).encode('utf-8') + b'\n'
+    inline = _post(content).json()['detailed_results']
+    assert [row['Name'] for row in inline] == [name.title() for name in names]
+
+    deferred = _post(content, detail='deferred').json()
+    assert cache.stats()['hits'] == 1 and deferred['total_rows'] == 5
+    rows_url = f"/api/results/{deferred['result_id']}/rows"
+    for offset in range(5):
+        assert client.get(rows_url, params={'offset': offset, 'limit': 1}).json()['rows'] == inline[offset:offset + 1]
+    assert client.get(rows_url, params={'offset': 1, 'limit': 3}).json()['rows'] == inline[1:4]
+
+    view = PayloadRows(cache.get(next(iter(cache._entries))))
+    assert view.rows() == inline and view.rows(4, 99) == inline[4:]
+    assert view.rows(5) == [] and view.rows(3, 2) == []
+    assert view.head()['summary']['total_users'] == 5
+
+
+def test_payload_rows_without_rows():
+    analysis_results, aggregator = main._analyze(io.BytesIO(b'user_id,user_name,age,city_identifier,scores\n'), 'python')
+    view = PayloadRows(main._cache_payload(aggregator, analysis_results))
+    assert len(view) == 0 and view.rows() == []
+    assert view.head() == {'summary': aggregator.summary(), 'location_stats': aggregator.location_stats()}
+
+
+def test_disk_tier(tmp_path):
+    key = UploadCache().key_for(io.BytesIO(b'data'))
+    UploadCache(directory=str(tmp_path)).put(key, b'{"x":1}')
+    fresh = UploadCache(directory=str(tmp_path))
+    assert fresh.get(key) == b'{"x":1}'
+    assert fresh.stats()['disk_hits'] == 1
+
+
+def test_atomic_open_keeps_old_file_on_error(tmp_path):
+    path = tmp_path / 'sub' / 'value.json'
+    with atomic_open(str(path)) as f:
+        f.write(b'old')
+    with pytest.raises(RuntimeError):
+        with atomic_open(str(path)) as f:
+            f.write(b'half')
+            raise RuntimeError()
+    assert path.read_bytes() == b'old'
+    assert [p.name for p in path.parent.iterdir()] == ['value.json']
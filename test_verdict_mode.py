@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import asyncio
+
+import pytest
+
+from page_fetcher import AsyncPageFetcher, PageFetcher
+
+PAGES = {
+    'plain': '<html><body><p>Hello world</p></body></html>',
+    'chinese': '<html><body><p>欢迎访问</p></body></html>',
+    'script_only': '<html><head><script>var s = "中文";</script><style>/* 样式 */</style></head><body>Hi</body></html>',
+    'comment_only': '<html><body><!-- 注释 -->Hi</body></html>',
+    'attribute_only': '<html><body><img alt="图片">Hi</body></html>',
+    'entity': '<html><body>&#20013;&#25991;</body></html>',
+    'big_latin': '<html><body>' + 'lorem ipsum ' * 50000 + '</body></html>',
+}
+
+
+@pytest.mark.parametrize('name', sorted(PAGES))
+def test_verdict_matches_full_analysis(local_site, name):
+    """快速判定结果与完整分析的 has_chinese 一致"""
+    local_site.add('/' + name, PAGES[name])
+    fetcher = PageFetcher()
+    html = fetcher._fetch_page(local_site.url + name)
+    expected = fetcher._analyze_page_content(html, local_site.url)['has_chinese']
+    assert fetcher._fetch_verdict(local_site.url + name) is expected
+
+
+def test_verdict_run_checks_subpages(local_site):
+    """主页面无中文时，快速模式在第一个含中文的子页面处停止"""
+    local_site.add('/', PAGES['plain'])
+    local_site.add('/privacy', PAGES['chinese'])
+    local_site.add('/contact', PAGES['chinese'])
+
+    result = PageFetcher().run(local_site.url, mode='verdict')
+    assert result['is_chinese'] is True
+    assert result['confidence'] == 'medium'
+    assert result['main_page'] == {'has_chinese': False}
+    assert result['subpages'] == {'privacy': {'has_chinese': True}}
+    assert ('GET', '/contact') not in [(m, p) for m, p, _ in local_site.requests]
+
+    async def main():
+        async with AsyncPageFetcher() as fetcher:
+            result = await fetcher.run(local_site.url, mode='verdict')
+            return result, fetcher.scheduler.stats()
+
+    async_result, scheduler_stats = asyncio.run(main())
+    assert async_result['is_chinese'] is True
+    assert set(async_result['subpages']) <= {'privacy', 'contact'}
+    # 被取消的子页面请求在 run() 返回前已经退出
+    assert (scheduler_stats['in_flight'], scheduler_stats['waiting']) == (0, 0)
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        PageFetcher().run('https://example.com', mode='fast')
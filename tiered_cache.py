@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+进程内 LRU + 可选磁盘层的通用缓存，以及原子写文件
+
+AnalysisCache（页面分析结果）与 UploadCache（上传分析结果）共用这里的实现，
+二者只在容量的计量方式与磁盘上的编码上不同。
+"""
+
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_open(path, mode='wb', **kwargs):
+    """写入同目录下的临时文件，正常结束后原子替换 path；出错时删除临时文件
+
+    读者要么看到旧文件，要么看到完整的新文件，崩溃时不会留下写了一半的文件。
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class TieredCache:
+    """进程内 LRU，可选共享的磁盘层
+
+    内存层中各项所占份额之和不超过 capacity，份额由 _size 决定（默认每项计 1，
+    即按条数限制）；单项超过 capacity 时只写磁盘层。
+    磁盘层按键的前两位分目录保存，写入时先写临时文件再原子替换，
+    多个进程可以共用同一目录；磁盘层不做容量限制。
+    子类通过 _encode / _decode 决定值在磁盘上的格式。
+    """
+
+    def __init__(self, capacity, directory=None):
+        self.capacity = capacity
+        self.directory = directory
+        self._entries = OrderedDict()
+        self._used = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    def _size(self, value):
+        return 1
+
+    def _encode(self, value):
+        return value
+
+    def _decode(self, data):
+        return data
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.json')
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return value
+
+        if self.directory:
+            try:
+                with open(self._path(key), 'rb') as f:
+                    value = self._decode(f.read())
+            except (OSError, ValueError):
+                value = None
+            if value is not None:
+                with self._lock:
+                    self._stats['disk_hits'] += 1
+                    self._remember(key, value)
+                return value
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+
+        if self.directory:
+            try:
+                with atomic_open(self._path(key)) as f:
+                    f.write(self._encode(value))
+            except OSError:
+                pass
+
+    def _remember(self, key, value):
+        size = self._size(value)
+        if size > self.capacity:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._used -= self._size(old)
+        self._entries[key] = value
+        self._used += size
+        while self._used > self.capacity:
+            _, evicted = self._entries.popitem(last=False)
+            self._used -= self._size(evicted)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._used = 0
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+/api/analyze 的上传去重缓存
+
+以文件内容的哈希为键缓存分析结果，同一文件重复上传时只需计算哈希。
+键中包含参考数据（城市表、合格规则）的指纹，参考数据变化后旧结果自动失效。
+"""
+
+import hashlib
+import json
+from array import array
+
+import bug_script
+from tiered_cache import TieredCache
+
+HASH_CHUNK_SIZE = 1024 * 1024
+# 缓存值格式的版本，格式变化后旧的磁盘缓存不再命中
+PAYLOAD_FORMAT = 2
+
+
+def reference_fingerprint():
+    """城市表与合格规则的指纹，任一变化都会使缓存失效"""
+    reference = {
+        'cities': sorted(bug_script.CITIES_REFERENCE.items()),
+        'max_age': bug_script.ELIGIBLE_MAX_AGE,
+        'min_avg_score': bug_script.ELIGIBLE_MIN_AVG_SCORE
+    }
+    return hashlib.sha256(json.dumps(reference, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def upload_key(file_obj, fingerprint, chunk_size=HASH_CHUNK_SIZE):
+    """从当前位置分块读完文件并计算缓存键"""
+    digest = hashlib.sha256(f'{PAYLOAD_FORMAT}:{fingerprint}'.encode('utf-8') + b'\0')
+    while True:
+        chunk = file_obj.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def pack_payload(body_parts, rows_start, total_rows, page_size, pages):
+    """组装缓存值：一行明细索引 JSON，换行，再接响应体
+
+    响应体形如 {"summary":...,"location_stats":...,"detailed_results":[...]}；
+    rows_start 为明细数组第一个字符在响应体中的偏移，pages 为每页第一行的偏移，
+    均由序列化时记录，读取时不必扫描字节串去找行边界。
+    紧凑 JSON 中不含原始换行符，因此第一个换行符就是索引的结尾。
+    """
+    index = json.dumps({'rows_start': rows_start, 'total_rows': total_rows,
+                        'page_size': page_size, 'pages': pages}, separators=(',', ':'))
+    return b''.join([index.encode('utf-8'), b'\n', *body_parts])
+
+
+def payload_body(value):
+    """缓存值中的响应体（不复制）"""
+    return memoryview(value)[value.index(b'\n') + 1:]
+
+
+class PayloadRows:
+    """缓存值中明细的惰性视图，接口与 UserRecords 相同
+
+    只保留缓存中的字节串（与缓存共用同一对象）与序列化时记录的分页索引，
+    rows(start, stop) 只解析覆盖该范围的那几页。
+    """
+
+    __slots__ = ('value', 'total_rows', '_body', '_rows_start', '_page_size', '_pages')
+
+    _ROWS_KEY = b',"detailed_results":['
+
+    def __init__(self, value):
+        self.value = value
+        self._body = value.index(b'\n') + 1
+        index = json.loads(value[:self._body])
+        self.total_rows = index['total_rows']
+        self._rows_start = self._body + index['rows_start']
+        self._page_size = index['page_size']
+        self._pages = array('q', (self._body + offset for offset in index['pages']))
+
+    def head(self):
+        """summary 与 location_stats，不解析明细"""
+        return json.loads(self.value[self._body:self._rows_start - len(self._ROWS_KEY)] + b'}')
+
+    def __len__(self):
+        return self.total_rows
+
+    def rows(self, start=0, stop=None):
+        start, stop, _ = slice(start, stop).indices(self.total_rows)
+        if start >= stop:
+            return []
+        first, last = start // self._page_size, (stop - 1) // self._page_size
+        # 页与页之间以逗号分隔，最后一页以响应体末尾的 ]} 结束
+        end = self._pages[last + 1] - 1 if last + 1 < len(self._pages) else len(self.value) - len(b']}')
+        page = json.loads(b'[' + self.value[self._pages[first]:end] + b']')
+        offset = first * self._page_size
+        return page[start - offset:stop - offset]
+
+
+class UploadCache(TieredCache):
+    """分析结果缓存：按字节数限制的进程内 LRU，可选磁盘层（见 TieredCache）
+
+    值为 pack_payload 生成的字节串，命中时响应体可以直接拼入响应。
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, directory=None):
+        super().__init__(max_bytes, directory)
+        self._fingerprint = None
+        self._stats['invalidations'] = 0
+
+    @property
+    def max_bytes(self):
+        return self.capacity
+
+    def _size(self, value):
+        return len(value)
+
+    def fingerprint(self):
+        """当前参考数据的指纹；与上次不同时清空内存层"""
+        fingerprint = reference_fingerprint()
+        with self._lock:
+            if self._fingerprint != fingerprint:
+                if self._fingerprint is not None:
+                    self._stats['invalidations'] += 1
+                    self._entries.clear()
+                    self._used = 0
+                self._fingerprint = fingerprint
+        return fingerprint
+
+    def key_for(self, file_obj):
+        return upload_key(file_obj, self.fingerprint())
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._used)